@@ -8,20 +8,147 @@ This is the main agent that:
 4. Formats responses
 """
 
+import importlib.util
 import json
 import os
-from typing import Any, Dict, List, Optional
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Dict, Generator, Iterator, List, Optional, Tuple
 
+import orjson
+import tiktoken
 from dotenv import load_dotenv
-from openai import OpenAI
 
-from agents.prompts import get_orchestrator_system_prompt
-from agents.tools import TOOL_SCHEMAS, execute_tool
-from database.db_manager import save_conversation_message
+from agents.prompts import format_clarification_response, get_orchestrator_system_prompt
+from agents.tools import TOOL_SCHEMAS, execute_tool, execute_tools
+from database.db_manager import save_conversation_messages
+from database.pool import get_pooled_connection
 
 # Load environment variables
 load_dotenv()
 
+# Shared worker pool for running independent tool calls of a single turn in
+# parallel. Tools are sync (SQLite + geo maths) so threads are the right fit.
+_TOOL_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.getenv("TOOL_WORKERS", "8")),
+    thread_name_prefix="goodfoods-tool",
+)
+
+# Result fields surfaced to the UI, per tool (successful results only)
+_RESERVATION_FIELDS = (
+    "reservation",
+    "restaurant",
+    "reservation_fee",
+    "estimated_spend_per_person",
+    "estimated_subtotal",
+    "estimated_total_with_fee",
+)
+_EXTRACTORS: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+    "find_restaurants": lambda result: {"restaurants": result.get("results", [])},
+    "make_reservation": lambda result: {key: result.get(key) for key in _RESERVATION_FIELDS},
+    "get_my_bookings": lambda result: {"bookings": result.get("bookings", [])},
+    "get_daily_offers": lambda result: {"offers": result.get("offers", [])},
+}
+
+# Compact encoding for tool messages; also accepts NumPy scalars/arrays
+TOOL_RESULT_JSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _dump_tool_result(result: Dict[str, Any]) -> str:
+    """Serialize a tool result for the tool message sent back to the model."""
+    return orjson.dumps(result, option=TOOL_RESULT_JSON_OPTIONS).decode()
+
+
+def _is_batched_offers_call(name: str, arguments: Dict[str, Any]) -> bool:
+    """Whether a call joins the turn's batched get_daily_offers lookup."""
+    return name == "get_daily_offers" and isinstance(arguments.get("restaurant_id"), int)
+
+
+# Opening of a JSON-mode reply up to the first character of its "summary" value
+_SUMMARY_START_RE = re.compile(r'\s*\{\s*"summary"\s*:\s*"')
+# Longest run of complete JSON string characters (stops at the closing quote
+# or at an escape sequence that has not fully arrived yet)
+_JSON_STRING_PREFIX_RE = re.compile(r'(?:[^"\\]|\\u[0-9a-fA-F]{4}|\\[^u])*')
+
+
+def partial_summary(text: str) -> Optional[str]:
+    """
+    Decode as much of a streaming reply's "summary" value as has arrived.
+
+    Returns None until the reply is known to open with a "summary" string,
+    so callers never see raw JSON while it streams.
+    """
+    start = _SUMMARY_START_RE.match(text)
+    if not start:
+        return None
+
+    raw = _JSON_STRING_PREFIX_RE.match(text, start.end()).group()
+    try:
+        decoded = json.loads(f'"{raw}"', strict=False)
+    except json.JSONDecodeError:
+        return None
+    # Drop a high surrogate whose low half is still in flight
+    if decoded and "\ud800" <= decoded[-1] <= "\udbff":
+        decoded = decoded[:-1]
+    return decoded or None
+
+
+# Routes requests sharing the static prompt prefix to the same prompt cache
+PROMPT_CACHE_KEY = os.getenv("PROMPT_CACHE_KEY", "goodfoods-orchestrator")
+
+# HTTP/2 needs the optional ``h2`` package (``httpx[http2]``)
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+OPENAI_MAX_CONNECTIONS = 200
+OPENAI_MAX_KEEPALIVE_CONNECTIONS = 100
+OPENAI_HTTP_TIMEOUT = 30.0
+
+
+@lru_cache(maxsize=None)
+def _get_openai_client(api_key: str):
+    """Return the process-wide OpenAI client, sharing one HTTP connection pool."""
+    # Imported on first use: the SDK dominates this module's import time
+    import httpx
+    from openai import OpenAI
+
+    http_client = httpx.Client(
+        http2=_HTTP2_AVAILABLE,
+        limits=httpx.Limits(
+            max_connections=OPENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+        ),
+        timeout=OPENAI_HTTP_TIMEOUT,
+    )
+    return OpenAI(api_key=api_key, http_client=http_client)
+
+
+# Share of the history token budget actually filled, leaving headroom for
+# tokenizer drift and the per-request framing the API adds.
+HISTORY_TOKEN_SAFETY = 0.9
+# Fixed per-message overhead (role + separators) in chat-format token counts.
+MESSAGE_TOKEN_OVERHEAD = 4
+
+
+@lru_cache(maxsize=None)
+def _get_encoding(model: str):
+    """Return the tiktoken encoding for a model, or None if unavailable."""
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+    except Exception as exc:  # pragma: no cover - offline tokenizer download
+        print(f"Warning: Falling back to approximate token counts: {exc}")
+        return None
+
+
+@lru_cache(maxsize=1024)
+def _count_text_tokens(text: str, model: str) -> int:
+    """Count tokens in text, approximating 4 characters per token as fallback."""
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text))
+
 
 class OrchestratorAgent:
     """
@@ -59,7 +186,7 @@ class OrchestratorAgent:
         if not api_key:
             raise ValueError("OPENAI_API_KEY not found in environment variables")
 
-        self.client = OpenAI(api_key=api_key)
+        self.client = _get_openai_client(api_key)
         self.model = os.getenv("DEFAULT_MODEL", "gpt-4o-mini")
 
         self.system_prompt = get_orchestrator_system_prompt(
@@ -74,61 +201,79 @@ class OrchestratorAgent:
         ]
         # Keep at least 5 prior conversational turns by default
         self.max_history_turns = int(os.getenv("CHAT_HISTORY_TURNS", "3"))
+        # Token budget for everything sent besides the system prompt
+        self.max_history_tokens = int(os.getenv("CHAT_HISTORY_TOKENS", "8000"))
+        # The opening request usually carries the guest's intent; keep it pinned
+        self._first_user_message: Optional[Dict[str, Any]] = None
+        # Conversation-log rows buffered during a turn, flushed in one commit
+        self._pending_log: List[Tuple[str, str, Optional[str]]] = []
 
     def process_message(self, user_message: str) -> Dict[str, Any]:
         """
         Process user message and return response.
         """
-        self.messages.append({"role": "user", "content": user_message})
-        self._trim_history()
+        *_, final = self._run_turn(user_message, stream=False)
+        final.pop("done")
+        return final
 
+    def stream_message(self, user_message: str) -> Iterator[Dict[str, Any]]:
+        """
+        Process user message, yielding the reply as it is generated.
+
+        Yields ``{"delta": text}`` frames while the final completion streams,
+        then one ``{"done": True, ...}`` frame carrying the same fields that
+        ``process_message`` returns.
+        """
+        return self._run_turn(user_message, stream=True)
+
+    def _run_turn(self, user_message: str, stream: bool) -> Iterator[Dict[str, Any]]:
+        """Run one turn, flushing buffered log rows once it finishes."""
         try:
-            save_conversation_message(
-                self.db_path,
-                self.customer_id,
-                "user",
-                user_message,
-            )
-        except Exception as exc:  # pragma: no cover - logging only
-            print(f"Warning: Failed to log user message: {exc}")
+            yield from self._process_message(user_message, stream)
+        finally:
+            self._flush_log()
+
+    def _process_message(self, user_message: str, stream: bool) -> Iterator[Dict[str, Any]]:
+        """Run one conversational turn; log rows are flushed by the caller."""
+        message = {"role": "user", "content": user_message}
+        if self._first_user_message is None:
+            self._first_user_message = message
+        self.messages.append(message)
+
+        self._log("user", user_message)
 
         try:
             response = self.client.chat.completions.create(
-                model=self.model,
-                messages=self.messages,
-                tools=TOOL_SCHEMAS,
+                **self._completion_request(),
                 tool_choice="auto",
             )
         except Exception as exc:
-            return {
+            yield {
+                "done": True,
                 "text": f"I apologize, but I encountered an error: {exc}. Please try again.",
                 "error": str(exc),
             }
+            return
 
         assistant_message = response.choices[0].message
 
         if assistant_message.tool_calls:
-            return self._handle_tool_calls(assistant_message)
+            yield from self._handle_tool_calls(assistant_message, stream)
+            return
 
         response_text = assistant_message.content
+        if response_text:
+            yield {"delta": response_text}
         self.messages.append({"role": "assistant", "content": response_text})
 
-        try:
-            save_conversation_message(
-                self.db_path,
-                self.customer_id,
-                "assistant",
-                response_text,
-            )
-        except Exception as exc:  # pragma: no cover - logging only
-            print(f"Warning: Failed to log assistant message: {exc}")
+        self._log("assistant", response_text)
 
         parsed_json = self._try_parse_json(response_text)
 
         self._trim_history()
-        return {"text": response_text, "json": parsed_json}
+        yield {"done": True, "text": response_text, "json": parsed_json}
 
-    def _handle_tool_calls(self, assistant_message) -> Dict[str, Any]:
+    def _handle_tool_calls(self, assistant_message, stream: bool) -> Iterator[Dict[str, Any]]:
         """
         Handle tool calls from the assistant.
         """
@@ -152,91 +297,234 @@ class OrchestratorAgent:
 
         tool_results = []
 
-        for tool_call in assistant_message.tool_calls:
-            function_name = tool_call.function.name
-            arguments = json.loads(tool_call.function.arguments)
-
-            result = execute_tool(
-                function_name,
-                arguments,
-                self.db_path,
-                self.customer_id,
-                self.user_lat,
-                self.user_lon,
-            )
+        calls = [
+            (tool_call.function.name, orjson.loads(tool_call.function.arguments))
+            for tool_call in assistant_message.tool_calls
+        ]
+        results = self._run_tools(calls)
 
+        for tool_call, (function_name, _), result in zip(
+            assistant_message.tool_calls, calls, results
+        ):
             self.messages.append(
                 {
                     "role": "tool",
                     "tool_call_id": tool_call.id,
                     "name": function_name,
-                    "content": json.dumps(result),
+                    "content": _dump_tool_result(result),
                 }
             )
 
             tool_results.append({"tool": function_name, "result": result})
 
-        final_response = self.client.chat.completions.create(
-            model=self.model,
-            messages=self.messages,
-        )
-
-        response_text = final_response.choices[0].message.content
+        if all(result.get("code") == "invalid_args" for result in results):
+            # Nothing ran; ask for the missing details without another model call
+            response_text = format_clarification_response(results)
+            yield {"delta": response_text}
+        else:
+            response_text = yield from self._final_completion(stream)
         self.messages.append({"role": "assistant", "content": response_text})
-        self._trim_history()
 
         tool_names = [tr["tool"] for tr in tool_results]
         tool_used_str = ", ".join(tool_names) if tool_names else None
 
-        try:
-            save_conversation_message(
-                self.db_path,
-                self.customer_id,
-                "assistant",
-                response_text,
-                tool_used=tool_used_str,
-            )
-        except Exception as exc:  # pragma: no cover - logging only
-            print(f"Warning: Failed to log assistant message with tools: {exc}")
+        self._log("assistant", response_text, tool_used=tool_used_str)
 
         structured_data = self._extract_structured_data(tool_results)
 
         parsed_json = self._try_parse_json(response_text)
 
         self._trim_history()
-        return {"text": response_text, "json": parsed_json, "tool_results": tool_results, **structured_data}
+        yield {
+            "done": True,
+            "text": response_text,
+            "json": parsed_json,
+            "tool_results": tool_results,
+            **structured_data,
+        }
+
+    def _completion_request(self) -> Dict[str, Any]:
+        """
+        Arguments shared by every completion call.
+
+        The static system prompt and tool schemas form an identical prefix
+        on each call, which is what provider-side prompt caching matches on.
+        """
+        return {
+            "model": self.model,
+            "messages": self.messages,
+            "tools": TOOL_SCHEMAS,
+            "extra_body": {"prompt_cache_key": PROMPT_CACHE_KEY},
+        }
+
+    def _final_completion(self, stream: bool) -> Generator[Dict[str, str], None, str]:
+        """
+        Request the summarizing reply after tool results, yielding deltas.
+
+        Returns the full reply text. Tool-calling turns may carry no content,
+        so JSON mode is only enforced on this final call.
+        """
+        request = {
+            **self._completion_request(),
+            # Tools stay in the request so the cached prefix matches the
+            # first call; "none" stops the model from calling them again.
+            "tool_choice": "none",
+            "response_format": {"type": "json_object"},
+        }
+        if not stream:
+            response_text = self.client.chat.completions.create(**request).choices[0].message.content
+            if response_text:
+                yield {"delta": response_text}
+            return response_text
+
+        parts: List[str] = []
+        for chunk in self.client.chat.completions.create(**request, stream=True):
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                parts.append(delta)
+                yield {"delta": delta}
+        return "".join(parts)
+
+    def _log(self, role: str, content: Optional[str], tool_used: Optional[str] = None) -> None:
+        """Buffer a conversation-log row; blank messages are not persisted."""
+        if content and content.strip():
+            self._pending_log.append((role, content, tool_used))
+
+    def _flush_log(self) -> None:
+        """Write all buffered conversation-log rows in one transaction."""
+        if not self._pending_log:
+            return
+        rows, self._pending_log = self._pending_log, []
+        try:
+            save_conversation_messages(self.db_path, self.customer_id, rows)
+        except Exception as exc:  # pragma: no cover - logging only
+            print(f"Warning: Failed to log conversation turn: {exc}")
+
+    def _run_tools(self, calls: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Execute tool calls concurrently, returning results in call order.
+
+        Identical calls (same name and arguments) within the turn run once
+        and share a result, and get_daily_offers calls for restaurant IDs
+        are batched into one lookup. A single unit of work runs inline to avoid the thread
+        hand-off. Each unit borrows its own pooled connection so concurrent
+        tools never share one.
+        """
+        def run(unit: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+            context = (self.db_path, self.customer_id, self.user_lat, self.user_lon)
+            with get_pooled_connection(self.db_path) as conn:
+                if len(unit) == 1:
+                    name, arguments = unit[0]
+                    return [execute_tool(name, arguments, *context, conn=conn)]
+                return execute_tools(unit, *context, conn=conn)
+
+        unique: Dict[Tuple[str, bytes], Tuple[str, Dict[str, Any]]] = {}
+        keys = []
+        for name, arguments in calls:
+            key = (name, orjson.dumps(arguments, option=orjson.OPT_SORT_KEYS))
+            unique.setdefault(key, (name, arguments))
+            keys.append(key)
+
+        offer_keys = [key for key in unique if _is_batched_offers_call(*unique[key])]
+        unit_keys = [[key] for key in unique if key not in offer_keys]
+        if offer_keys:
+            unit_keys.append(offer_keys)
+        units = [[unique[key] for key in unit] for unit in unit_keys]
+
+        if len(units) <= 1:
+            unit_results = [run(unit) for unit in units]
+        else:
+            unit_results = list(_TOOL_EXECUTOR.map(run, units))
+        by_key = {
+            key: result
+            for unit, results in zip(unit_keys, unit_results)
+            for key, result in zip(unit, results)
+        }
+        return [by_key[key] for key in keys]
 
     @staticmethod
     def _try_parse_json(content: str) -> Optional[Dict[str, Any]]:
         """
-        Attempt to parse the assistant response as JSON.
-        Returns None if parsing fails.
+        Parse the assistant response as JSON.
+
+        Final tool-turn replies are JSON-mode constrained; direct replies
+        are not, so None is returned if parsing fails.
         """
         try:
             return json.loads(content)
         except (TypeError, json.JSONDecodeError):
             return None
 
-    def _trim_history(self) -> None:
-        """Keep only the most recent conversation turns to reduce latency."""
-        if self.max_history_turns <= 0 or len(self.messages) <= 1:
-            return
+    def _count_message_tokens(self, message: Dict[str, Any]) -> int:
+        """Approximate the prompt tokens a chat message costs."""
+        tokens = MESSAGE_TOKEN_OVERHEAD
+        if message.get("content"):
+            tokens += _count_text_tokens(message["content"], self.model)
+        for tool_call in message.get("tool_calls") or []:
+            function = tool_call["function"]
+            tokens += _count_text_tokens(function["name"] + function["arguments"], self.model)
+        return tokens
 
-        system_message = self.messages[0]
-        others = self.messages[1:]
+    def _trim_history(self) -> None:
+        """
+        Keep the most recent turns that fit the token budget and turn cap.
 
-        kept: List[Dict[str, Any]] = []
-        counted_turns = 0
+        The window always starts on a user message, so tool results stay with
+        the assistant message that requested them, and the latest turn is kept
+        even if it alone exceeds the budget. The guest's first message is
+        re-attached ahead of the window while it still fits.
+        """
+        turn_cap = self.max_history_turns if self.max_history_turns > 0 else None
+        token_cap = self.max_history_tokens if self.max_history_tokens > 0 else None
+        if (turn_cap is None and token_cap is None) or len(self.messages) <= 1:
+            return
 
-        for message in reversed(others):
-            kept.append(message)
-            if message["role"] in {"user", "assistant"}:
-                counted_turns += 1
-            if counted_turns >= self.max_history_turns * 2:
+        messages = self.messages
+        pinned = self._first_user_message
+        # The pinned message, when still kept, always sits right after the system prompt
+        first = 2 if pinned is not None and len(messages) > 1 and messages[1] is pinned else 1
+
+        budget = None
+        if token_cap is not None:
+            budget = int(token_cap * HISTORY_TOKEN_SAFETY)
+
+        start = len(messages)
+        used_tokens = 0
+        kept_tokens = 0
+        turns = 0
+
+        for index in range(len(messages) - 1, first - 1, -1):
+            used_tokens += self._count_message_tokens(messages[index])
+            if messages[index]["role"] != "user":
+                continue
+            turns += 1
+            if start < len(messages) and (
+                (turn_cap is not None and turns > turn_cap)
+                or (budget is not None and used_tokens > budget)
+            ):
                 break
+            start = index
+            kept_tokens = used_tokens
+        else:
+            # Leading messages belong to the pinned message's turn; keep them
+            # (with it) when they fit or when that turn is still the current one.
+            pinned_tokens = self._count_message_tokens(pinned) if first == 2 else 0
+            if turns == 0 or budget is None or used_tokens + pinned_tokens <= budget:
+                start = first
+                kept_tokens = used_tokens
+
+        keep_pinned = pinned is not None and (
+            turns == 0
+            or budget is None
+            or kept_tokens + self._count_message_tokens(pinned) <= budget
+        )
+        if start == first and (first == 2) == keep_pinned:
+            return  # Nothing to drop
 
-        kept.reverse()
-        self.messages = [system_message] + kept
+        head = [messages[0], pinned] if keep_pinned else [messages[0]]
+        self.messages = head + messages[start:]
 
     def _extract_structured_data(self, tool_results: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
@@ -245,28 +533,17 @@ class OrchestratorAgent:
         data: Dict[str, Any] = {}
 
         for tool_result in tool_results:
-            tool_name = tool_result["tool"]
+            extractor = _EXTRACTORS.get(tool_result["tool"])
             result = tool_result["result"]
-
-            if tool_name == "find_restaurants" and result.get("status") == "success":
-                data["restaurants"] = result.get("results", [])
-            elif tool_name == "make_reservation" and result.get("status") == "success":
-                data["reservation"] = result.get("reservation")
-                data["restaurant"] = result.get("restaurant")
-                data["reservation_fee"] = result.get("reservation_fee")
-                data["estimated_spend_per_person"] = result.get("estimated_spend_per_person")
-                data["estimated_subtotal"] = result.get("estimated_subtotal")
-                data["estimated_total_with_fee"] = result.get("estimated_total_with_fee")
-            elif tool_name == "get_my_bookings" and result.get("status") == "success":
-                data["bookings"] = result.get("bookings", [])
-            elif tool_name == "get_daily_offers" and result.get("status") == "success":
-                data["offers"] = result.get("offers", [])
+            if extractor is not None and result.get("status") == "success":
+                data.update(extractor(result))
 
         return data
 
     def reset_conversation(self) -> None:
         """Reset conversation history (keep system prompt)."""
         self.messages = [{"role": "system", "content": self.system_prompt}]
+        self._first_user_message = None
 
     def get_conversation_history(self) -> List[Dict[str, Any]]:
         """Get current conversation history."""
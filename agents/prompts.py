@@ -2,31 +2,15 @@
 System prompts and templates for AI agents.
 """
 
+import json
+import time
 from datetime import datetime
+from functools import lru_cache
+from typing import Tuple
 
 
-def get_orchestrator_system_prompt(
-    customer_name: str,
-    customer_phone: str,
-    user_lat: float,
-    user_lon: float
-) -> str:
-    """
-    Generate system prompt for the orchestrator agent.
-
-    Args:
-        customer_name: Customer's name
-        customer_phone: Customer's phone number
-        user_lat: User's latitude
-        user_lon: User's longitude
-
-    Returns:
-        System prompt string
-    """
-    current_date = datetime.now().strftime("%Y-%m-%d")
-    current_day = datetime.now().strftime("%A")
-
-    prompt = f"""You are the GoodFoods concierge — a polished booking expert that curates cafés, breakfast clubs, handmade Italian kitchens, Chettinad dinner studios, wine lounges, and dessert ateliers across Chennai.
+# Static part of the orchestrator prompt, built once at import.
+_STATIC_ORCHESTRATOR_PROMPT = """You are the GoodFoods concierge — a polished booking expert that curates cafés, breakfast clubs, handmade Italian kitchens, Chettinad dinner studios, wine lounges, and dessert ateliers across Chennai.
 
 **About GoodFoods Chennai**
 - 75 GoodFoods destinations across Chennai (T. Nagar, Besant Nagar, Alwarpet, OMR, ECR, Anna Nagar, Velachery, Guindy, Tambaram, Porur, Nungambakkam, etc.)
@@ -34,8 +18,6 @@ def get_orchestrator_system_prompt(
 - Every destination publishes live table availability, parking indicators, and alfresco cues.
 - Guests love to explore first, then reserve — guide them warmly with Chennai's signature hospitality.
 
-**Guest:** {customer_name} ({customer_phone}) | **Today:** {current_day}, {current_date}
-
 **Your Tools**
 1. **find_restaurants_by_area(area_name)** — Use when the guest names a neighbourhood (e.g., "Besant Nagar", "Alwarpet", "OMR").
 2. **find_restaurants()** — Use for proximity-based discovery when no area is specified or when they ask for "near me" options.
@@ -75,27 +57,97 @@ def get_orchestrator_system_prompt(
 **Response Format**
 - ALWAYS reply with valid JSON only (no additional text, no markdown).
 - Base structure:
-  {{
+  {
     "summary": "<short overview>",
     "options": [
-      {{
+      {
         "title": "<option title>",
         "subtitle": "<quick subtitle or cuisine>",
         "distance_km": <number or null>,
         "details": "<one or two sentence highlight>",
         "attributes": ["<bullet point>", ...]
-      }},
+      },
       ...
     ],
     "next_steps": "<clear call-to-action or question>"
-  }}
+  }
 - Omit fields that are not relevant by setting them to null or an empty list.
 - Keep `summary` ≤ 2 sentences and each option concise (≤ 2 sentences).
 - When no options are available, return an empty list and use `summary`/`next_steps` to guide the user.
 
 **Tone:** Sophisticated yet friendly Tamil hospitality — delight, don't push. Keep each response concise (ideally under 80 words) unless the guest explicitly asks for more detail."""
 
-    return prompt
+
+def get_orchestrator_system_prompt(
+    customer_name: str,
+    customer_phone: str,
+    user_lat: float,
+    user_lon: float
+) -> str:
+    """
+    Generate system prompt for the orchestrator agent.
+
+    The long static instructions come first and the guest/date header last,
+    so the prompt prefix stays byte-identical across sessions and days.
+
+    Args:
+        customer_name: Customer's name
+        customer_phone: Customer's phone number
+        user_lat: User's latitude
+        user_lon: User's longitude
+
+    Returns:
+        System prompt string
+    """
+    current_day, current_date = _today_strings(int(time.time()) // 60)
+    return _build_orchestrator_prompt(
+        customer_name,
+        customer_phone,
+        current_day,
+        current_date,
+    )
+
+
+@lru_cache(maxsize=2)
+def _today_strings(minute_bucket: int) -> Tuple[str, str]:
+    """Return (weekday, YYYY-MM-DD) for now, formatted at most once a minute."""
+    now = datetime.now()
+    return now.strftime("%A"), now.strftime("%Y-%m-%d")
+
+
+@lru_cache(maxsize=256)
+def _build_orchestrator_prompt(
+    customer_name: str,
+    customer_phone: str,
+    current_day: str,
+    current_date: str
+) -> str:
+    """Append the per-guest header to the static prompt (memoized per day)."""
+    return (
+        f"{_STATIC_ORCHESTRATOR_PROMPT}\n\n"
+        f"**Guest:** {customer_name} ({customer_phone}) | **Today:** {current_day}, {current_date}"
+    )
+
+
+def format_clarification_response(tool_results: list) -> str:
+    """
+    Build the JSON reply asking the guest to fix invalid booking details.
+
+    Used instead of a second model call when every tool call in a turn
+    failed argument preflight.
+
+    Args:
+        tool_results: Tool result dicts with ``code == "invalid_args"``
+
+    Returns:
+        JSON string in the concierge response format
+    """
+    questions = list(dict.fromkeys(result["message"] for result in tool_results))
+    return json.dumps({
+        "summary": "Almost there — I just need a few booking details confirmed.",
+        "options": [],
+        "next_steps": " ".join(questions),
+    }, ensure_ascii=False)
 
 
 def format_restaurant_card(restaurant: dict) -> str:
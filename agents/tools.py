@@ -6,26 +6,34 @@ Each tool has:
 2. Implementation function (actual logic)
 """
 
+import copy
 import os
+import sqlite3
 import sys
+import threading
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
 from datetime import datetime
 
+from cachetools import LRUCache, TTLCache
+
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from database.db_manager import (
     get_restaurants,
     get_restaurant_by_id,
-    create_reservation,
+    reserve_table,
     cancel_reservation as db_cancel_reservation,
     get_customer_reservations,
+    get_reservation_for_customer,
     get_active_offers,
+    get_active_offers_for_restaurants,
+    has_any_active_offers,
     create_feedback,
-    get_connection
+    get_write_stamp
 )
-from utils.geo_utils import filter_by_distance
 from utils.validators import (
     validate_date,
     validate_time_slot,
@@ -40,8 +48,39 @@ PRICE_BAND_ESTIMATES = {
     "₹₹₹": 1800,
     "₹₹₹₹": 2500
 }
+# Same estimates keyed on the number of ₹ glyphs in a price band
+_PRICE_LEN_TO_EST = {len(band): estimate for band, estimate in PRICE_BAND_ESTIMATES.items()}
+DEFAULT_SPEND_PER_PERSON = 1200
 RESERVATION_FEE = 50  # ₹50 convenience/holding charge
 
+# Short-lived cache of search results; only table counts move minute to minute
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", "30"))
+_SEARCH_CACHE: TTLCache = TTLCache(maxsize=256, ttl=SEARCH_CACHE_TTL)
+_SEARCH_CACHE_LOCK = threading.Lock()  # tools run on worker threads
+# Searches snap the user's position to ~1 m (5 decimal places) so GPS jitter
+# still hits the cache; both coordinates stay in the key
+SEARCH_COORD_DECIMALS = 5
+
+# Offers only change when the database is written, so per-restaurant offer
+# lookups are kept for the day and keyed on the database files' mtimes
+_OFFERS_CACHE: LRUCache = LRUCache(maxsize=512)
+_OFFERS_CACHE_LOCK = threading.Lock()
+
+# Revenue-ops copy attached to search results
+YIELD_HINTS = {
+    "surge": "High demand window – consider premium pricing or two-turn seating.",
+    "discount": "Plenty of inventory – trigger lunch bundles or limited-time discounts.",
+    "steady": "Steady flow – standard pricing applies.",
+}
+ENTERPRISE_HINT = "Suitable for corporate dining or private events."
+
+
+def estimate_spend_per_person(price_range: Optional[str]) -> int:
+    """Estimated spend per guest (₹) for a price band like "₹₹"."""
+    if not price_range:
+        return DEFAULT_SPEND_PER_PERSON
+    return _PRICE_LEN_TO_EST.get(price_range.count("₹"), DEFAULT_SPEND_PER_PERSON)
+
 
 def annotate_revenue_ops(restaurant: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -54,59 +93,121 @@ def annotate_revenue_ops(restaurant: Dict[str, Any]) -> Dict[str, Any]:
       - enterprise_fit: bool
       - enterprise_hint: optional text
     """
-    result = restaurant.copy()
-
-    capacity = max(result.get("total_capacity", 60), 1)
-    available = result.get("available_tables", 0)
-    utilisation = 1 - (available / capacity)
+    capacity = max(restaurant.get("total_capacity", 60), 1)
+    available = restaurant.get("available_tables", 0)
 
     if available <= max(2, int(capacity * 0.1)):
-        result["yield_signal"] = "surge"
-        result["yield_hint"] = "High demand window – consider premium pricing or two-turn seating."
+        yield_signal, yield_hint = "surge", YIELD_HINTS["surge"]
     elif available >= int(capacity * 0.5):
-        result["yield_signal"] = "discount"
-        result["yield_hint"] = "Plenty of inventory – trigger lunch bundles or limited-time discounts."
+        yield_signal, yield_hint = "discount", YIELD_HINTS["discount"]
     else:
-        result["yield_signal"] = "steady"
-        result["yield_hint"] = "Steady flow – standard pricing applies."
+        yield_signal, yield_hint = "steady", YIELD_HINTS["steady"]
 
-    rating = result.get("rating", 0)
+    rating = restaurant.get("rating", 0)
     if rating >= 4.7 and available >= 4:
-        result["sponsored_bid"] = 80  # ₹ per confirmed reservation
+        sponsored_bid = 80  # ₹ per confirmed reservation
     elif rating >= 4.5:
-        result["sponsored_bid"] = 60
+        sponsored_bid = 60
     else:
-        result["sponsored_bid"] = None
+        sponsored_bid = None
+
+    return {
+        **restaurant,
+        "yield_signal": yield_signal,
+        "yield_hint": yield_hint,
+        "sponsored_bid": sponsored_bid,
+        **_static_annotations(
+            restaurant.get("total_capacity", 0),
+            restaurant.get("cuisine"),
+            restaurant.get("price_range"),
+        ),
+    }
+
+
+@lru_cache(maxsize=1024)
+def _static_annotations(
+    total_capacity: int,
+    cuisine: Optional[str],
+    price_range: Optional[str]
+) -> Dict[str, Any]:
+    """
+    Enterprise-fit and spend-estimate fields, which depend only on a
+    restaurant's fixed attributes and so are computed once per distinct set.
+
+    The returned dict is shared; merge it, never mutate it.
+    """
+    cuisine = (cuisine or "").lower()
+    enterprise_fit = total_capacity >= 90 or "dinner" in cuisine or "wine" in cuisine
+    estimated_per_person = estimate_spend_per_person(price_range)
+    return {
+        "enterprise_fit": enterprise_fit,
+        "enterprise_hint": ENTERPRISE_HINT if enterprise_fit else None,
+        "estimated_spend_per_person": estimated_per_person,
+        "estimated_spend_for_two": estimated_per_person * 2,
+        "estimated_spend_hint": (
+            f"Typical spend ~₹{estimated_per_person} per guest (₹{estimated_per_person * 2} for two)."
+        ),
+    }
+
+
+def annotate_revenue_ops_batch(restaurants: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Annotate a list of restaurants in one pass (same fields as
+    ``annotate_revenue_ops``).
+
+    Yield signals and sponsored bids are computed with vectorized NumPy
+    comparisons over the whole batch instead of per-row branching; the
+    static fields come from the shared ``_static_annotations`` cache.
+    """
+    if not restaurants:
+        return []
+
+    import numpy as np
 
-    cuisine = (result.get("cuisine") or "").lower()
-    enterprise_fit = (
-        result.get("total_capacity", 0) >= 90
-        or "dinner" in cuisine
-        or "wine" in cuisine
+    count = len(restaurants)
+    capacity = np.maximum(np.fromiter(
+        (r.get("total_capacity", 60) for r in restaurants), dtype=np.int64, count=count
+    ), 1)
+    available = np.fromiter(
+        (r.get("available_tables", 0) for r in restaurants), dtype=np.int64, count=count
     )
-    result["enterprise_fit"] = enterprise_fit
-    if enterprise_fit:
-        result["enterprise_hint"] = "Suitable for corporate dining or private events."
-    else:
-        result["enterprise_hint"] = None
-
-    # Estimated spend guidance
-    price_key = result.get("price_range", "₹₹")
-    estimated_per_person = PRICE_BAND_ESTIMATES.get(price_key, 1200)
-    result["estimated_spend_per_person"] = estimated_per_person
-    result["estimated_spend_for_two"] = estimated_per_person * 2
-    result["estimated_spend_hint"] = (
-        f"Typical spend ~₹{estimated_per_person} per guest (₹{estimated_per_person * 2} for two)."
+    rating = np.fromiter(
+        (r.get("rating", 0) for r in restaurants), dtype=np.float64, count=count
     )
 
-    return result
+    surge_mask = available <= np.maximum(2, (capacity * 0.1).astype(np.int64))
+    discount_mask = available >= (capacity * 0.5).astype(np.int64)
+    yield_signals = np.select(
+        [surge_mask, discount_mask], ["surge", "discount"], default="steady"
+    ).tolist()
+
+    # 0 marks "no bid"; converted to None below
+    bids = np.where(
+        (rating >= 4.7) & (available >= 4), 80, np.where(rating >= 4.5, 60, 0)
+    ).tolist()
+
+    annotated = []
+    for restaurant, yield_signal, bid in zip(restaurants, yield_signals, bids):
+        annotated.append({
+            **restaurant,
+            "yield_signal": yield_signal,
+            "yield_hint": YIELD_HINTS[yield_signal],
+            "sponsored_bid": bid or None,
+            **_static_annotations(
+                restaurant.get("total_capacity", 0),
+                restaurant.get("cuisine"),
+                restaurant.get("price_range"),
+            ),
+        })
+    return annotated
 
 
 # ============================================================
 # Tool Schemas for OpenAI
 # ============================================================
 
-TOOL_SCHEMAS = [
+# Module-level tuple: built once at import, shared read-only by every request
+TOOL_SCHEMAS = (
     {
         "type": "function",
         "function": {
@@ -280,7 +381,7 @@ TOOL_SCHEMAS = [
             }
         }
     }
-]
+)
 
 
 # ============================================================
@@ -297,79 +398,151 @@ def find_restaurants(
     min_rating: float = None,
     price_range: str = None,
     has_parking: bool = None,
-    has_offers: bool = None
+    has_offers: bool = None,
+    conn: Optional[sqlite3.Connection] = None
 ) -> Dict[str, Any]:
     """
     Find restaurants based on criteria.
 
+    Successful results are cached for SEARCH_CACHE_TTL seconds per set of
+    arguments (coordinates rounded to SEARCH_COORD_DECIMALS); each caller
+    gets its own copy.
+
     Args:
         location_name: Area/location name to search (e.g., "Besant Nagar")
 
     Returns:
         Dict with status, message, and results
     """
+    user_lat = round(user_lat, SEARCH_COORD_DECIMALS)
+    user_lon = round(user_lon, SEARCH_COORD_DECIMALS)
+    key = (
+        db_path,
+        user_lat,
+        user_lon,
+        location_name.lower() if location_name else None,
+        cuisine,
+        max_distance_km,
+        min_rating,
+        price_range,
+        has_parking,
+        has_offers,
+    )
+    with _SEARCH_CACHE_LOCK:
+        result = _SEARCH_CACHE.get(key)
+
+    if result is None:
+        result = _search_restaurants(
+            db_path,
+            user_lat,
+            user_lon,
+            location_name=location_name,
+            cuisine=cuisine,
+            max_distance_km=max_distance_km,
+            min_rating=min_rating,
+            price_range=price_range,
+            has_parking=has_parking,
+            has_offers=has_offers,
+            conn=conn
+        )
+        if result["status"] != "success":
+            return result
+        with _SEARCH_CACHE_LOCK:
+            _SEARCH_CACHE[key] = result
+
+    return copy.deepcopy(result)
+
+
+def clear_search_cache() -> None:
+    """Drop cached search results (e.g. after table availability changes)."""
+    with _SEARCH_CACHE_LOCK:
+        _SEARCH_CACHE.clear()
+
+
+def _search_restaurants(
+    db_path: str,
+    user_lat: float,
+    user_lon: float,
+    location_name: str = None,
+    cuisine: str = None,
+    max_distance_km: float = 10.0,
+    min_rating: float = None,
+    price_range: str = None,
+    has_parking: bool = None,
+    has_offers: bool = None,
+    conn: Optional[sqlite3.Connection] = None
+) -> Dict[str, Any]:
+    """Run an uncached restaurant search (see find_restaurants)."""
     try:
         today = datetime.now().strftime('%Y-%m-%d')
-        conn = get_connection(db_path)
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT restaurant_id, offer_title
-            FROM daily_offers
-            WHERE is_active = 1
-              AND valid_from <= ?
-              AND valid_until >= ?
-        """, (today, today))
-        offer_rows = cursor.fetchall()
-        conn.close()
-
-        offers_map: Dict[int, List[str]] = {}
-        for restaurant_id, title in offer_rows:
-            offers_map.setdefault(restaurant_id, []).append(title)
-
-        # Get restaurants from database with filters
-        base_restaurants = get_restaurants(
+
+        # Proximity searches only load rows inside the radius' bounding box
+        # (R*Tree); the exact distance check runs on those candidates below
+        bbox = None
+        if not location_name:
+            from utils.geo_utils import bounding_box
+            bbox = bounding_box(user_lat, user_lon, max_distance_km)
+
+        # Get restaurants from database with all filters applied in SQL;
+        # area searches match the location against the name. Offers are only
+        # joined when filtering on them; otherwise the returned rows get their
+        # previews afterwards
+        restaurants = get_restaurants(
             db_path,
             cuisine=cuisine,
             min_rating=min_rating,
-            price_range=price_range
+            price_range=price_range,
+            name_like=location_name,
+            bbox=bbox,
+            offers_date=today if has_offers else None,
+            has_parking=has_parking,
+            has_offers=has_offers,
+            conn=conn
         )
 
-        for r in base_restaurants:
-            offer_titles = offers_map.get(r["id"])
-            r["has_active_offers"] = bool(offer_titles)
-            r["offer_preview"] = offer_titles[0] if offer_titles else None
-
-        restaurants = base_restaurants
+        # Too few area matches: load the wider list for nearby alternatives
+        fallback_pool: List[Dict[str, Any]] = []
+        if location_name and len(restaurants) < 3:
+            fallback_pool = get_restaurants(
+                db_path,
+                cuisine=cuisine,
+                min_rating=min_rating,
+                price_range=price_range,
+                offers_date=today if has_offers else None,
+                has_parking=has_parking,
+                has_offers=has_offers,
+                conn=conn
+            )
 
-        if not restaurants:
+        # (an empty proximity box falls through to the radius message below)
+        if not restaurants and not fallback_pool and bbox is None:
+            if has_offers:
+                requirement = " with active offers"
+            elif has_parking:
+                requirement = " with parking"
+            else:
+                requirement = ""
             return {
                 "status": "success",
-                "message": f"No {cuisine or ''} destinations found. Try expanding your search.",
+                "message": f"No {cuisine or ''} destinations{requirement} found. Try expanding your search.",
                 "results": []
             }
 
-        # Filter by location_name if provided (area-based search)
+        # Top up thin area results with the closest other destinations
         if location_name:
-            location_name_lower = location_name.lower()
-            restaurants = [r for r in restaurants if location_name_lower in r['name'].lower()]
-
             if len(restaurants) < 3:
-                from utils.geo_utils import calculate_distance
+                from utils.geo_utils import nearest_indices, restaurant_distances
                 existing_ids = {r["id"] for r in restaurants}
-                fallback_candidates = []
-                for candidate in base_restaurants:
-                    if candidate["id"] in existing_ids:
-                        continue
-                    distance = calculate_distance(user_lat, user_lon, candidate["latitude"], candidate["longitude"])
-                    candidate_copy = candidate.copy()
-                    candidate_copy["distance_km"] = round(distance, 2)
-                    candidate_copy["fallback_reason"] = f"Nearby alternative (~{distance:.1f} km)"
-                    fallback_candidates.append((distance, candidate_copy))
-
-                fallback_candidates.sort(key=lambda x: x[0])
-                needed = 3 - len(restaurants)
-                for _, candidate in fallback_candidates[:needed]:
-                    restaurants.append(candidate)
+                candidates = [c for c in fallback_pool if c["id"] not in existing_ids]
+                if candidates:
+                    distances = restaurant_distances(candidates, user_lat, user_lon)
+                    needed = 3 - len(restaurants)
+                    for i in nearest_indices(distances, needed).tolist():
+                        distance = float(distances[i])
+                        candidate = candidates[i]
+                        candidate["distance_km"] = distance
+                        candidate["fallback_reason"] = f"Nearby alternative (~{distance:.1f} km)"
+                        restaurants.append(candidate)
 
             if not restaurants:
                 return {
@@ -378,68 +551,56 @@ def find_restaurants(
                     "results": []
                 }
 
-        # Filter by offers if requested
-        if has_offers:
-            restaurants = [r for r in restaurants if r.get("has_active_offers")]
-            if not restaurants:
-                return {
-                    "status": "success",
-                    "message": f"No {cuisine or ''} destinations with active offers found. Try expanding your search.",
-                    "results": []
-                }
-
-        # Filter by parking if requested
-        if has_parking:
-            restaurants = [r for r in restaurants if r.get('has_parking') == 1]
-            if not restaurants:
-                return {
-                    "status": "success",
-                    "message": f"No {cuisine or ''} destinations with parking found. Try expanding your search.",
-                    "results": []
-                }
-
         # Filter by distance
         # BUT: If searching by location_name, don't filter by distance - show ALL outlets in that area
         if location_name:
-            # Just add distance without filtering
-            from utils.geo_utils import calculate_distance
-            restaurants_with_distance = []
-            for r in restaurants:
-                distance_km = r.get("distance_km")
-                if distance_km is None:
-                    distance_km = calculate_distance(user_lat, user_lon, r['latitude'], r['longitude'])
-                r_copy = r.copy()
-                r_copy['distance_km'] = round(distance_km, 2)
-                restaurants_with_distance.append(annotate_revenue_ops(r_copy))
+            # Just add distance without filtering; the rows are fresh from
+            # SQL and owned by this call, so set it in place
+            from utils.geo_utils import restaurant_distances
+            if restaurants:
+                distances = restaurant_distances(restaurants, user_lat, user_lon).tolist()
+                for r, computed in zip(restaurants, distances):
+                    r.setdefault('distance_km', computed)
+            restaurants_with_distance = annotate_revenue_ops_batch(restaurants)
 
             # Sort by distance for convenience
             restaurants_with_distance.sort(key=lambda x: x['distance_km'])
         else:
-            # For proximity search, filter by max_distance_km
-            restaurants_with_distance = filter_by_distance(
+            # For proximity search, filter by max_distance_km; as above, the
+            # rows belong to this call, so tag them in place instead of copying
+            from utils.geo_utils import filter_by_distance_view
+            restaurants_with_distance = []
+            for distance, r in filter_by_distance_view(
                 restaurants,
                 user_lat,
                 user_lon,
                 max_distance_km
-            )
-            restaurants_with_distance = [annotate_revenue_ops(r) for r in restaurants_with_distance]
+            ):
+                r['distance_km'] = distance
+                restaurants_with_distance.append(r)
+            restaurants_with_distance = annotate_revenue_ops_batch(restaurants_with_distance)
 
             if not restaurants_with_distance:
-                return {
-                    "status": "success",
-                    "message": f"No restaurants found within {max_distance_km}km. Try increasing the distance.",
-                    "results": [],
-                    "suggestion": f"Expand search to {max_distance_km + 5}km"
-                }
+                # No offers anywhere today, so a wider radius would not help
+                if has_offers and not has_any_active_offers(db_path, today, conn=conn):
+                    return {
+                        "status": "success",
+                        "message": f"No {cuisine or ''} destinations with active offers found. Try expanding your search.",
+                        "results": []
+                    }
+                return _nothing_within(max_distance_km)
 
         # When searching by location_name, show ALL outlets in that area
         # Otherwise, show top 5 to avoid overwhelming users
         result_limit = len(restaurants_with_distance) if location_name else 5
+        results = restaurants_with_distance[:result_limit]
+        if not has_offers:
+            _attach_offer_previews(db_path, results, today, conn=conn)
 
         return {
             "status": "success",
             "message": f"Found {len(restaurants_with_distance)} restaurants",
-            "results": restaurants_with_distance[:result_limit],
+            "results": results,
             "count": len(restaurants_with_distance)
         }
 
@@ -451,6 +612,34 @@ def find_restaurants(
         }
 
 
+def _attach_offer_previews(
+    db_path: str,
+    restaurants: List[Dict[str, Any]],
+    today: str,
+    conn: Optional[sqlite3.Connection] = None
+) -> None:
+    """Set has_active_offers / offer_preview on rows with one IN query."""
+    if not restaurants:
+        return
+    offers_by_id = get_active_offers_for_restaurants(
+        db_path, [r["id"] for r in restaurants], today, conn=conn
+    )
+    for restaurant in restaurants:
+        offers = offers_by_id[restaurant["id"]]
+        restaurant["has_active_offers"] = bool(offers)
+        restaurant["offer_preview"] = offers[0]["offer_title"] if offers else None
+
+
+def _nothing_within(max_distance_km: float) -> Dict[str, Any]:
+    """Empty proximity-search result suggesting a wider radius."""
+    return {
+        "status": "success",
+        "message": f"No restaurants found within {max_distance_km}km. Try increasing the distance.",
+        "results": [],
+        "suggestion": f"Expand search to {max_distance_km + 5}km"
+    }
+
+
 def make_reservation(
     db_path: str,
     customer_id: int,
@@ -458,7 +647,8 @@ def make_reservation(
     reservation_date: str,
     reservation_time: str,
     party_size: int,
-    special_requests: str = None
+    special_requests: str = None,
+    conn: Optional[sqlite3.Connection] = None
 ) -> Dict[str, Any]:
     """
     Create a new reservation.
@@ -487,7 +677,7 @@ def make_reservation(
             }
 
         # Check if restaurant exists and has tables
-        restaurant = get_restaurant_by_id(db_path, restaurant_id)
+        restaurant = get_restaurant_by_id(db_path, restaurant_id, conn=conn)
 
         if not restaurant:
             return {
@@ -511,24 +701,32 @@ def make_reservation(
             "special_requests": special_requests
         }
 
-        reservation_id = create_reservation(db_path, reservation_data)
+        booking = reserve_table(db_path, reservation_data, conn=conn)
+        if booking is None:
+            # The last table went to a concurrent booking after the check above
+            return {
+                "status": "error",
+                "message": f"{restaurant['name']} is fully booked. Please try a different time or restaurant."
+            }
+        clear_search_cache()  # available_tables just changed
+
+        reservation_id, tables_left = booking
 
         # Get full reservation details
         reservation_data['id'] = reservation_id
         reservation_data['status'] = 'confirmed'
 
-        # Re-fetch restaurant to get UPDATED available_tables count
-        restaurant = get_restaurant_by_id(db_path, restaurant_id)
+        # The booking transaction reported the live table count; no re-fetch needed
+        restaurant = {**restaurant, "available_tables": tables_left}
 
         # Check for offers
-        offers = get_active_offers(db_path, restaurant_id)
+        offers = get_active_offers(db_path, restaurant_id, conn=conn)
         offer_message = ""
         if offers:
             offer = offers[0]
             offer_message = f"\n\n💰 **Special Offer Available:** {offer['offer_title']} - {offer['offer_description']}"
 
-        price_key = restaurant.get("price_range", "₹₹")
-        estimated_per_person = PRICE_BAND_ESTIMATES.get(price_key, 1200)
+        estimated_per_person = estimate_spend_per_person(restaurant.get("price_range"))
         estimated_subtotal = estimated_per_person * party_size
         total_with_fee = estimated_subtotal + RESERVATION_FEE
 
@@ -557,7 +755,8 @@ def make_reservation(
 def cancel_reservation(
     db_path: str,
     customer_id: int,
-    reservation_id: int
+    reservation_id: int,
+    conn: Optional[sqlite3.Connection] = None
 ) -> Dict[str, Any]:
     """
     Cancel an existing reservation.
@@ -567,8 +766,7 @@ def cancel_reservation(
     """
     try:
         # Verify reservation belongs to customer
-        reservations = get_customer_reservations(db_path, customer_id)
-        reservation = next((r for r in reservations if r['id'] == reservation_id), None)
+        reservation = get_reservation_for_customer(db_path, customer_id, reservation_id, conn=conn)
 
         if not reservation:
             return {
@@ -583,9 +781,10 @@ def cancel_reservation(
             }
 
         # Cancel reservation
-        success = db_cancel_reservation(db_path, reservation_id)
+        success = db_cancel_reservation(db_path, reservation_id, conn=conn)
 
         if success:
+            clear_search_cache()  # a table was released
             return {
                 "status": "success",
                 "message": f"Reservation #{reservation_id} at {reservation['restaurant_name']} has been cancelled.",
@@ -607,7 +806,8 @@ def cancel_reservation(
 def get_my_bookings(
     db_path: str,
     customer_id: int,
-    status: str = "confirmed"
+    status: str = "confirmed",
+    conn: Optional[sqlite3.Connection] = None
 ) -> Dict[str, Any]:
     """
     Get customer's reservations.
@@ -618,9 +818,9 @@ def get_my_bookings(
     try:
         # Get reservations
         if status == "all":
-            reservations = get_customer_reservations(db_path, customer_id)
+            reservations = get_customer_reservations(db_path, customer_id, conn=conn)
         else:
-            reservations = get_customer_reservations(db_path, customer_id, status)
+            reservations = get_customer_reservations(db_path, customer_id, status, conn=conn)
 
         if not reservations:
             return {
@@ -646,39 +846,93 @@ def get_my_bookings(
 
 def get_daily_offers_func(
     db_path: str,
-    restaurant_id: int
+    restaurant_id: int,
+    conn: Optional[sqlite3.Connection] = None
 ) -> Dict[str, Any]:
     """
     Get active offers for a restaurant.
 
+    Results are cached per (restaurant, day) until the database is written.
+
     Returns:
         Dict with status, message, and offers
     """
+    return get_daily_offers_batch(db_path, [restaurant_id], conn=conn)[restaurant_id]
+
+
+def get_daily_offers_batch(
+    db_path: str,
+    restaurant_ids: List[int],
+    conn: Optional[sqlite3.Connection] = None
+) -> Dict[int, Dict[str, Any]]:
+    """
+    Get active offers for several restaurants at once.
+
+    Cache misses are looked up together with batched IN queries.
+
+    Returns:
+        Dict of restaurant ID to a get_daily_offers_func result
+    """
+    today = datetime.now().strftime('%Y-%m-%d')
+    stamp = get_write_stamp(db_path)
+    results: Dict[int, Dict[str, Any]] = {}
+    with _OFFERS_CACHE_LOCK:
+        for restaurant_id in restaurant_ids:
+            cached = _OFFERS_CACHE.get((db_path, restaurant_id, today, stamp))
+            if cached is not None:
+                results[restaurant_id] = cached
+
+    missing = [r_id for r_id in dict.fromkeys(restaurant_ids) if r_id not in results]
+    if missing:
+        fetched = _daily_offers(db_path, missing, today, conn=conn)
+        with _OFFERS_CACHE_LOCK:
+            for restaurant_id, result in fetched.items():
+                if result["status"] == "success":
+                    _OFFERS_CACHE[(db_path, restaurant_id, today, stamp)] = result
+        results.update(fetched)
+
+    return {r_id: copy.deepcopy(results[r_id]) for r_id in restaurant_ids}
+
+
+def _daily_offers(
+    db_path: str,
+    restaurant_ids: List[int],
+    today: str,
+    conn: Optional[sqlite3.Connection] = None
+) -> Dict[int, Dict[str, Any]]:
+    """Look up restaurants' offers without caching (see get_daily_offers_batch)."""
     try:
-        offers = get_active_offers(db_path, restaurant_id)
+        offers_by_id = get_active_offers_for_restaurants(db_path, restaurant_ids, today, conn=conn)
 
-        if not offers:
-            restaurant = get_restaurant_by_id(db_path, restaurant_id)
-            restaurant_name = restaurant['name'] if restaurant else f"Restaurant #{restaurant_id}"
+        results = {}
+        for restaurant_id, offers in offers_by_id.items():
+            if not offers:
+                restaurant = get_restaurant_by_id(db_path, restaurant_id, conn=conn)
+                restaurant_name = restaurant['name'] if restaurant else f"Restaurant #{restaurant_id}"
 
-            return {
+                results[restaurant_id] = {
+                    "status": "success",
+                    "message": f"No active offers at {restaurant_name} right now.",
+                    "offers": []
+                }
+                continue
+
+            results[restaurant_id] = {
                 "status": "success",
-                "message": f"No active offers at {restaurant_name} right now.",
-                "offers": []
+                "message": f"Found {len(offers)} active offer(s)",
+                "offers": offers,
+                "count": len(offers)
             }
-
-        return {
-            "status": "success",
-            "message": f"Found {len(offers)} active offer(s)",
-            "offers": offers,
-            "count": len(offers)
-        }
+        return results
 
     except Exception as e:
         return {
-            "status": "error",
-            "message": f"Error retrieving offers: {str(e)}",
-            "offers": []
+            restaurant_id: {
+                "status": "error",
+                "message": f"Error retrieving offers: {str(e)}",
+                "offers": []
+            }
+            for restaurant_id in restaurant_ids
         }
 
 
@@ -687,7 +941,8 @@ def submit_feedback_func(
     customer_id: int,
     restaurant_id: int,
     rating: int,
-    comment: str = None
+    comment: str = None,
+    conn: Optional[sqlite3.Connection] = None
 ) -> Dict[str, Any]:
     """
     Submit customer feedback.
@@ -711,9 +966,9 @@ def submit_feedback_func(
             "comment": comment
         }
 
-        feedback_id = create_feedback(db_path, feedback_data)
+        feedback_id = create_feedback(db_path, feedback_data, conn=conn)
 
-        restaurant = get_restaurant_by_id(db_path, restaurant_id)
+        restaurant = get_restaurant_by_id(db_path, restaurant_id, conn=conn)
         restaurant_name = restaurant['name'] if restaurant else f"Restaurant #{restaurant_id}"
 
         return {
@@ -733,13 +988,174 @@ def submit_feedback_func(
 # Tool Execution Router
 # ============================================================
 
+# Clarifying prompt per reservation argument that failed preflight
+RESERVATION_FIELD_ERRORS = {
+    "restaurant_id": "Which destination would you like to book?",
+    "reservation_date": "Please provide a date today or in the future (YYYY-MM-DD format).",
+    "reservation_time": "Please use 30-minute intervals (e.g., 18:00, 18:30, 19:00).",
+    "party_size": "Please specify 1-20 people.",
+}
+
+
+def _coerce_int(value: Any) -> Optional[int]:
+    """Return ``value`` as an int if it is one or an integer-like string (bools excluded)."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        try:
+            return int(value.strip())
+        except ValueError:
+            return None
+    return None
+
+
+def validate_reservation_arguments(arguments: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Check make_reservation arguments before touching the database.
+
+    Integer-like strings for ``restaurant_id`` and ``party_size`` (e.g. "4")
+    are accepted and converted; booleans are not treated as integers.
+
+    Returns:
+        Tuple of (arguments with integer fields coerced, names of missing or
+        invalid fields — empty when all are valid)
+    """
+    coerced = dict(arguments)
+    invalid = []
+    restaurant_id = _coerce_int(arguments.get("restaurant_id"))
+    if restaurant_id is None:
+        invalid.append("restaurant_id")
+    coerced["restaurant_id"] = restaurant_id
+    date = arguments.get("reservation_date")
+    if not isinstance(date, str) or not validate_date(date):
+        invalid.append("reservation_date")
+    time_slot = arguments.get("reservation_time")
+    if not isinstance(time_slot, str) or not validate_time_slot(time_slot):
+        invalid.append("reservation_time")
+    party_size = _coerce_int(arguments.get("party_size"))
+    if party_size is None or not validate_party_size(party_size):
+        invalid.append("party_size")
+    coerced["party_size"] = party_size
+    return coerced, invalid
+
+
+class ToolContext(NamedTuple):
+    """Per-conversation values every tool handler receives."""
+    db_path: str
+    customer_id: int
+    user_lat: float
+    user_lon: float
+    conn: Optional[sqlite3.Connection]
+
+
+def _run_find_restaurants_by_area(arguments: Dict[str, Any], ctx: ToolContext) -> Dict[str, Any]:
+    # Dedicated tool for area-based search
+    return find_restaurants(
+        ctx.db_path,
+        ctx.user_lat,
+        ctx.user_lon,
+        location_name=arguments.get("area_name"),  # REQUIRED parameter
+        min_rating=arguments.get("min_rating"),
+        has_parking=arguments.get("has_parking"),
+        has_offers=arguments.get("has_offers"),
+        conn=ctx.conn
+    )
+
+
+def _run_find_restaurants(arguments: Dict[str, Any], ctx: ToolContext) -> Dict[str, Any]:
+    return find_restaurants(
+        ctx.db_path,
+        ctx.user_lat,
+        ctx.user_lon,
+        max_distance_km=arguments.get("max_distance_km", 10.0),
+        min_rating=arguments.get("min_rating"),
+        price_range=arguments.get("price_range"),
+        has_parking=arguments.get("has_parking"),
+        has_offers=arguments.get("has_offers"),
+        conn=ctx.conn
+    )
+
+
+def _run_make_reservation(arguments: Dict[str, Any], ctx: ToolContext) -> Dict[str, Any]:
+    arguments, invalid_fields = validate_reservation_arguments(arguments)
+    if invalid_fields:
+        return {
+            "status": "error",
+            "code": "invalid_args",
+            "fields": invalid_fields,
+            "message": " ".join(RESERVATION_FIELD_ERRORS[field] for field in invalid_fields)
+        }
+    return make_reservation(
+        ctx.db_path,
+        ctx.customer_id,
+        arguments["restaurant_id"],
+        arguments["reservation_date"],
+        arguments["reservation_time"],
+        arguments["party_size"],
+        arguments.get("special_requests"),
+        conn=ctx.conn
+    )
+
+
+def _run_cancel_reservation(arguments: Dict[str, Any], ctx: ToolContext) -> Dict[str, Any]:
+    return cancel_reservation(
+        ctx.db_path,
+        ctx.customer_id,
+        arguments["reservation_id"],
+        conn=ctx.conn
+    )
+
+
+def _run_get_my_bookings(arguments: Dict[str, Any], ctx: ToolContext) -> Dict[str, Any]:
+    return get_my_bookings(
+        ctx.db_path,
+        ctx.customer_id,
+        arguments.get("status", "confirmed"),
+        conn=ctx.conn
+    )
+
+
+def _run_get_daily_offers(arguments: Dict[str, Any], ctx: ToolContext) -> Dict[str, Any]:
+    return get_daily_offers_func(
+        ctx.db_path,
+        arguments["restaurant_id"],
+        conn=ctx.conn
+    )
+
+
+def _run_submit_feedback(arguments: Dict[str, Any], ctx: ToolContext) -> Dict[str, Any]:
+    return submit_feedback_func(
+        ctx.db_path,
+        ctx.customer_id,
+        arguments["restaurant_id"],
+        arguments["rating"],
+        arguments.get("comment"),
+        conn=ctx.conn
+    )
+
+
+# Tool name -> handler(arguments, ctx)
+_DISPATCH: Dict[str, Callable[[Dict[str, Any], ToolContext], Dict[str, Any]]] = {
+    "find_restaurants_by_area": _run_find_restaurants_by_area,
+    "find_restaurants": _run_find_restaurants,
+    "make_reservation": _run_make_reservation,
+    "cancel_reservation": _run_cancel_reservation,
+    "get_my_bookings": _run_get_my_bookings,
+    "get_daily_offers": _run_get_daily_offers,
+    "submit_feedback": _run_submit_feedback,
+}
+
+
 def execute_tool(
     tool_name: str,
     arguments: Dict[str, Any],
     db_path: str,
     customer_id: int,
     user_lat: float,
-    user_lon: float
+    user_lon: float,
+    conn: Optional[sqlite3.Connection] = None
 ) -> Dict[str, Any]:
     """
     Execute a tool by name with given arguments.
@@ -751,76 +1167,59 @@ def execute_tool(
         customer_id: Current customer ID
         user_lat: User latitude
         user_lon: User longitude
+        conn: Open (e.g. pooled) connection shared by the tool's queries
 
     Returns:
         Tool execution result
     """
-    if tool_name == "find_restaurants_by_area":
-        # Dedicated tool for area-based search
-        return find_restaurants(
-            db_path,
-            user_lat,
-            user_lon,
-            location_name=arguments.get("area_name"),  # REQUIRED parameter
-            min_rating=arguments.get("min_rating"),
-            has_parking=arguments.get("has_parking"),
-            has_offers=arguments.get("has_offers")
-        )
-
-    elif tool_name == "find_restaurants":
-        return find_restaurants(
-            db_path,
-            user_lat,
-            user_lon,
-            max_distance_km=arguments.get("max_distance_km", 10.0),
-            min_rating=arguments.get("min_rating"),
-            price_range=arguments.get("price_range"),
-            has_parking=arguments.get("has_parking"),
-            has_offers=arguments.get("has_offers")
-        )
-
-    elif tool_name == "make_reservation":
-        return make_reservation(
-            db_path,
-            customer_id,
-            arguments["restaurant_id"],
-            arguments["reservation_date"],
-            arguments["reservation_time"],
-            arguments["party_size"],
-            arguments.get("special_requests")
-        )
+    handler = _DISPATCH.get(tool_name)
+    if handler is None:
+        return {
+            "status": "error",
+            "message": f"Unknown tool: {tool_name}"
+        }
+    return handler(arguments, ToolContext(db_path, customer_id, user_lat, user_lon, conn))
 
-    elif tool_name == "cancel_reservation":
-        return cancel_reservation(
-            db_path,
-            customer_id,
-            arguments["reservation_id"]
-        )
 
-    elif tool_name == "get_my_bookings":
-        return get_my_bookings(
-            db_path,
-            customer_id,
-            arguments.get("status", "confirmed")
-        )
+def execute_tools(
+    calls: List[Tuple[str, Dict[str, Any]]],
+    db_path: str,
+    customer_id: int,
+    user_lat: float,
+    user_lon: float,
+    conn: Optional[sqlite3.Connection] = None
+) -> List[Dict[str, Any]]:
+    """
+    Execute several tool calls in order on one connection.
 
-    elif tool_name == "get_daily_offers":
-        return get_daily_offers_func(
-            db_path,
-            arguments["restaurant_id"]
-        )
+    get_daily_offers calls are answered together by one batched lookup;
+    everything else runs through execute_tool.
 
-    elif tool_name == "submit_feedback":
-        return submit_feedback_func(
-            db_path,
-            customer_id,
-            arguments["restaurant_id"],
-            arguments["rating"],
-            arguments.get("comment")
-        )
+    Args:
+        calls: (tool name, arguments) pairs
+        db_path: Database path
+        customer_id: Current customer ID
+        user_lat: User latitude
+        user_lon: User longitude
+        conn: Open (e.g. pooled) connection shared by the tools' queries
 
-    else:
-        return {
-            "status": "error",
-            "message": f"Unknown tool: {tool_name}"
-        }
+    Returns:
+        Tool execution results, in call order
+    """
+    offer_ids = [
+        arguments["restaurant_id"]
+        for name, arguments in calls
+        if name == "get_daily_offers" and isinstance(arguments.get("restaurant_id"), int)
+    ]
+    batched = get_daily_offers_batch(db_path, offer_ids, conn=conn) if len(offer_ids) > 1 else {}
+
+    results = []
+    for name, arguments in calls:
+        restaurant_id = arguments.get("restaurant_id")
+        if name == "get_daily_offers" and isinstance(restaurant_id, int) and restaurant_id in batched:
+            results.append(batched[restaurant_id])
+        else:
+            results.append(
+                execute_tool(name, arguments, db_path, customer_id, user_lat, user_lon, conn=conn)
+            )
+    return results
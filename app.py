@@ -6,17 +6,22 @@ A conversation-first experience for discovering and booking GoodFoods destinatio
 
 import os
 import json
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from html import escape
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
 import streamlit as st
 from dotenv import load_dotenv
 
-from agents.orchestrator import OrchestratorAgent
+from agents.orchestrator import OrchestratorAgent, partial_summary
 from database.db_manager import (
     get_customer_conversations,
     get_customer_reservations,
     get_or_create_customer,
+    get_write_stamp,
     initialize_database,
 )
 
@@ -29,55 +34,16 @@ load_dotenv()
 
 st.set_page_config(page_title="GoodFoods Concierge", page_icon="🍽️", layout="wide")
 
-CUSTOM_CSS = """
-<style>
-[data-testid="stAppViewContainer"] {
-    background: radial-gradient(circle at top left, #002b5b 0%, #001226 100%);
-    color: #ecf6ff;
-}
-[data-testid="stHeader"] { background: transparent; }
-[data-testid="stSidebar"] {
-    background: rgba(2, 22, 48, 0.92);
-    color: #ecf6ff;
-}
-.block-container { padding-top: 2rem; color: #ecf6ff; }
-.quick-card {
-    background: linear-gradient(135deg, #023e8a 0%, #0353a4 100%);
-    border-radius: 16px;
-    padding: 18px 16px;
-    margin-bottom: 12px;
-    box-shadow: 0 12px 28px rgba(0, 35, 82, 0.35);
-    border: 1px solid rgba(3, 118, 175, 0.35);
-}
-.quick-card h4 { margin-bottom: 6px; color: #f1fbff; font-weight: 700; }
-.quick-card p { margin-bottom: 0; font-size: 0.9rem; color: rgba(214, 236, 255, 0.9); }
-.stButton > button {
-    border-radius: 12px;
-    border: none;
-    background: linear-gradient(135deg, #00b4d8 0%, #0096c7 100%);
-    color: #00203a;
-    font-weight: 700;
-    box-shadow: 0 12px 24px rgba(0, 150, 199, 0.3);
-}
-.stButton > button:hover {
-    background: linear-gradient(135deg, #48cae4 0%, #0096c7 100%);
-}
-.stChatMessage {
-    background: rgba(2, 40, 76, 0.85);
-    border-radius: 18px;
-    border: 1px solid rgba(0, 168, 232, 0.25);
-    color: #f1fbff;
-}
-.stChatInputContainer {
-    background: rgba(0, 29, 58, 0.92);
-    border-radius: 20px;
-    border: 1px solid rgba(0, 168, 232, 0.25);
-}
-.stMarkdown, .stCaption, .stText { color: inherit; }
-</style>
-"""
+STYLES_PATH = Path(__file__).parent / "assets" / "styles.css"
+
+
+@st.cache_resource
+def load_custom_css() -> str:
+    """Read the app stylesheet once per process, wrapped for st.markdown."""
+    return f"<style>\n{STYLES_PATH.read_text(encoding='utf-8')}</style>"
 
-st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
+
+st.markdown(load_custom_css(), unsafe_allow_html=True)
 
 # ---------------------------------------------------------------------------
 # Constants
@@ -87,6 +53,18 @@ DB_PATH = os.getenv("DATABASE_PATH", "data/restaurants.db")
 DEFAULT_LAT = float(os.getenv("DEFAULT_LATITUDE", "13.0418"))
 DEFAULT_LON = float(os.getenv("DEFAULT_LONGITUDE", "80.2337"))
 
+# Minimum gap between redraws of a streaming reply
+STREAM_REDRAW_SECONDS = 0.05
+
+# Chat messages rendered per rerun; "Load earlier" widens the window by this much
+MESSAGE_WINDOW = 20
+
+# Seconds a guest's bookings / conversation history stay cached between reruns
+HISTORY_CACHE_TTL = 30
+
+# Overlaps the history fetch with orchestrator construction at login
+_LOGIN_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="goodfoods-login")
+
 GOODFOODS_AREAS = {
     "T. Nagar": (13.0418, 80.2337),
     "Nungambakkam": (13.0615, 80.2425),
@@ -105,6 +83,8 @@ GOODFOODS_AREAS = {
     "Pallavaram": (12.9676, 80.1521),
 }
 
+AREA_OPTIONS = ("Auto-detect (T. Nagar)", *GOODFOODS_AREAS)
+
 QUICK_ACTIONS = [
     (
         "🎯 Discover concepts near me",
@@ -138,6 +118,16 @@ QUICK_ACTIONS = [
     ),
 ]
 
+# Quick actions laid out three per row
+QUICK_ACTION_ROWS = tuple(QUICK_ACTIONS[i : i + 3] for i in range(0, len(QUICK_ACTIONS), 3))
+
+BOOKING_STATUS_BADGES = {
+    "confirmed": "✅ Confirmed",
+    "cancelled": "❌ Cancelled",
+    "completed": "🎉 Completed",
+    "no_show": "⚠️ No Show",
+}
+
 STRUCTURED_RESPONSE_KEYS = (
     "restaurants",
     "bookings",
@@ -157,6 +147,36 @@ def attach_structured_fields(response: Dict[str, Any], payload: Dict[str, Any])
             payload[key] = response[key]
 
 
+def stream_reply(frames: Iterable[Dict[str, Any]], placeholder: Any) -> Dict[str, Any]:
+    """
+    Show a streaming reply in ``placeholder`` and return its final frame.
+
+    Tool-turn replies stream as JSON, so only the decoded "summary" is drawn
+    as plain text; until it starts arriving the spinner stays on its own.
+    The placeholder is cleared once the reply is complete.
+    """
+    streamed_parts: List[str] = []
+    last_redraw = 0.0
+    response: Dict[str, Any] = {}
+    for frame in frames:
+        if frame.get("done"):
+            response = frame
+            continue
+        streamed_parts.append(frame["delta"])
+        # Join and redraw at most every STREAM_REDRAW_SECONDS
+        now = time.monotonic()
+        if now - last_redraw >= STREAM_REDRAW_SECONDS:
+            summary = partial_summary("".join(streamed_parts))
+            if summary:
+                placeholder.text(summary + "▌")
+            last_redraw = now
+    placeholder.empty()
+    return response
+
+
+_PAYLOAD_START_RE = re.compile(r"\s*[{\[]")
+
+
 def try_parse_payload(content: Any) -> Optional[Dict[str, Any]]:
     """
     Attempt to coerce arbitrary content into a structured dict payload.
@@ -173,12 +193,14 @@ def try_parse_payload(content: Any) -> Optional[Dict[str, Any]]:
     if not isinstance(content, str):
         return None
 
-    raw = content.strip()
-    if not raw or raw[0] not in "{[":
+    # Peek at the first non-space character without copying the whole string;
+    # most replies are prose and bail out here
+    start = _PAYLOAD_START_RE.match(content)
+    if not start:
         return None
 
     try:
-        parsed = json.loads(raw)
+        parsed = json.loads(content[start.end() - 1:].rstrip())
     except (json.JSONDecodeError, TypeError):
         return None
 
@@ -193,14 +215,33 @@ def try_parse_payload(content: Any) -> Optional[Dict[str, Any]]:
 # ---------------------------------------------------------------------------
 
 
+@st.cache_resource
 def initialize_app() -> None:
-    """Ensure the database exists with the latest schema."""
-    if not Path(DB_PATH).exists():
-        initialize_database(DB_PATH)
+    """Ensure the database exists with the latest schema (once per process)."""
+    # The schema is idempotent; re-running it adds new indexes to older files
+    initialize_database(DB_PATH)
+
+
+# The write stamp is part of each cache key, so any booking, cancellation or
+# logged message (from the chat or another session) misses the cache at once
+@st.cache_data(ttl=HISTORY_CACHE_TTL, show_spinner=False)
+def load_customer_reservations(db_path: str, customer_id: int, write_stamp: tuple) -> List[Dict[str, Any]]:
+    """Cached get_customer_reservations for tab switches and reruns."""
+    return get_customer_reservations(db_path, customer_id)
+
+
+@st.cache_data(ttl=HISTORY_CACHE_TTL, show_spinner=False)
+def load_customer_conversations(db_path: str, customer_id: int, write_stamp: tuple) -> List[Dict[str, Any]]:
+    """Cached get_customer_conversations for repeated logins."""
+    return get_customer_conversations(db_path, customer_id)
 
 
 def init_session_state() -> None:
     """Set default values for commonly used session keys."""
+    # Defaults only need seeding once per session (logging out clears the flag)
+    if st.session_state.get("session_initialized"):
+        return
+
     defaults = {
         "customer_id": None,
         "customer_name": None,
@@ -209,6 +250,7 @@ def init_session_state() -> None:
         "user_lat": DEFAULT_LAT,
         "user_lon": DEFAULT_LON,
         "messages": [],
+        "message_window": MESSAGE_WINDOW,
         "orchestrator": None,
         "quick_command": None,
         "pending_prompt": None,
@@ -222,6 +264,13 @@ def init_session_state() -> None:
     if "paid_reservations" not in st.session_state:
         st.session_state.paid_reservations = set()
 
+    st.session_state.session_initialized = True
+
+
+def load_earlier_messages() -> None:
+    """Widen the rendered chat window by another MESSAGE_WINDOW messages."""
+    st.session_state.message_window += MESSAGE_WINDOW
+
 
 def ensure_orchestrator() -> None:
     """Create the orchestrator agent if missing."""
@@ -291,6 +340,7 @@ def process_quick_command() -> None:
                 {
                     "role": "assistant",
                     "content": f"I ran into an issue while trying to book that table: {exc}",
+                    "json": None,
                 }
             )
 
@@ -300,9 +350,10 @@ def process_quick_command() -> None:
         if st.session_state.get("pending_prompt"):
             return
 
+        # No rerun needed: this runs before the history loop, which shows the
+        # prompt, and process_pending_prompt answers it later in the same pass
         st.session_state.messages.append({"role": "user", "content": prompt_text})
         st.session_state.pending_prompt = prompt_text
-        st.experimental_rerun()
 
 
 def process_pending_prompt() -> None:
@@ -328,6 +379,11 @@ def process_pending_prompt() -> None:
             "content": summary_text or response["text"]
         }
 
+        # The orchestrator already parsed the raw reply; reuse it when that
+        # reply is what gets stored, so the history loop has nothing to parse
+        if response.get("json") and not summary_text:
+            response_payload["json"] = response["json"]
+
         attach_structured_fields(response, response_payload)
 
         st.session_state.messages.append(response_payload)
@@ -339,6 +395,7 @@ def process_pending_prompt() -> None:
             {
                 "role": "assistant",
                 "content": f"I ran into an issue while handling that suggestion: {exc}",
+                "json": None,
             }
         )
 
@@ -379,9 +436,8 @@ def render_login() -> None:
             name = st.text_input("Your name")
             phone = st.text_input("Mobile number")
 
-            area_options = ["Auto-detect (T. Nagar)"] + list(GOODFOODS_AREAS.keys())
-            area_choice = st.selectbox("Anchor locality", options=area_options, index=0)
-            selected_area = None if area_choice == area_options[0] else area_choice
+            area_choice = st.selectbox("Anchor locality", options=AREA_OPTIONS, index=0)
+            selected_area = None if area_choice == AREA_OPTIONS[0] else area_choice
 
             submitted = st.form_submit_button("Launch GoodFoods Concierge", use_container_width=True)
 
@@ -406,8 +462,21 @@ def render_login() -> None:
             st.session_state.user_lon = lon
             st.session_state.orchestrator = None  # force reinitialisation
 
-            history = get_customer_conversations(DB_PATH, customer["id"])
+            # Build the agent off-thread while the history loads; the worker
+            # must not touch st.session_state, so it only gets plain values
+            agent_future = _LOGIN_EXECUTOR.submit(
+                OrchestratorAgent,
+                DB_PATH, customer["id"], customer["name"], customer["phone"], lat, lon,
+            )
+            history = load_customer_conversations(DB_PATH, customer["id"], get_write_stamp(DB_PATH))
+            try:
+                st.session_state.orchestrator = agent_future.result()
+            except Exception:
+                # ensure_orchestrator retries on the next run and reports the error
+                st.session_state.orchestrator = None
+
             st.session_state.messages = []
+            st.session_state.message_window = MESSAGE_WINDOW
 
             if history:
                 st.session_state.messages.append(
@@ -417,18 +486,20 @@ def render_login() -> None:
                             f"Welcome back, {name}! 👋 Picking up our GoodFoods conversation right where we left off. "
                             "Ask for new ideas, check reservations, or say the word to book again."
                         ),
+                        "json": None,
                     }
                 )
 
-                for conv in history[-30:]:
-                    st.session_state.messages.append({"role": conv["role"], "content": conv["message"]})
+                st.session_state.messages.extend(
+                    {"role": conv["role"], "content": conv["message"]} for conv in history[-30:]
+                )
             else:
                 intro = (
                     f"Vanakkam {name}! I'm your GoodFoods concierge for Chennai. "
                     f"I can line up cafés, breakfast clubs, Italian evenings, wine lounges, "
                     f"and dessert tastings around {selected_area}. Just tell me what you're craving!"
                 )
-                st.session_state.messages.append({"role": "assistant", "content": intro})
+                st.session_state.messages.append({"role": "assistant", "content": intro, "json": None})
 
             st.experimental_rerun()
 
@@ -468,12 +539,13 @@ def render_concierge_tab() -> None:
     with action_col:
         if st.button("New conversation", key="new_convo", use_container_width=True):
             st.session_state.messages = []
+            st.session_state.message_window = MESSAGE_WINDOW
             st.session_state.pending_prompt = None
             intro = (
                 f"Restarting our GoodFoods concierge session, {st.session_state.customer_name}. "
                 f"Ready whenever you want to explore spots around {st.session_state.customer_area}!"
             )
-            st.session_state.messages.append({"role": "assistant", "content": intro})
+            st.session_state.messages.append({"role": "assistant", "content": intro, "json": None})
         if st.button("Log out", type="primary", use_container_width=True):
             keys = list(st.session_state.keys())
             for key in keys:
@@ -493,14 +565,25 @@ def render_concierge_tab() -> None:
 
     debug_enabled = st.session_state.get("show_debug_json", False)
 
-    for idx, message in enumerate(st.session_state.messages):
+    # Only the most recent messages are rebuilt on each rerun
+    window = st.session_state.message_window
+    if len(st.session_state.messages) > window:
+        st.button("Load earlier", key="load_earlier", on_click=load_earlier_messages)
+
+    visible_messages = st.session_state.messages[-window:]
+    # With several unpaid reservations in view, one form replaces the
+    # per-reservation "Book Now" buttons
+    unpaid = unpaid_reservation_messages(visible_messages)
+    batch_payment = len(unpaid) > 1
+
+    for message in visible_messages:
         with st.chat_message(message["role"]):
-            payload = message.get("json")
-            if not payload:
-                parsed_payload = try_parse_payload(message.get("content"))
-                if parsed_payload:
-                    payload = parsed_payload
-                    st.session_state.messages[idx]["json"] = parsed_payload
+            # Parse once per message and keep the result (None for plain
+            # text); render_json_response also stores generated options on
+            # the payload, so later reruns skip both steps
+            if "json" not in message:
+                message["json"] = try_parse_payload(message.get("content"))
+            payload = message["json"]
 
             if payload:
                 render_json_response(payload)
@@ -514,7 +597,7 @@ def render_concierge_tab() -> None:
                 display_booking_cards(message["bookings"])
 
             if message.get("reservation"):
-                render_payment_prompt(message)
+                render_payment_prompt(message, show_button=not batch_payment)
 
             if debug_enabled:
                 debug_payload = {}
@@ -529,6 +612,9 @@ def render_concierge_tab() -> None:
                     with st.expander("Debug payload", expanded=False):
                         st.json(debug_payload)
 
+    if batch_payment:
+        render_payment_batch(unpaid)
+
     process_pending_prompt()
 
     if user_prompt := st.chat_input("Type your request..."):
@@ -540,7 +626,9 @@ def render_concierge_tab() -> None:
         with st.chat_message("assistant"):
             with st.spinner("GoodFoods is thinking..."):
                 try:
-                    response = orchestrator.process_message(user_prompt)
+                    response = stream_reply(
+                        orchestrator.stream_message(user_prompt), st.empty()
+                    )
 
                     payload_json = response.get("json")
                     if not payload_json:
@@ -553,14 +641,14 @@ def render_concierge_tab() -> None:
                     else:
                         st.markdown(response["text"])
 
+                    # The reply was already scanned above, so record the result
+                    # (None for plain text) and skip parsing it again on rerun
                     response_payload = {
                         "role": "assistant",
-                        "content": summary_text or response["text"]
+                        "content": summary_text or response["text"],
+                        "json": payload_json or None,
                     }
 
-                    if payload_json:
-                        response_payload["json"] = payload_json
-
                     if "restaurants" in response:
                         show_restaurant_cards(response["restaurants"])
                     if "bookings" in response:
@@ -583,13 +671,15 @@ def render_concierge_tab() -> None:
                 except Exception as exc:
                     error_text = f"I ran into an issue while handling that: {exc}"
                     st.error(error_text)
-                    st.session_state.messages.append({"role": "assistant", "content": error_text})
+                    st.session_state.messages.append({"role": "assistant", "content": error_text, "json": None})
 
 
 def render_booking_history_tab() -> None:
     """Show a complete list of reservations for the current guest."""
     st.subheader("Your reservations with GoodFoods")
-    reservations = get_customer_reservations(DB_PATH, st.session_state.customer_id)
+    reservations = load_customer_reservations(
+        DB_PATH, st.session_state.customer_id, get_write_stamp(DB_PATH)
+    )
 
     if not reservations:
         st.info("No reservations just yet — start a chat in the concierge tab to make one!")
@@ -621,7 +711,18 @@ def render_profile_tab() -> None:
 # ---------------------------------------------------------------------------
 
 
-def render_payment_prompt(message: Dict[str, Any]) -> None:
+def unpaid_reservation_messages(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Messages carrying a reservation that has not been paid for yet."""
+    paid_reservations = st.session_state.get("paid_reservations", set())
+    return [
+        message
+        for message in messages
+        if (message.get("reservation") or {}).get("id") is not None
+        and message["reservation"]["id"] not in paid_reservations
+    ]
+
+
+def render_payment_prompt(message: Dict[str, Any], show_button: bool = True) -> None:
     """Render a payment confirmation widget when a reservation is made."""
     reservation = message.get("reservation")
     if not reservation:
@@ -655,6 +756,10 @@ def render_payment_prompt(message: Dict[str, Any]) -> None:
             fee_line += f" · Estimated spend ₹{subtotal} (incl. fee: ₹{total})"
         st.info(fee_line)
 
+        if not show_button:
+            st.caption("Pay for this table with the reservation picker below the chat.")
+            return
+
         col_pay, col_note = st.columns([1, 2])
         with col_pay:
             if st.button("Book Now", key=f"pay_{reservation_id}", use_container_width=True):
@@ -666,6 +771,53 @@ def render_payment_prompt(message: Dict[str, Any]) -> None:
             st.caption("Tap **Book Now** to initiate payment. Complete the ₹50 fee via UPI/card to hold the table for 15 minutes.")
 
 
+def render_payment_batch(messages: List[Dict[str, Any]]) -> None:
+    """Render one payment form covering several unpaid reservations."""
+    reservations = {message["reservation"]["id"]: message for message in messages}
+
+    def describe(reservation_id: int) -> str:
+        message = reservations[reservation_id]
+        reservation = message["reservation"]
+        restaurant = message.get("restaurant") or {}
+        return (
+            f"{restaurant.get('name', 'GoodFoods destination')} · "
+            f"{reservation.get('reservation_date')} {reservation.get('reservation_time')} · "
+            f"{reservation.get('party_size')} guests"
+        )
+
+    with st.form("pay_batch"):
+        st.markdown("### 💳 Complete Your Reservations")
+        reservation_id = st.radio(
+            "Select reservation", options=list(reservations), format_func=describe
+        )
+        st.caption("Complete the ₹50 fee via UPI/card to hold the table for 15 minutes.")
+        if st.form_submit_button("Confirm payment", use_container_width=True):
+            paid_reservations = st.session_state.get("paid_reservations", set())
+            paid_reservations.add(reservation_id)
+            st.session_state.paid_reservations = paid_reservations
+            st.experimental_rerun()
+
+
+# Boolean restaurant fields shown as option attributes, in display order
+_OPTION_FEATURE_LABELS = (
+    ("has_parking", "Parking available"),
+    ("has_outdoor_seating", "Outdoor seating"),
+)
+
+# Alternative keys the model uses for an itinerary step's label and its venues
+_STAGE_KEYS = ("stage", "slot", "title", "label")
+_VENUE_KEYS = ("options", "venues", "stops", "destinations")
+
+
+def _first(mapping: Dict[str, Any], keys: tuple, default: Any = None) -> Any:
+    """Return the first truthy value among keys, else default."""
+    for key in keys:
+        value = mapping.get(key)
+        if value:
+            return value
+    return default
+
+
 def render_json_response(payload: Dict[str, Any]) -> None:
     """Render structured JSON payload returned by the assistant."""
     if not isinstance(payload, dict):
@@ -680,17 +832,17 @@ def render_json_response(payload: Dict[str, Any]) -> None:
     if (not options or len(options) == 0) and restaurants:
         generated_options = []
         for restaurant in restaurants[:5]:
-            attributes = []
-            if restaurant.get("has_parking"):
-                attributes.append("Parking available")
-            if restaurant.get("has_outdoor_seating"):
-                attributes.append("Outdoor seating")
-            if restaurant.get("yield_hint"):
-                attributes.append(restaurant["yield_hint"])
-            if restaurant.get("offer_preview"):
-                attributes.append(f"Offer: {restaurant['offer_preview']}")
-            if restaurant.get("fallback_reason"):
-                attributes.append(restaurant["fallback_reason"])
+            offer = restaurant.get("offer_preview")
+            attributes = [label for key, label in _OPTION_FEATURE_LABELS if restaurant.get(key)]
+            attributes += [
+                note
+                for note in (
+                    restaurant.get("yield_hint"),
+                    offer and f"Offer: {offer}",
+                    restaurant.get("fallback_reason"),
+                )
+                if note
+            ]
             spend = restaurant.get("estimated_spend_per_person")
             details_parts = []
             if restaurant.get("available_tables") is not None:
@@ -715,20 +867,10 @@ def render_json_response(payload: Dict[str, Any]) -> None:
         generated_options = []
         seen_titles = set()
         for segment in itinerary_segments:
-            stage = (
-                segment.get("stage")
-                or segment.get("slot")
-                or segment.get("title")
-                or segment.get("label")
-            )
+            stage = _first(segment, _STAGE_KEYS)
             segment_attributes = segment.get("attributes") or []
             stage_summary = segment.get("summary") or segment.get("details")
-            venues = (
-                segment.get("options")
-                or segment.get("venues")
-                or segment.get("stops")
-                or segment.get("destinations")
-            )
+            venues = _first(segment, _VENUE_KEYS)
 
             # If the segment itself carries venue info, treat it as a single option
             if not venues:
@@ -804,24 +946,13 @@ def render_json_response(payload: Dict[str, Any]) -> None:
     if itinerary_segments:
         st.markdown("**Suggested itinerary**")
         for segment in itinerary_segments:
-            stage = (
-                segment.get("stage")
-                or segment.get("slot")
-                or segment.get("title")
-                or segment.get("label")
-                or "Experience"
-            )
+            stage = _first(segment, _STAGE_KEYS, "Experience")
             stage_summary = segment.get("summary") or segment.get("details")
             st.markdown(f"**{stage}**")
             if stage_summary:
                 st.markdown(stage_summary)
 
-            venues = (
-                segment.get("options")
-                or segment.get("venues")
-                or segment.get("stops")
-                or segment.get("destinations")
-            ) or []
+            venues = _first(segment, _VENUE_KEYS, [])
 
             for venue in venues:
                 name = venue.get("title") or venue.get("name")
@@ -849,6 +980,69 @@ def render_json_response(payload: Dict[str, Any]) -> None:
         st.info(fee_msg)
 
 
+def restaurant_card_html(restaurant: Dict[str, Any]) -> str:
+    """Build a restaurant card's header and detail columns as one HTML block.
+
+    Every st.* call is its own websocket message, so the card body goes out as
+    a single markdown element rather than a dozen captions and metrics.
+    """
+    spend = restaurant.get("estimated_spend_per_person")
+    spend_text = f"Avg spend: ₹{spend} per guest" if spend else f"Price: {restaurant['price_range']}"
+    distance = restaurant.get("distance_km")
+    distance_text = f"{distance} km" if distance is not None else "N/A"
+
+    features = []
+    if restaurant.get("has_parking"):
+        features.append("🚗 Parking")
+    if restaurant.get("has_outdoor_seating"):
+        features.append("🌿 Alfresco")
+    amenities = [
+        f"🕒 {restaurant.get('opening_time', '—')} – {restaurant.get('closing_time', '—')}",
+        " · ".join(features) or "Indoor seating",
+    ]
+    if restaurant.get("estimated_spend_hint"):
+        amenities.append(restaurant["estimated_spend_hint"])
+
+    columns = [
+        ("Rating", f"{restaurant['rating']} ⭐", [spend_text]),
+        ("Distance", distance_text, [f"Tables open: {restaurant['available_tables']}"]),
+        (None, None, amenities),
+    ]
+    cells = []
+    for label, value, captions in columns:
+        metric = (
+            f'<div class="label">{escape(label)}</div><div class="value">{escape(value)}</div>'
+            if label
+            else ""
+        )
+        notes = "".join(f'<div class="meta">{escape(str(text))}</div>' for text in captions)
+        cells.append(f'<div class="card-cell">{metric}{notes}</div>')
+
+    return (
+        '<div class="card-inner">'
+        f"<h3>{escape(str(restaurant['name']))}</h3>"
+        f"<strong>{escape(str(restaurant['cuisine']))}</strong>"
+        f'<div class="meta">📍 {escape(str(restaurant["address"]))}</div>'
+        f'<div class="card-metrics">{"".join(cells)}</div>'
+        "</div>"
+    )
+
+
+def restaurant_card_notes(restaurant: Dict[str, Any]) -> List[str]:
+    """Collect the secondary card captions so they render as one element."""
+    notes = []
+    if restaurant.get("yield_signal") not in ("surge", "discount") and restaurant.get("yield_hint"):
+        notes.append(restaurant["yield_hint"])
+    sponsored_bid = restaurant.get("sponsored_bid")
+    if sponsored_bid:
+        notes.append(f"Sponsored placement bid: ₹{sponsored_bid} per confirmed booking.")
+    if restaurant.get("enterprise_fit"):
+        notes.append(restaurant.get("enterprise_hint") or "Enterprise-ready venue for corporate dining.")
+    if restaurant.get("fallback_reason"):
+        notes.append(f"👉 {restaurant['fallback_reason']}")
+    return notes
+
+
 def show_restaurant_cards(restaurants: list) -> None:
     """Render restaurant recommendation cards with quick-book buttons."""
     if not restaurants:
@@ -860,60 +1054,22 @@ def show_restaurant_cards(restaurants: list) -> None:
         header_cols = card.columns([4, 1])
 
         with header_cols[0]:
-            st.markdown(f"### {restaurant['name']}")
-            st.markdown(f"**{restaurant['cuisine']}**")
-            st.caption(f"📍 {restaurant['address']}")
+            st.markdown(restaurant_card_html(restaurant), unsafe_allow_html=True)
 
         with header_cols[1]:
             if st.button("Book", key=f"book_{restaurant['id']}", use_container_width=True):
                 st.session_state.quick_command = {"type": "book", "restaurant": restaurant}
 
-        detail_cols = card.columns(3)
-
-        with detail_cols[0]:
-            st.metric("Rating", f"{restaurant['rating']} ⭐")
-            spend = restaurant.get("estimated_spend_per_person")
-            if spend:
-                st.caption(f"Avg spend: ₹{spend} per guest")
-            else:
-                st.caption(f"Price: {restaurant['price_range']}")
-
-        with detail_cols[1]:
-            distance = restaurant.get("distance_km")
-            distance_text = f"{distance} km" if distance is not None else "N/A"
-            st.metric("Distance", distance_text)
-            st.caption(f"Tables open: {restaurant['available_tables']}")
-
-        with detail_cols[2]:
-            st.caption(f"🕒 {restaurant.get('opening_time', '—')} – {restaurant.get('closing_time', '—')}")
-            features = []
-            if restaurant.get("has_parking"):
-                features.append("🚗 Parking")
-            if restaurant.get("has_outdoor_seating"):
-                features.append("🌿 Alfresco")
-            st.caption(" · ".join(features) or "Indoor seating")
-            spend_hint = restaurant.get("estimated_spend_hint")
-            if spend_hint:
-                st.caption(spend_hint)
-
         yield_signal = restaurant.get("yield_signal")
         yield_hint = restaurant.get("yield_hint")
         if yield_signal == "surge":
             st.warning(yield_hint or "High demand period – consider premium pricing.")
         elif yield_signal == "discount":
             st.info(yield_hint or "Opportunity to offer discounts or bundles.")
-        elif yield_hint:
-            st.caption(yield_hint)
 
-        sponsored_bid = restaurant.get("sponsored_bid")
-        if sponsored_bid:
-            st.caption(f"Sponsored placement bid: ₹{sponsored_bid} per confirmed booking.")
-
-        if restaurant.get("enterprise_fit"):
-            st.caption(restaurant.get("enterprise_hint") or "Enterprise-ready venue for corporate dining.")
-
-        if restaurant.get("fallback_reason"):
-            st.caption(f"👉 {restaurant['fallback_reason']}")
+        notes = restaurant_card_notes(restaurant)
+        if notes:
+            st.caption("  \n".join(notes))
 
         offer_preview = restaurant.get("offer_preview")
         if offer_preview:
@@ -928,9 +1084,10 @@ def show_quick_actions() -> None:
     """Display quick action suggestions with one-click prompts."""
     with st.container():
         st.subheader("Quick suggestions")
-        for i in range(0, len(QUICK_ACTIONS), 3):
+        action_index = 0
+        for row in QUICK_ACTION_ROWS:
             cols = st.columns(3)
-            for idx, (col, action) in enumerate(zip(cols, QUICK_ACTIONS[i : i + 3])):
+            for col, action in zip(cols, row):
                 title, description, prompt = action
                 with col:
                     st.markdown(
@@ -942,20 +1099,14 @@ def show_quick_actions() -> None:
                         """,
                         unsafe_allow_html=True,
                     )
-                    if st.button("Try this", key=f"qa_{i+idx}", use_container_width=True):
+                    if st.button("Try this", key=f"qa_{action_index}", use_container_width=True):
                         st.session_state.quick_command = {"type": "prompt", "text": prompt}
+                action_index += 1
         st.markdown("---")
 
 
 def display_booking_cards(bookings: list) -> None:
     """Render reservation cards for current or past bookings."""
-    status_badge = {
-        "confirmed": "✅ Confirmed",
-        "cancelled": "❌ Cancelled",
-        "completed": "🎉 Completed",
-        "no_show": "⚠️ No Show",
-    }
-
     for booking in bookings:
         row = st.container()
         header_cols = row.columns([3, 2, 1])
@@ -971,7 +1122,7 @@ def display_booking_cards(bookings: list) -> None:
             st.markdown(f"**Party:** {booking['party_size']} guests")
 
         with header_cols[2]:
-            badge = status_badge.get(booking["status"], booking["status"].title())
+            badge = BOOKING_STATUS_BADGES.get(booking["status"], booking["status"].title())
             st.write(badge)
 
         if booking.get("special_requests"):
@@ -4,6 +4,7 @@ Database package for restaurant booking system.
 Contains:
 - schema.sql: Database schema definitions
 - db_manager.py: Database operations and queries
+- pool.py: Shared SQLite connection pool (WAL) for the agent tools
 - seed_data.py: Mock data generation for testing and demo
 """
 
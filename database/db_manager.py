@@ -9,11 +9,16 @@ Handles all database operations including CRUD for:
 - Feedback
 """
 
+import os
+import re
 import sqlite3
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, Iterator, List, Any, Sequence, Tuple
 from datetime import datetime
 
+from database.pool import CONNECTION_PRAGMAS, get_pooled_connection
+
 
 def get_connection(db_path: str) -> sqlite3.Connection:
     """
@@ -28,44 +33,171 @@ def get_connection(db_path: str) -> sqlite3.Connection:
     conn = sqlite3.connect(db_path, timeout=10.0)  # 10 second timeout
     conn.row_factory = sqlite3.Row  # Access columns by name
 
-    # Enable WAL mode for better concurrent access
-    conn.execute('PRAGMA journal_mode=WAL')
+    # Same tuning as pooled connections (WAL, NORMAL sync, page cache, ...)
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
 
     return conn
 
 
+# "₹" encoded as UTF-8 but decoded as cp1252, as found in legacy exports
+_MOJIBAKE_RUPEE = "₹".encode("utf-8").decode("cp1252")
+
+
+def normalize_price_range(price_range: str) -> str:
+    """Repair a mojibake price band (e.g. "â‚¹â‚¹") to canonical "₹₹"."""
+    return price_range.replace(_MOJIBAKE_RUPEE, "₹")
+
+
+# Read once per process; initialize_database runs on every app start and test
+_SCHEMA_SQL = (Path(__file__).parent / "schema.sql").read_text()
+
+# Every table, index and trigger schema.sql creates
+_SCHEMA_OBJECTS = frozenset(re.findall(
+    r"CREATE\s+(?:VIRTUAL\s+)?(?:TABLE|INDEX|TRIGGER)\s+IF\s+NOT\s+EXISTS\s+(\w+)",
+    _SCHEMA_SQL,
+    re.IGNORECASE,
+))
+
+
 def initialize_database(db_path: str) -> None:
     """
     Initialize database with schema.
 
+    The script is skipped when every object it defines already exists, so
+    only new or older database files pay for it (and its index backfills).
+
     Args:
         db_path: Path to SQLite database file
     """
-    # Read schema from file
-    schema_path = Path(__file__).parent / "schema.sql"
+    conn = get_connection(db_path)
+    try:
+        existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master")}
+        if _SCHEMA_OBJECTS <= existing:
+            return
 
-    with open(schema_path, 'r') as f:
-        schema_sql = f.read()
+        # Execute schema
+        conn.executescript(_SCHEMA_SQL)
+        conn.commit()
+    finally:
+        conn.close()
 
-    conn = get_connection(db_path)
-    cursor = conn.cursor()
 
-    # Execute schema
-    cursor.executescript(schema_sql)
+def get_write_stamp(db_path: str) -> Tuple[int, ...]:
+    """
+    Fingerprint the database files so callers can key caches on it.
+
+    Args:
+        db_path: Path to database
+
+    Returns:
+        Size and mtime of the database and its WAL; changes on any write
+    """
+    stamp = []
+    for path in (db_path, f"{db_path}-wal"):
+        try:
+            stat = os.stat(path)
+            stamp.extend((stat.st_size, stat.st_mtime_ns))
+        except OSError:
+            stamp.extend((0, 0))
+    return tuple(stamp)
+
+
+@contextmanager
+def _use_connection(
+    db_path: str,
+    conn: Optional[sqlite3.Connection] = None
+) -> Iterator[sqlite3.Connection]:
+    """
+    Yield the caller's connection, or borrow one from the shared pool.
+
+    Args:
+        db_path: Path to SQLite database file
+        conn: Open connection to reuse (optional)
+    """
+    if conn is not None:
+        yield conn
+        return
+
+    # Pooled connections stay open and tuned across calls; anything left
+    # uncommitted is rolled back when the connection is returned
+    with get_pooled_connection(db_path) as conn:
+        yield conn
+
+
+# Rows pulled per fetchmany() when draining a potentially long result set
+FETCH_BATCH_SIZE = 256
+
+
+def _fetch_dicts(cursor: sqlite3.Cursor, batch_size: int = FETCH_BATCH_SIZE) -> List[Dict[str, Any]]:
+    """
+    Drain a cursor into a list of dicts, FETCH_BATCH_SIZE rows at a time.
+
+    Unlike fetchall(), this never holds the full list of sqlite3.Row objects
+    alongside the dicts built from them.
+    """
+    results = []
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return results
+        results.extend(dict(row) for row in rows)
+
+
+def _bulk_insert(
+    db_path: str,
+    sql: str,
+    rows: List[Sequence[Any]],
+    conn: Optional[sqlite3.Connection] = None
+) -> List[int]:
+    """
+    Insert many rows with one executemany and a single commit.
+
+    The write lock is held for the whole batch and every table here uses
+    AUTOINCREMENT, so the new IDs are consecutive and end at last_insert_rowid().
+    If ``conn`` already has a transaction open, the rows join it and the
+    caller stays responsible for committing or rolling it back.
+
+    Returns:
+        IDs of the inserted rows, in input order
+    """
+    if not rows:
+        return []
+
+    with _use_connection(db_path, conn) as conn:
+        cursor = conn.cursor()
+        owns_transaction = not conn.in_transaction
 
-    conn.commit()
-    conn.close()
+        try:
+            if owns_transaction:
+                cursor.execute("BEGIN IMMEDIATE")
+            cursor.executemany(sql, rows)
+            last_id = cursor.execute("SELECT last_insert_rowid()").fetchone()[0]
+            if owns_transaction:
+                conn.commit()
+        except Exception:
+            if owns_transaction:
+                conn.rollback()
+            raise
+
+        return list(range(last_id - len(rows) + 1, last_id + 1))
 
 
 # ============================================================
 # Customer Operations
 # ============================================================
 
+_INSERT_CUSTOMER_SQL = """
+    INSERT INTO customers (name, phone, email)
+    VALUES (?, ?, ?)
+"""
+
 def create_customer(
     db_path: str,
     name: str,
     phone: str,
-    email: Optional[str] = None
+    email: Optional[str] = None,
+    conn: Optional[sqlite3.Connection] = None
 ) -> int:
     """
     Create a new customer.
@@ -75,6 +207,7 @@ def create_customer(
         name: Customer name
         phone: Phone number (unique)
         email: Email address (optional)
+        conn: Open connection to reuse (optional)
 
     Returns:
         Customer ID
@@ -82,53 +215,73 @@ def create_customer(
     Raises:
         sqlite3.IntegrityError: If phone already exists
     """
-    conn = get_connection(db_path)
-    cursor = conn.cursor()
+    with _use_connection(db_path, conn) as conn:
+        cursor = conn.cursor()
 
-    cursor.execute("""
-        INSERT INTO customers (name, phone, email)
-        VALUES (?, ?, ?)
-    """, (name, phone, email))
+        cursor.execute(_INSERT_CUSTOMER_SQL, (name, phone, email))
 
-    customer_id = cursor.lastrowid
+        customer_id = cursor.lastrowid
 
-    conn.commit()
-    conn.close()
+        conn.commit()
 
-    return customer_id
+        return customer_id
 
 
-def get_customer_by_phone(db_path: str, phone: str) -> Optional[Dict[str, Any]]:
+def bulk_create_customers(
+    db_path: str,
+    customers: List[Tuple[str, str, Optional[str]]],
+    conn: Optional[sqlite3.Connection] = None
+) -> List[int]:
+    """
+    Create many customers in one transaction.
+
+    Args:
+        db_path: Path to database
+        customers: (name, phone, email) tuples
+        conn: Open connection to reuse (optional)
+
+    Returns:
+        Customer IDs, in input order
+    """
+    return _bulk_insert(db_path, _INSERT_CUSTOMER_SQL, customers, conn=conn)
+
+
+def get_customer_by_phone(
+    db_path: str,
+    phone: str,
+    conn: Optional[sqlite3.Connection] = None
+) -> Optional[Dict[str, Any]]:
     """
     Retrieve customer by phone number.
 
     Args:
         db_path: Path to database
         phone: Phone number to search
+        conn: Open connection to reuse (optional)
 
     Returns:
         Customer dict or None if not found
     """
-    conn = get_connection(db_path)
-    cursor = conn.cursor()
+    with _use_connection(db_path, conn) as conn:
+        cursor = conn.cursor()
 
-    cursor.execute("""
-        SELECT * FROM customers WHERE phone = ?
-    """, (phone,))
+        cursor.execute("""
+            SELECT id, name, phone, email FROM customers WHERE phone = ?
+        """, (phone,))
 
-    row = cursor.fetchone()
-    conn.close()
+        row = cursor.fetchone()
 
-    if row:
-        return dict(row)
-    return None
+        if row:
+            return dict(row)
+        return None
 
 
 def get_or_create_customer(
     db_path: str,
     name: str,
     phone: str,
-    email: Optional[str] = None
+    email: Optional[str] = None,
+    conn: Optional[sqlite3.Connection] = None
 ) -> Dict[str, Any]:
     """
     Get existing customer or create new one.
@@ -138,56 +291,55 @@ def get_or_create_customer(
         name: Customer name
         phone: Phone number
         email: Email address (optional)
+        conn: Open connection to reuse (optional)
 
     Returns:
         Customer dict
     """
-    customer = get_customer_by_phone(db_path, phone)
-
-    if customer:
-        # Update name if different
-        if customer['name'] != name:
-            conn = get_connection(db_path)
-            cursor = conn.cursor()
-            cursor.execute("""
-                UPDATE customers SET name = ? WHERE phone = ?
-            """, (name, phone))
-            conn.commit()
-            conn.close()
-            customer['name'] = name
-
+    # Returning guests under the same name (the usual login) need one SELECT
+    customer = get_customer_by_phone(db_path, phone, conn=conn)
+    if customer and customer['name'] == name:
         return customer
 
-    # Create new customer
-    customer_id = create_customer(db_path, name, phone, email)
-    return get_customer_by_phone(db_path, phone)
+    # New guest or changed name: one UPSERT inserts or renames and hands the
+    # row back (RETURNING needs SQLite 3.35+); an existing email is kept
+    with _use_connection(db_path, conn) as conn:
+        row = conn.execute("""
+            INSERT INTO customers (name, phone, email)
+            VALUES (?, ?, ?)
+            ON CONFLICT(phone) DO UPDATE SET name = excluded.name
+            RETURNING id, name, phone, email
+        """, (name, phone, email)).fetchone()
+        conn.commit()
+
+    return dict(row)
 
 
 # ============================================================
 # Restaurant Operations
 # ============================================================
 
-def create_restaurant(db_path: str, restaurant_data: Dict[str, Any]) -> int:
-    """
-    Create a new restaurant.
-
-    Args:
-        db_path: Path to database
-        restaurant_data: Dictionary with restaurant details
+# Columns returned for a restaurant row (everything but created_at, which no
+# caller reads and which would otherwise ride along into every tool result)
+RESTAURANT_COLUMNS = (
+    "id", "name", "cuisine", "latitude", "longitude", "address", "city",
+    "total_capacity", "available_tables", "price_range", "rating",
+    "opening_time", "closing_time", "has_parking", "has_outdoor_seating",
+)
+_RESTAURANT_SELECT = ", ".join(f"r.{column}" for column in RESTAURANT_COLUMNS)
+
+_INSERT_RESTAURANT_SQL = """
+    INSERT INTO restaurants (
+        name, cuisine, latitude, longitude, address, city,
+        total_capacity, available_tables, price_range, rating,
+        opening_time, closing_time, has_parking, has_outdoor_seating
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
 
-    Returns:
-        Restaurant ID
-    """
-    conn = get_connection(db_path)
-    cursor = conn.cursor()
 
-    cursor.execute("""
-        INSERT INTO restaurants (
-            name, cuisine, latitude, longitude, address, city,
-            total_capacity, available_tables, price_range, rating,
-            opening_time, closing_time, has_parking, has_outdoor_seating
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, (
+def _restaurant_params(restaurant_data: Dict[str, Any]) -> Tuple[Any, ...]:
+    """Bind parameters for _INSERT_RESTAURANT_SQL, applying defaults."""
+    return (
         restaurant_data['name'],
         restaurant_data['cuisine'],
         restaurant_data['latitude'],
@@ -196,53 +348,118 @@ def create_restaurant(db_path: str, restaurant_data: Dict[str, Any]) -> int:
         restaurant_data.get('city', 'Chennai'),
         restaurant_data['total_capacity'],
         restaurant_data['available_tables'],
-        restaurant_data.get('price_range', '₹₹'),
+        normalize_price_range(restaurant_data.get('price_range', '₹₹')),
         restaurant_data.get('rating', 4.0),
         restaurant_data.get('opening_time', '11:00'),
         restaurant_data.get('closing_time', '23:00'),
         restaurant_data.get('has_parking', 0),
         restaurant_data.get('has_outdoor_seating', 0)
-    ))
+    )
 
-    restaurant_id = cursor.lastrowid
 
-    conn.commit()
-    conn.close()
+def create_restaurant(
+    db_path: str,
+    restaurant_data: Dict[str, Any],
+    conn: Optional[sqlite3.Connection] = None
+) -> int:
+    """
+    Create a new restaurant.
+
+    Args:
+        db_path: Path to database
+        restaurant_data: Dictionary with restaurant details
+        conn: Open connection to reuse (optional)
+
+    Returns:
+        Restaurant ID
+    """
+    with _use_connection(db_path, conn) as conn:
+        cursor = conn.cursor()
 
-    return restaurant_id
+        cursor.execute(_INSERT_RESTAURANT_SQL, _restaurant_params(restaurant_data))
+
+        restaurant_id = cursor.lastrowid
+
+        conn.commit()
 
+        return restaurant_id
 
-def get_restaurant_by_id(db_path: str, restaurant_id: int) -> Optional[Dict[str, Any]]:
+
+def bulk_create_restaurants(
+    db_path: str,
+    restaurants: List[Dict[str, Any]],
+    conn: Optional[sqlite3.Connection] = None
+) -> List[int]:
+    """
+    Create many restaurants in one transaction.
+
+    Args:
+        db_path: Path to database
+        restaurants: Dictionaries with restaurant details
+        conn: Open connection to reuse (optional)
+
+    Returns:
+        Restaurant IDs, in input order
+    """
+    rows = [_restaurant_params(restaurant_data) for restaurant_data in restaurants]
+    return _bulk_insert(db_path, _INSERT_RESTAURANT_SQL, rows, conn=conn)
+
+
+def get_restaurant_by_id(
+    db_path: str,
+    restaurant_id: int,
+    conn: Optional[sqlite3.Connection] = None
+) -> Optional[Dict[str, Any]]:
     """
     Retrieve restaurant by ID.
 
     Args:
         db_path: Path to database
         restaurant_id: Restaurant ID
+        conn: Open connection to reuse (optional)
 
     Returns:
         Restaurant dict or None if not found
     """
-    conn = get_connection(db_path)
-    cursor = conn.cursor()
+    with _use_connection(db_path, conn) as conn:
+        cursor = conn.cursor()
 
-    cursor.execute("""
-        SELECT * FROM restaurants WHERE id = ?
-    """, (restaurant_id,))
+        cursor.execute(f"""
+            SELECT {_RESTAURANT_SELECT} FROM restaurants r WHERE r.id = ?
+        """, (restaurant_id,))
+
+        row = cursor.fetchone()
+
+        if row:
+            return dict(row)
+        return None
+
+
+def _escape_like(text: str) -> str:
+    """Escape LIKE wildcards so user text matches literally."""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
 
-    row = cursor.fetchone()
-    conn.close()
 
-    if row:
-        return dict(row)
-    return None
+# The trigram tokenizer only indexes substrings of at least this many characters
+FTS_TRIGRAM_MIN_CHARS = 3
+
+
+def _fts_phrase(text: str) -> str:
+    """Quote user text as one FTS5 phrase (a literal substring for trigrams)."""
+    return '"' + text.replace('"', '""') + '"'
 
 
 def get_restaurants(
     db_path: str,
     cuisine: Optional[str] = None,
     min_rating: Optional[float] = None,
-    price_range: Optional[str] = None
+    price_range: Optional[str] = None,
+    name_like: Optional[str] = None,
+    bbox: Optional[Tuple[float, float, float, float]] = None,
+    offers_date: Optional[str] = None,
+    has_parking: Optional[bool] = None,
+    has_offers: Optional[bool] = None,
+    conn: Optional[sqlite3.Connection] = None
 ) -> List[Dict[str, Any]]:
     """
     Retrieve restaurants with optional filters.
@@ -252,41 +469,95 @@ def get_restaurants(
         cuisine: Filter by cuisine type
         min_rating: Minimum rating
         price_range: Filter by price range
+        name_like: Case-insensitive substring the name must contain
+            (trigram FTS5 index for 3+ characters, LIKE scan otherwise)
+        bbox: (min_lat, max_lat, min_lon, max_lon) box the location must
+            fall in, answered from the R*Tree index
+        offers_date: When given, join that day's active offers and add
+            ``has_active_offers`` and ``offer_preview`` (first offer title)
+        has_parking: Only restaurants with parking
+        has_offers: Only restaurants with an active offer on offers_date
+            (default: today)
+        conn: Open connection to reuse (optional)
 
     Returns:
         List of restaurant dicts
     """
-    conn = get_connection(db_path)
-    cursor = conn.cursor()
-
-    query = "SELECT * FROM restaurants WHERE 1=1"
-    params = []
-
-    if cuisine:
-        query += " AND cuisine = ?"
-        params.append(cuisine)
-
-    if min_rating is not None:
-        query += " AND rating >= ?"
-        params.append(min_rating)
-
-    if price_range:
-        query += " AND price_range = ?"
-        params.append(price_range)
-
-    query += " ORDER BY rating DESC"
-
-    cursor.execute(query, params)
-    rows = cursor.fetchall()
-    conn.close()
-
-    return [dict(row) for row in rows]
+    if has_offers and offers_date is None:
+        offers_date = datetime.now().strftime('%Y-%m-%d')
+
+    with _use_connection(db_path, conn) as conn:
+        cursor = conn.cursor()
+
+        params = []
+        if offers_date is not None:
+            # One offer per restaurant: SQLite returns the bare offer_title
+            # from the row holding MIN(id), i.e. the first one created
+            query = f"""SELECT {_RESTAURANT_SELECT}, o.offer_title AS offer_preview
+                FROM restaurants r
+                LEFT JOIN (
+                    SELECT restaurant_id, offer_title, MIN(id)
+                    FROM daily_offers
+                    WHERE is_active = 1 AND valid_from <= ? AND valid_until >= ?
+                    GROUP BY restaurant_id
+                ) o ON o.restaurant_id = r.id
+                WHERE 1=1"""
+            params.extend([offers_date, offers_date])
+        else:
+            query = f"SELECT {_RESTAURANT_SELECT} FROM restaurants r WHERE 1=1"
+
+        if cuisine:
+            query += " AND r.cuisine = ?"
+            params.append(cuisine)
+
+        if min_rating is not None:
+            query += " AND r.rating >= ?"
+            params.append(min_rating)
+
+        if price_range:
+            query += " AND r.price_range = ?"
+            params.append(price_range)
+
+        if name_like and len(name_like) >= FTS_TRIGRAM_MIN_CHARS:
+            # Substring match served by the trigram full-text index
+            query += """ AND r.id IN (
+                SELECT rowid FROM restaurants_fts WHERE restaurants_fts MATCH ?
+            )"""
+            params.append(_fts_phrase(name_like))
+        elif name_like:
+            query += " AND LOWER(r.name) LIKE ? ESCAPE '\\'"
+            params.append(f"%{_escape_like(name_like.lower())}%")
+
+        if bbox is not None:
+            query += """ AND r.id IN (
+                SELECT id FROM restaurants_rtree
+                WHERE max_lat >= ? AND min_lat <= ? AND max_lon >= ? AND min_lon <= ?
+            )"""
+            params.extend(bbox)
+
+        if has_parking:
+            query += " AND r.has_parking = 1"
+
+        if has_offers:
+            query += " AND o.offer_title IS NOT NULL"
+
+        query += " ORDER BY r.rating DESC"
+
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+
+        restaurants = [dict(row) for row in rows]
+        if offers_date is not None:
+            for restaurant in restaurants:
+                restaurant["has_active_offers"] = restaurant["offer_preview"] is not None
+        return restaurants
 
 
 def update_restaurant_tables(
     db_path: str,
     restaurant_id: int,
-    increment: int
+    increment: int,
+    conn: Optional[sqlite3.Connection] = None
 ) -> bool:
     """
     Update available tables count.
@@ -295,84 +566,182 @@ def update_restaurant_tables(
         db_path: Path to database
         restaurant_id: Restaurant ID
         increment: Amount to add (negative to subtract)
+        conn: Open connection to reuse (optional)
 
     Returns:
         True if successful
     """
-    conn = get_connection(db_path)
-    cursor = conn.cursor()
+    with _use_connection(db_path, conn) as conn:
+        cursor = conn.cursor()
 
-    cursor.execute("""
-        UPDATE restaurants
-        SET available_tables = available_tables + ?
-        WHERE id = ?
-    """, (increment, restaurant_id))
+        cursor.execute("""
+            UPDATE restaurants
+            SET available_tables = available_tables + ?
+            WHERE id = ?
+        """, (increment, restaurant_id))
 
-    success = cursor.rowcount > 0
+        success = cursor.rowcount > 0
 
-    conn.commit()
-    conn.close()
+        conn.commit()
 
-    return success
+        return success
 
 
 # ============================================================
 # Reservation Operations
 # ============================================================
 
-def create_reservation(db_path: str, reservation_data: Dict[str, Any]) -> int:
+def create_reservation(
+    db_path: str,
+    reservation_data: Dict[str, Any],
+    conn: Optional[sqlite3.Connection] = None
+) -> Optional[int]:
     """
     Create a new reservation and decrement available tables.
 
+    If ``conn`` already has a transaction open, the booking joins it and the
+    caller stays responsible for committing or rolling it back.
+
     Args:
         db_path: Path to database
         reservation_data: Dictionary with reservation details
+        conn: Open connection to reuse (optional)
 
     Returns:
-        Reservation ID
+        Reservation ID, or None if the restaurant has no table left
     """
-    conn = get_connection(db_path)
-    cursor = conn.cursor()
+    booking = reserve_table(db_path, reservation_data, conn=conn)
+    return booking[0] if booking else None
 
-    try:
-        # Create reservation
-        cursor.execute("""
-            INSERT INTO reservations (
-                customer_id, restaurant_id, reservation_date,
-                reservation_time, party_size, special_requests
-            ) VALUES (?, ?, ?, ?, ?, ?)
-        """, (
-            reservation_data['customer_id'],
-            reservation_data['restaurant_id'],
-            reservation_data['reservation_date'],
-            reservation_data['reservation_time'],
-            reservation_data['party_size'],
-            reservation_data.get('special_requests')
-        ))
 
-        reservation_id = cursor.lastrowid
+def reserve_table(
+    db_path: str,
+    reservation_data: Dict[str, Any],
+    conn: Optional[sqlite3.Connection] = None
+) -> Optional[Tuple[int, int]]:
+    """
+    Create a reservation as create_reservation does, also reporting availability.
 
-        # Decrement available tables
-        cursor.execute("""
-            UPDATE restaurants
-            SET available_tables = available_tables - 1
-            WHERE id = ?
-        """, (reservation_data['restaurant_id'],))
+    Args:
+        db_path: Path to database
+        reservation_data: Dictionary with reservation details
+        conn: Open connection to reuse (optional)
 
-        conn.commit()
-        return reservation_id
+    Returns:
+        (reservation ID, tables left at the restaurant after this booking),
+        or None if the restaurant has no table left
+    """
+    with _use_connection(db_path, conn) as conn:
+        cursor = conn.cursor()
+        owns_transaction = not conn.in_transaction
+
+        try:
+            # Take the write lock up front so a concurrent writer makes us
+            # wait in the busy handler instead of failing mid-transaction
+            if owns_transaction:
+                cursor.execute("BEGIN IMMEDIATE")
+
+            booking = _book_table(cursor, reservation_data)
+            if owns_transaction:
+                if booking is None:
+                    conn.rollback()  # nothing written; release the write lock
+                else:
+                    conn.commit()
+            return booking
+
+        except Exception as e:
+            if owns_transaction:
+                conn.rollback()
+            raise e
+
+
+def bulk_create_reservations(
+    db_path: str,
+    reservations: List[Dict[str, Any]],
+    conn: Optional[sqlite3.Connection] = None
+) -> List[Optional[int]]:
+    """
+    Create many reservations in one transaction.
 
-    except Exception as e:
-        conn.rollback()
-        raise e
+    Each booking claims a table exactly as create_reservation does; bookings
+    for a restaurant with no table left are skipped rather than aborting
+    the batch. If ``conn`` already has a transaction open, the bookings join
+    it and the caller stays responsible for committing or rolling it back.
 
-    finally:
-        conn.close()
+    Args:
+        db_path: Path to database
+        reservations: Dictionaries with reservation details
+        conn: Open connection to reuse (optional)
+
+    Returns:
+        Reservation IDs in input order (None where the restaurant was full)
+    """
+    if not reservations:
+        return []
+
+    with _use_connection(db_path, conn) as conn:
+        cursor = conn.cursor()
+        owns_transaction = not conn.in_transaction
+
+        try:
+            if owns_transaction:
+                cursor.execute("BEGIN IMMEDIATE")
+            bookings = [_book_table(cursor, data) for data in reservations]
+            if owns_transaction:
+                conn.commit()
+        except Exception:
+            if owns_transaction:
+                conn.rollback()
+            raise
+
+        return [booking[0] if booking else None for booking in bookings]
+
+
+def _book_table(
+    cursor: sqlite3.Cursor,
+    reservation_data: Dict[str, Any]
+) -> Optional[Tuple[int, int]]:
+    """
+    Claim a table and insert the reservation inside the caller's transaction.
+
+    Returns:
+        (reservation ID, tables left after the claim), or None (with nothing
+        written) if no table is left
+    """
+    # Claim a table; the guard keeps the counter from going negative and the
+    # new count comes back from the same statement
+    claimed = cursor.execute("""
+        UPDATE restaurants
+        SET available_tables = available_tables - 1
+        WHERE id = ? AND available_tables > 0
+        RETURNING available_tables
+    """, (reservation_data['restaurant_id'],)).fetchone()
+
+    if claimed is None:
+        return None
+
+    # Create reservation
+    cursor.execute("""
+        INSERT INTO reservations (
+            customer_id, restaurant_id, reservation_date,
+            reservation_time, party_size, special_requests
+        ) VALUES (?, ?, ?, ?, ?, ?)
+    """, (
+        reservation_data['customer_id'],
+        reservation_data['restaurant_id'],
+        reservation_data['reservation_date'],
+        reservation_data['reservation_time'],
+        reservation_data['party_size'],
+        reservation_data.get('special_requests')
+    ))
+
+    return cursor.lastrowid, claimed[0]
 
 
 def get_reservation_by_id(
     db_path: str,
-    reservation_id: int
+    reservation_id: int,
+    conn: Optional[sqlite3.Connection] = None
 ) -> Optional[Dict[str, Any]]:
     """
     Retrieve reservation by ID.
@@ -380,29 +749,30 @@ def get_reservation_by_id(
     Args:
         db_path: Path to database
         reservation_id: Reservation ID
+        conn: Open connection to reuse (optional)
 
     Returns:
         Reservation dict or None if not found
     """
-    conn = get_connection(db_path)
-    cursor = conn.cursor()
+    with _use_connection(db_path, conn) as conn:
+        cursor = conn.cursor()
 
-    cursor.execute("""
-        SELECT * FROM reservations WHERE id = ?
-    """, (reservation_id,))
+        cursor.execute("""
+            SELECT * FROM reservations WHERE id = ?
+        """, (reservation_id,))
 
-    row = cursor.fetchone()
-    conn.close()
+        row = cursor.fetchone()
 
-    if row:
-        return dict(row)
-    return None
+        if row:
+            return dict(row)
+        return None
 
 
 def update_reservation_status(
     db_path: str,
     reservation_id: int,
-    status: str
+    status: str,
+    conn: Optional[sqlite3.Connection] = None
 ) -> bool:
     """
     Update reservation status.
@@ -411,83 +781,119 @@ def update_reservation_status(
         db_path: Path to database
         reservation_id: Reservation ID
         status: New status (confirmed, cancelled, completed, no_show)
+        conn: Open connection to reuse (optional)
 
     Returns:
         True if successful
     """
-    conn = get_connection(db_path)
-    cursor = conn.cursor()
+    with _use_connection(db_path, conn) as conn:
+        cursor = conn.cursor()
 
-    cursor.execute("""
-        UPDATE reservations
-        SET status = ?, updated_at = CURRENT_TIMESTAMP
-        WHERE id = ?
-    """, (status, reservation_id))
+        cursor.execute("""
+            UPDATE reservations
+            SET status = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+        """, (status, reservation_id))
 
-    success = cursor.rowcount > 0
+        success = cursor.rowcount > 0
 
-    conn.commit()
-    conn.close()
+        conn.commit()
 
-    return success
+        return success
 
 
-def cancel_reservation(db_path: str, reservation_id: int) -> bool:
+def cancel_reservation(
+    db_path: str,
+    reservation_id: int,
+    conn: Optional[sqlite3.Connection] = None
+) -> bool:
     """
     Cancel a reservation and increment available tables.
 
+    If ``conn`` already has a transaction open, the updates join it and the
+    caller stays responsible for committing or rolling it back.
+
     Args:
         db_path: Path to database
         reservation_id: Reservation ID
+        conn: Open connection to reuse (optional)
 
     Returns:
         True if successful
     """
-    conn = get_connection(db_path)
-    cursor = conn.cursor()
+    with _use_connection(db_path, conn) as conn:
+        cursor = conn.cursor()
+        owns_transaction = not conn.in_transaction
 
-    try:
-        # Get reservation details
-        cursor.execute("""
-            SELECT restaurant_id, status FROM reservations WHERE id = ?
-        """, (reservation_id,))
+        try:
+            # Lock before reading the status so two cancels cannot both
+            # pass the check and release the table twice
+            if owns_transaction:
+                cursor.execute("BEGIN IMMEDIATE")
 
-        row = cursor.fetchone()
+            # Get reservation details
+            cursor.execute("""
+                SELECT restaurant_id, status FROM reservations WHERE id = ?
+            """, (reservation_id,))
 
-        if not row or row['status'] == 'cancelled':
-            return False
+            row = cursor.fetchone()
 
-        restaurant_id = row['restaurant_id']
+            if not row or row['status'] == 'cancelled':
+                if owns_transaction:
+                    conn.rollback()  # release the write lock
+                return False
 
-        # Update status
-        cursor.execute("""
-            UPDATE reservations
-            SET status = 'cancelled', updated_at = CURRENT_TIMESTAMP
-            WHERE id = ?
-        """, (reservation_id,))
+            restaurant_id = row['restaurant_id']
 
-        # Increment available tables
-        cursor.execute("""
-            UPDATE restaurants
-            SET available_tables = available_tables + 1
-            WHERE id = ?
-        """, (restaurant_id,))
+            # Update status
+            cursor.execute("""
+                UPDATE reservations
+                SET status = 'cancelled', updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            """, (reservation_id,))
 
-        conn.commit()
-        return True
+            # Increment available tables
+            cursor.execute("""
+                UPDATE restaurants
+                SET available_tables = available_tables + 1
+                WHERE id = ?
+            """, (restaurant_id,))
+
+            if owns_transaction:
+                conn.commit()
+            return True
+
+        except Exception as e:
+            if owns_transaction:
+                conn.rollback()
+            raise e
+
+
+_CUSTOMER_RESERVATIONS_SQL = """
+    SELECT
+        r.*,
+        rest.name as restaurant_name,
+        rest.cuisine,
+        rest.address
+    FROM reservations r
+    JOIN restaurants rest ON r.restaurant_id = rest.id
+    WHERE r.customer_id = ?{status_filter}
+    ORDER BY r.reservation_date DESC, r.reservation_time DESC
+"""
 
-    except Exception as e:
-        conn.rollback()
-        raise e
 
-    finally:
-        conn.close()
+def _customer_reservations_sql(filter_status: bool) -> str:
+    """SQL behind get_customer_reservations, optionally filtered by status."""
+    return _CUSTOMER_RESERVATIONS_SQL.format(
+        status_filter=" AND r.status = ?" if filter_status else ""
+    )
 
 
 def get_customer_reservations(
     db_path: str,
     customer_id: int,
-    status: Optional[str] = None
+    status: Optional[str] = None,
+    conn: Optional[sqlite3.Connection] = None
 ) -> List[Dict[str, Any]]:
     """
     Get all reservations for a customer.
@@ -496,83 +902,139 @@ def get_customer_reservations(
         db_path: Path to database
         customer_id: Customer ID
         status: Filter by status (optional)
+        conn: Open connection to reuse (optional)
 
     Returns:
         List of reservation dicts with restaurant details
     """
-    conn = get_connection(db_path)
-    cursor = conn.cursor()
+    with _use_connection(db_path, conn) as conn:
+        cursor = conn.cursor()
+
+        params = [customer_id]
+        if status:
+            params.append(status)
+
+        cursor.execute(_customer_reservations_sql(bool(status)), params)
 
-    query = """
-        SELECT
-            r.*,
-            rest.name as restaurant_name,
-            rest.cuisine,
-            rest.address
-        FROM reservations r
-        JOIN restaurants rest ON r.restaurant_id = rest.id
-        WHERE r.customer_id = ?
+        return _fetch_dicts(cursor)
+
+
+def get_reservation_for_customer(
+    db_path: str,
+    customer_id: int,
+    reservation_id: int,
+    conn: Optional[sqlite3.Connection] = None
+) -> Optional[Dict[str, Any]]:
     """
+    Get one of a customer's reservations by ID.
 
-    params = [customer_id]
+    Args:
+        db_path: Path to database
+        customer_id: Customer ID (must own the reservation)
+        reservation_id: Reservation ID
+        conn: Open connection to reuse (optional)
 
-    if status:
-        query += " AND r.status = ?"
-        params.append(status)
+    Returns:
+        Reservation dict with restaurant details, or None if not found
+    """
+    with _use_connection(db_path, conn) as conn:
+        cursor = conn.cursor()
 
-    query += " ORDER BY r.reservation_date DESC, r.reservation_time DESC"
+        cursor.execute("""
+            SELECT
+                r.*,
+                rest.name as restaurant_name,
+                rest.cuisine,
+                rest.address
+            FROM reservations r
+            JOIN restaurants rest ON r.restaurant_id = rest.id
+            WHERE r.id = ? AND r.customer_id = ?
+        """, (reservation_id, customer_id))
 
-    cursor.execute(query, params)
-    rows = cursor.fetchall()
-    conn.close()
+        row = cursor.fetchone()
 
-    return [dict(row) for row in rows]
+        if row:
+            return dict(row)
+        return None
 
 
 # ============================================================
 # Daily Offers Operations
 # ============================================================
 
-def create_daily_offer(db_path: str, offer_data: Dict[str, Any]) -> int:
+_INSERT_OFFER_SQL = """
+    INSERT INTO daily_offers (
+        restaurant_id, offer_title, offer_description,
+        discount_percentage, valid_from, valid_until
+    ) VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+
+def _offer_params(offer_data: Dict[str, Any]) -> Tuple[Any, ...]:
+    """Bind parameters for _INSERT_OFFER_SQL."""
+    return (
+        offer_data['restaurant_id'],
+        offer_data['offer_title'],
+        offer_data['offer_description'],
+        offer_data.get('discount_percentage'),
+        offer_data['valid_from'],
+        offer_data['valid_until']
+    )
+
+
+def create_daily_offer(
+    db_path: str,
+    offer_data: Dict[str, Any],
+    conn: Optional[sqlite3.Connection] = None
+) -> int:
     """
     Create a new daily offer.
 
     Args:
         db_path: Path to database
         offer_data: Dictionary with offer details
+        conn: Open connection to reuse (optional)
 
     Returns:
         Offer ID
     """
-    conn = get_connection(db_path)
-    cursor = conn.cursor()
+    with _use_connection(db_path, conn) as conn:
+        cursor = conn.cursor()
 
-    cursor.execute("""
-        INSERT INTO daily_offers (
-            restaurant_id, offer_title, offer_description,
-            discount_percentage, valid_from, valid_until
-        ) VALUES (?, ?, ?, ?, ?, ?)
-    """, (
-        offer_data['restaurant_id'],
-        offer_data['offer_title'],
-        offer_data['offer_description'],
-        offer_data.get('discount_percentage'),
-        offer_data['valid_from'],
-        offer_data['valid_until']
-    ))
+        cursor.execute(_INSERT_OFFER_SQL, _offer_params(offer_data))
+
+        offer_id = cursor.lastrowid
 
-    offer_id = cursor.lastrowid
+        conn.commit()
+
+        return offer_id
 
-    conn.commit()
-    conn.close()
 
-    return offer_id
+def bulk_create_daily_offers(
+    db_path: str,
+    offers: List[Dict[str, Any]],
+    conn: Optional[sqlite3.Connection] = None
+) -> List[int]:
+    """
+    Create many daily offers in one transaction.
+
+    Args:
+        db_path: Path to database
+        offers: Dictionaries with offer details
+        conn: Open connection to reuse (optional)
+
+    Returns:
+        Offer IDs, in input order
+    """
+    rows = [_offer_params(offer_data) for offer_data in offers]
+    return _bulk_insert(db_path, _INSERT_OFFER_SQL, rows, conn=conn)
 
 
 def get_active_offers(
     db_path: str,
     restaurant_id: int,
-    current_date: Optional[str] = None
+    current_date: Optional[str] = None,
+    conn: Optional[sqlite3.Connection] = None
 ) -> List[Dict[str, Any]]:
     """
     Get active offers for a restaurant.
@@ -581,6 +1043,7 @@ def get_active_offers(
         db_path: Path to database
         restaurant_id: Restaurant ID
         current_date: Date to check (default: today)
+        conn: Open connection to reuse (optional)
 
     Returns:
         List of offer dicts
@@ -588,64 +1051,151 @@ def get_active_offers(
     if current_date is None:
         current_date = datetime.now().strftime('%Y-%m-%d')
 
-    conn = get_connection(db_path)
-    cursor = conn.cursor()
+    with _use_connection(db_path, conn) as conn:
+        cursor = conn.cursor()
 
-    cursor.execute("""
-        SELECT * FROM daily_offers
-        WHERE restaurant_id = ?
-        AND is_active = 1
-        AND valid_from <= ?
-        AND valid_until >= ?
-    """, (restaurant_id, current_date, current_date))
+        cursor.execute("""
+            SELECT * FROM daily_offers
+            WHERE restaurant_id = ?
+            AND is_active = 1
+            AND valid_from <= ?
+            AND valid_until >= ?
+        """, (restaurant_id, current_date, current_date))
+
+        rows = cursor.fetchall()
+
+        return [dict(row) for row in rows]
+
+
+# SQLite's default bound-parameter limit is 999 on older builds; stay well under
+MAX_IN_PARAMS = 500
 
-    rows = cursor.fetchall()
-    conn.close()
 
-    return [dict(row) for row in rows]
+def get_active_offers_for_restaurants(
+    db_path: str,
+    restaurant_ids: Sequence[int],
+    current_date: Optional[str] = None,
+    conn: Optional[sqlite3.Connection] = None
+) -> Dict[int, List[Dict[str, Any]]]:
+    """
+    Get active offers for several restaurants in batched IN queries.
+
+    Args:
+        db_path: Path to database
+        restaurant_ids: Restaurant IDs
+        current_date: Date to check (default: today)
+        conn: Open connection to reuse (optional)
+
+    Returns:
+        Dict of restaurant ID to its offer dicts (every requested ID present)
+    """
+    if current_date is None:
+        current_date = datetime.now().strftime('%Y-%m-%d')
+
+    ids = list(dict.fromkeys(restaurant_ids))
+    offers: Dict[int, List[Dict[str, Any]]] = {restaurant_id: [] for restaurant_id in ids}
+
+    with _use_connection(db_path, conn) as conn:
+        cursor = conn.cursor()
+
+        for start in range(0, len(ids), MAX_IN_PARAMS):
+            chunk = ids[start:start + MAX_IN_PARAMS]
+            placeholders = ", ".join("?" * len(chunk))
+            cursor.execute(f"""
+                SELECT * FROM daily_offers
+                WHERE restaurant_id IN ({placeholders})
+                AND is_active = 1
+                AND valid_from <= ?
+                AND valid_until >= ?
+                ORDER BY id
+            """, (*chunk, current_date, current_date))
+
+            for row in cursor.fetchall():
+                offers[row['restaurant_id']].append(dict(row))
+
+    return offers
+
+
+def has_any_active_offers(
+    db_path: str,
+    current_date: Optional[str] = None,
+    conn: Optional[sqlite3.Connection] = None
+) -> bool:
+    """
+    Check whether any restaurant has an active offer.
+
+    Args:
+        db_path: Path to database
+        current_date: Date to check (default: today)
+        conn: Open connection to reuse (optional)
+
+    Returns:
+        True if at least one offer is active on that date
+    """
+    if current_date is None:
+        current_date = datetime.now().strftime('%Y-%m-%d')
+
+    with _use_connection(db_path, conn) as conn:
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            SELECT EXISTS (
+                SELECT 1 FROM daily_offers
+                WHERE is_active = 1
+                AND valid_from <= ?
+                AND valid_until >= ?
+            )
+        """, (current_date, current_date))
+
+        return bool(cursor.fetchone()[0])
 
 
 # ============================================================
 # Feedback Operations
 # ============================================================
 
-def create_feedback(db_path: str, feedback_data: Dict[str, Any]) -> int:
+def create_feedback(
+    db_path: str,
+    feedback_data: Dict[str, Any],
+    conn: Optional[sqlite3.Connection] = None
+) -> int:
     """
     Create customer feedback.
 
     Args:
         db_path: Path to database
         feedback_data: Dictionary with feedback details
+        conn: Open connection to reuse (optional)
 
     Returns:
         Feedback ID
     """
-    conn = get_connection(db_path)
-    cursor = conn.cursor()
+    with _use_connection(db_path, conn) as conn:
+        cursor = conn.cursor()
 
-    cursor.execute("""
-        INSERT INTO feedback (
-            customer_id, restaurant_id, reservation_id, rating, comment
-        ) VALUES (?, ?, ?, ?, ?)
-    """, (
-        feedback_data['customer_id'],
-        feedback_data['restaurant_id'],
-        feedback_data.get('reservation_id'),
-        feedback_data['rating'],
-        feedback_data.get('comment')
-    ))
+        cursor.execute("""
+            INSERT INTO feedback (
+                customer_id, restaurant_id, reservation_id, rating, comment
+            ) VALUES (?, ?, ?, ?, ?)
+        """, (
+            feedback_data['customer_id'],
+            feedback_data['restaurant_id'],
+            feedback_data.get('reservation_id'),
+            feedback_data['rating'],
+            feedback_data.get('comment')
+        ))
 
-    feedback_id = cursor.lastrowid
+        feedback_id = cursor.lastrowid
 
-    conn.commit()
-    conn.close()
+        conn.commit()
 
-    return feedback_id
+        return feedback_id
 
 
 def get_restaurant_feedback(
     db_path: str,
-    restaurant_id: int
+    restaurant_id: int,
+    conn: Optional[sqlite3.Connection] = None
 ) -> List[Dict[str, Any]]:
     """
     Get all feedback for a restaurant.
@@ -653,27 +1203,25 @@ def get_restaurant_feedback(
     Args:
         db_path: Path to database
         restaurant_id: Restaurant ID
+        conn: Open connection to reuse (optional)
 
     Returns:
         List of feedback dicts
     """
-    conn = get_connection(db_path)
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        SELECT
-            f.*,
-            c.name as customer_name
-        FROM feedback f
-        JOIN customers c ON f.customer_id = c.id
-        WHERE f.restaurant_id = ?
-        ORDER BY f.created_at DESC
-    """, (restaurant_id,))
+    with _use_connection(db_path, conn) as conn:
+        cursor = conn.cursor()
 
-    rows = cursor.fetchall()
-    conn.close()
+        cursor.execute("""
+            SELECT
+                f.*,
+                c.name as customer_name
+            FROM feedback f
+            JOIN customers c ON f.customer_id = c.id
+            WHERE f.restaurant_id = ?
+            ORDER BY f.created_at DESC
+        """, (restaurant_id,))
 
-    return [dict(row) for row in rows]
+        return _fetch_dicts(cursor)
 
 
 # ============================================================
@@ -685,7 +1233,8 @@ def save_conversation_message(
     customer_id: int,
     role: str,
     message: str,
-    tool_used: Optional[str] = None
+    tool_used: Optional[str] = None,
+    conn: Optional[sqlite3.Connection] = None
 ) -> int:
     """
     Save a conversation message to the conversation_logs table.
@@ -696,6 +1245,7 @@ def save_conversation_message(
         role: Message role ('user' or 'assistant')
         message: Message text
         tool_used: Name of tool used (optional, for assistant messages)
+        conn: Open connection to reuse (optional)
 
     Returns:
         Message ID
@@ -709,25 +1259,79 @@ def save_conversation_message(
     if not message or not message.strip():
         raise ValueError("Message cannot be empty")
 
-    conn = get_connection(db_path)
-    cursor = conn.cursor()
+    with _use_connection(db_path, conn) as conn:
+        cursor = conn.cursor()
 
-    cursor.execute("""
-        INSERT INTO conversation_logs (customer_id, role, message, tool_used)
-        VALUES (?, ?, ?, ?)
-    """, (customer_id, role, message, tool_used))
+        cursor.execute("""
+            INSERT INTO conversation_logs (customer_id, role, message, tool_used)
+            VALUES (?, ?, ?, ?)
+        """, (customer_id, role, message, tool_used))
+
+        message_id = cursor.lastrowid
+
+        conn.commit()
+
+        return message_id
+
+
+def save_conversation_messages(
+    db_path: str,
+    customer_id: int,
+    messages: Sequence[Tuple[str, str, Optional[str]]],
+    conn: Optional[sqlite3.Connection] = None
+) -> int:
+    """
+    Save several conversation messages in a single transaction.
 
-    message_id = cursor.lastrowid
+    If ``conn`` already has a transaction open, the inserts join it and the
+    caller stays responsible for committing or rolling it back.
 
-    conn.commit()
-    conn.close()
+    Args:
+        db_path: Path to database
+        customer_id: Customer ID
+        messages: (role, message, tool_used) tuples in chronological order
+        conn: Open connection to reuse (optional)
 
-    return message_id
+    Returns:
+        Number of messages saved
+
+    Raises:
+        ValueError: If any role is invalid or any message is empty
+    """
+    for role, message, _ in messages:
+        if role not in ('user', 'assistant'):
+            raise ValueError(f"Invalid role: {role}. Must be 'user' or 'assistant'")
+        if not message or not message.strip():
+            raise ValueError("Message cannot be empty")
+
+    if not messages:
+        return 0
+
+    with _use_connection(db_path, conn) as conn:
+        owns_transaction = not conn.in_transaction
+
+        try:
+            conn.executemany("""
+                INSERT INTO conversation_logs (customer_id, role, message, tool_used)
+                VALUES (?, ?, ?, ?)
+            """, [
+                (customer_id, role, message, tool_used)
+                for role, message, tool_used in messages
+            ])
+            if owns_transaction:
+                conn.commit()
+        except Exception:
+            if owns_transaction:
+                conn.rollback()
+            raise
+
+    return len(messages)
 
 
 def get_customer_conversations(
     db_path: str,
-    customer_id: int
+    customer_id: int,
+    conn: Optional[sqlite3.Connection] = None
 ) -> List[Dict[str, Any]]:
     """
     Retrieve all conversation messages for a customer.
@@ -735,63 +1339,72 @@ def get_customer_conversations(
     Args:
         db_path: Path to database
         customer_id: Customer ID
+        conn: Open connection to reuse (optional)
 
     Returns:
         List of conversation message dicts (ordered by time, oldest first)
     """
-    conn = get_connection(db_path)
-    cursor = conn.cursor()
+    with _use_connection(db_path, conn) as conn:
+        cursor = conn.cursor()
 
-    cursor.execute("""
-        SELECT
-            id,
-            customer_id,
-            role,
-            message,
-            tool_used,
-            created_at
-        FROM conversation_logs
-        WHERE customer_id = ?
-        ORDER BY created_at ASC
-    """, (customer_id,))
+        cursor.execute("""
+            SELECT
+                id,
+                customer_id,
+                role,
+                message,
+                tool_used,
+                created_at
+            FROM conversation_logs
+            WHERE customer_id = ?
+            ORDER BY created_at ASC, id ASC
+        """, (customer_id,))
 
-    rows = cursor.fetchall()
-    conn.close()
+        rows = cursor.fetchall()
 
-    return [dict(row) for row in rows]
+        return [dict(row) for row in rows]
 
 
-def get_all_conversations_summary(db_path: str) -> List[Dict[str, Any]]:
+def get_all_conversations_summary(
+    db_path: str,
+    conn: Optional[sqlite3.Connection] = None
+) -> List[Dict[str, Any]]:
     """
     Get summary of all customer conversations with their last message.
 
     Returns:
         List of dicts with customer info and last message
     """
-    conn = get_connection(db_path)
-    cursor = conn.cursor()
+    with _use_connection(db_path, conn) as conn:
+        cursor = conn.cursor()
 
-    cursor.execute("""
-        SELECT
-            c.id as customer_id,
-            c.name,
-            c.phone,
-            c.email,
-            last_msg.message as last_message,
-            last_msg.created_at as last_message_time,
-            (SELECT COUNT(*) FROM conversation_logs WHERE customer_id = c.id) as message_count
-        FROM customers c
-        INNER JOIN conversation_logs last_msg ON last_msg.id = (
-            SELECT id
-            FROM conversation_logs
-            WHERE customer_id = c.id
-            ORDER BY created_at DESC
-            LIMIT 1
-        )
-        ORDER BY last_msg.created_at DESC
-    """)
-
-    rows = cursor.fetchall()
-    conn.close()
-
-    return [dict(row) for row in rows]
+        # One pass over the log: rank each customer's messages newest first
+        # (rows written in one turn share a timestamp, so id breaks ties) and
+        # count them in the same window
+        cursor.execute("""
+            SELECT
+                c.id as customer_id,
+                c.name,
+                c.phone,
+                c.email,
+                last_msg.message as last_message,
+                last_msg.created_at as last_message_time,
+                last_msg.message_count
+            FROM customers c
+            INNER JOIN (
+                SELECT
+                    customer_id,
+                    message,
+                    created_at,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY customer_id ORDER BY created_at DESC, id DESC
+                    ) AS recency,
+                    COUNT(*) OVER (PARTITION BY customer_id) AS message_count
+                FROM conversation_logs
+            ) last_msg ON last_msg.customer_id = c.id AND last_msg.recency = 1
+            ORDER BY last_msg.created_at DESC
+        """)
+
+        rows = cursor.fetchall()
+
+        return [dict(row) for row in rows]
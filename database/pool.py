@@ -0,0 +1,153 @@
+"""
+SQLite connection pool shared by db_manager helpers and the agent tools.
+
+Connections are opened lazily (up to ``pool_size`` per database file), tuned
+once with WAL pragmas and handed out through ``get_pooled_connection``.
+"""
+
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+DEFAULT_POOL_SIZE = 10
+
+# Per-connection prepared-statement cache; search queries come in a few dozen
+# filter shapes, all with positional binds, so each shape is parsed only once
+STATEMENT_CACHE_SIZE = 256
+
+# Applied once per connection when it is opened
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",  # read through a 256 MB memory map
+    "PRAGMA cache_size=-20000",  # 20 MB page cache
+    "PRAGMA foreign_keys=ON",
+)
+
+
+class ConnectionPool:
+    """
+    Fixed-size pool of SQLite connections for one database file.
+    """
+
+    def __init__(self, db_path: str, pool_size: int = DEFAULT_POOL_SIZE, timeout: float = 10.0):
+        """
+        Initialize pool.
+
+        Args:
+            db_path: Path to SQLite database file
+            pool_size: Maximum number of open connections
+            timeout: Seconds to wait for a free connection (and for locks)
+        """
+        self.db_path = db_path
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+
+    def _open(self) -> sqlite3.Connection:
+        """Open and tune a new connection."""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.timeout,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+        conn.row_factory = sqlite3.Row  # Access columns by name
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        """
+        Take a connection from the pool, opening one if below capacity.
+
+        Raises:
+            TimeoutError: If no connection frees up within the timeout
+        """
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_open = self._opened < self.pool_size
+            if can_open:
+                self._opened += 1
+
+        if can_open:
+            try:
+                return self._open()
+            except Exception:
+                with self._lock:
+                    self._opened -= 1
+                raise
+
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No free SQLite connection for {self.db_path}") from None
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        """Return a connection, rolling back anything left uncommitted."""
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Context manager that acquires and releases a connection."""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self) -> None:
+        """Close all idle connections."""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._opened -= 1
+
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path: str) -> ConnectionPool:
+    """Return the process-wide pool for a database file, creating it once."""
+    pool = _pools.get(db_path)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.setdefault(db_path, ConnectionPool(db_path))
+    return pool
+
+
+@contextmanager
+def get_pooled_connection(db_path: str) -> Iterator[sqlite3.Connection]:
+    """
+    Borrow a pooled connection for the duration of a ``with`` block.
+
+    Args:
+        db_path: Path to SQLite database file
+    """
+    with get_pool(db_path).connection() as conn:
+        yield conn
+
+
+def close_all_pools() -> None:
+    """Close every pooled connection (used by tests and on shutdown)."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
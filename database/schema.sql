@@ -47,6 +47,82 @@ CREATE TABLE IF NOT EXISTS restaurants (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- ============================================================
+-- Table: restaurants_rtree
+-- R*Tree spatial index over restaurant coordinates (point boxes),
+-- kept in sync by triggers for bounding-box proximity prefilters
+-- ============================================================
+CREATE VIRTUAL TABLE IF NOT EXISTS restaurants_rtree USING rtree(
+    id,
+    min_lat, max_lat,
+    min_lon, max_lon
+);
+
+-- Backfill restaurants created before the index existed
+INSERT INTO restaurants_rtree (id, min_lat, max_lat, min_lon, max_lon)
+SELECT id, latitude, latitude, longitude, longitude
+FROM restaurants
+WHERE id NOT IN (SELECT id FROM restaurants_rtree);
+
+CREATE TRIGGER IF NOT EXISTS restaurants_rtree_insert
+AFTER INSERT ON restaurants
+BEGIN
+    INSERT INTO restaurants_rtree (id, min_lat, max_lat, min_lon, max_lon)
+    VALUES (NEW.id, NEW.latitude, NEW.latitude, NEW.longitude, NEW.longitude);
+END;
+
+CREATE TRIGGER IF NOT EXISTS restaurants_rtree_update
+AFTER UPDATE OF latitude, longitude ON restaurants
+BEGIN
+    UPDATE restaurants_rtree
+    SET min_lat = NEW.latitude, max_lat = NEW.latitude,
+        min_lon = NEW.longitude, max_lon = NEW.longitude
+    WHERE id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS restaurants_rtree_delete
+AFTER DELETE ON restaurants
+BEGIN
+    DELETE FROM restaurants_rtree WHERE id = OLD.id;
+END;
+
+-- ============================================================
+-- Table: restaurants_fts
+-- Trigram full-text index over restaurant names (external content),
+-- kept in sync by triggers; serves substring area searches
+-- ============================================================
+CREATE VIRTUAL TABLE IF NOT EXISTS restaurants_fts USING fts5(
+    name,
+    content='restaurants',
+    content_rowid='id',
+    tokenize='trigram'
+);
+
+-- Backfill restaurants created before the index existed
+INSERT INTO restaurants_fts (rowid, name)
+SELECT id, name
+FROM restaurants
+WHERE id NOT IN (SELECT id FROM restaurants_fts_docsize);
+
+CREATE TRIGGER IF NOT EXISTS restaurants_fts_insert
+AFTER INSERT ON restaurants
+BEGIN
+    INSERT INTO restaurants_fts (rowid, name) VALUES (NEW.id, NEW.name);
+END;
+
+CREATE TRIGGER IF NOT EXISTS restaurants_fts_update
+AFTER UPDATE OF name ON restaurants
+BEGIN
+    INSERT INTO restaurants_fts (restaurants_fts, rowid, name) VALUES ('delete', OLD.id, OLD.name);
+    INSERT INTO restaurants_fts (rowid, name) VALUES (NEW.id, NEW.name);
+END;
+
+CREATE TRIGGER IF NOT EXISTS restaurants_fts_delete
+AFTER DELETE ON restaurants
+BEGIN
+    INSERT INTO restaurants_fts (restaurants_fts, rowid, name) VALUES ('delete', OLD.id, OLD.name);
+END;
+
 -- ============================================================
 -- Table: reservations
 -- Stores booking information
@@ -145,16 +221,30 @@ CREATE TABLE IF NOT EXISTS feedback (
 CREATE INDEX IF NOT EXISTS idx_customers_phone ON customers(phone);
 CREATE INDEX IF NOT EXISTS idx_customers_email ON customers(email);
 
+-- Restaurant search filters
+CREATE INDEX IF NOT EXISTS idx_rest_parking_rating ON restaurants(has_parking, rating);
+CREATE INDEX IF NOT EXISTS idx_rest_price ON restaurants(price_range);
+
 -- Reservation queries
 CREATE INDEX IF NOT EXISTS idx_reservations_customer ON reservations(customer_id);
 CREATE INDEX IF NOT EXISTS idx_reservations_restaurant ON reservations(restaurant_id);
 CREATE INDEX IF NOT EXISTS idx_reservations_date ON reservations(reservation_date);
 CREATE INDEX IF NOT EXISTS idx_reservations_status ON reservations(status);
+-- A guest's bookings come back newest first straight from the index
+CREATE INDEX IF NOT EXISTS idx_reservations_cust_date
+ON reservations(customer_id, reservation_date DESC, reservation_time DESC);
 
 -- Offer queries
 CREATE INDEX IF NOT EXISTS idx_offers_restaurant ON daily_offers(restaurant_id);
 CREATE INDEX IF NOT EXISTS idx_offers_dates ON daily_offers(valid_from, valid_until);
+CREATE INDEX IF NOT EXISTS idx_offers_active
+ON daily_offers(is_active, valid_from, valid_until, restaurant_id);
+-- Per-restaurant active offer lookups (get_active_offers and its batched form)
+CREATE INDEX IF NOT EXISTS idx_offers_restaurant_active
+ON daily_offers(restaurant_id, is_active, valid_from, valid_until);
 
 -- Feedback queries
 CREATE INDEX IF NOT EXISTS idx_feedback_restaurant ON feedback(restaurant_id);
+CREATE INDEX IF NOT EXISTS idx_feedback_restaurant_created
+ON feedback(restaurant_id, created_at DESC);
 CREATE INDEX IF NOT EXISTS idx_feedback_customer ON feedback(customer_id);
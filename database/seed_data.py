@@ -9,21 +9,25 @@ Creates:
 - 20 themed offers tuned to Chennai's culinary culture.
 """
 
+import math
 import random
 import os
+import sqlite3
 import sys
 from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Optional
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from database.db_manager import (
+    get_connection,
     initialize_database,
-    create_customer,
-    create_restaurant,
-    create_reservation,
-    create_daily_offer
+    bulk_create_customers,
+    bulk_create_restaurants,
+    bulk_create_reservations,
+    bulk_create_daily_offers
 )
 
 
@@ -35,21 +39,21 @@ CHAIN_NAME = "GoodFoods"
 CITY_NAME = "Chennai"
 
 # Core neighbourhoods we want to feature across the city
-CHENNAI_DISTRICTS = [
+CHENNAI_DISTRICTS = (
     "T. Nagar", "Nungambakkam", "Anna Nagar", "Velachery",
     "Adyar", "Besant Nagar", "Mylapore", "Alwarpet",
     "OMR", "ECR", "Guindy", "Kilpauk",
     "Tambaram", "Porur", "Pallavaram"
-]
+)
 
 # Additional descriptors to create unique destination names
-LOCATION_DESCRIPTORS = [
+LOCATION_DESCRIPTORS = (
     "", " Social House", " Courtyard", " Pavilion", " Promenade",
     " Atelier", " Terrace", " Harbour", " Conservatory"
-]
+)
 
 # Service themes to guarantee coverage across all requested concepts
-SERVICE_THEMES = [
+SERVICE_THEMES = (
     {
         "name_suffix": "Café District",
         "cuisine": "Artisan Café & Brunch",
@@ -104,13 +108,13 @@ SERVICE_THEMES = [
         "parking_probability": 0.30,
         "outdoor_probability": 0.50
     }
-]
+)
 
 # Chennai coordinates range
 LAT_MIN, LAT_MAX = 12.90, 13.15
 LON_MIN, LON_MAX = 80.10, 80.32
 
-CHENNAI_AREAS = [
+CHENNAI_AREAS = (
     ("T. Nagar", 13.0418, 80.2337),
     ("Nungambakkam", 13.0615, 80.2425),
     ("Anna Nagar", 13.0879, 80.2128),
@@ -126,22 +130,47 @@ CHENNAI_AREAS = [
     ("Tambaram", 12.9229, 80.1279),
     ("Porur", 13.0492, 80.1764),
     ("Pallavaram", 12.9676, 80.1521)
-]
+)
 
-STREET_NAMES = [
+CHENNAI_AREA_COORDS = {name: (lat, lon) for name, lat, lon in CHENNAI_AREAS}
+
+STREET_NAMES = (
     "Cathedral Road", "Mount Road", "Tamarind Lane", "Whites Road",
     "Beach View Drive", "Canal Street", "Temple Street", "Mint Street",
     "Mahabalipuram Road", "Kotturpuram High Road"
-]
+)
+
 
+# Rows before a (theme, district, descriptor) combination repeats
+NAME_CYCLE = math.lcm(len(CHENNAI_DISTRICTS) * len(LOCATION_DESCRIPTORS), len(SERVICE_THEMES))
 
-def generate_restaurants(db_path: str, count: int = 75) -> list:
+# Base seed; each generator derives its own stream from it (see get_rng)
+SEED = 42
+
+
+def get_rng(name: str, seed: int = SEED) -> random.Random:
+    """
+    Return a RNG seeded from the generator's name.
+
+    Each generator draws from its own stream, so its output does not depend
+    on which generators ran before it. String seeds hash the same in every
+    process regardless of PYTHONHASHSEED.
+    """
+    return random.Random(f"{seed}:{name}")
+
+
+def generate_restaurants(
+    db_path: str,
+    count: int = 75,
+    rng: Optional[random.Random] = None,
+    conn: Optional[sqlite3.Connection] = None
+) -> list:
     """Generate GoodFoods destinations across Chennai."""
+    rng = rng or get_rng("generate_restaurants")
 
     print(f"\n🍽️  Generating {count} GoodFoods destinations...")
 
-    restaurants = []
-    used_names = set()
+    restaurant_rows = []
 
     for i in range(count):
         location = CHENNAI_DISTRICTS[i % len(CHENNAI_DISTRICTS)]
@@ -150,35 +179,31 @@ def generate_restaurants(db_path: str, count: int = 75) -> list:
 
         name = f"{CHAIN_NAME} {theme['name_suffix']} - {location}{descriptor}"
 
-        # Ensure uniqueness
-        counter = 1
-        original_name = name
-        while name in used_names:
-            name = f"{original_name} #{counter}"
-            counter += 1
-        used_names.add(name)
+        # Unique by construction; only later laps through the cycle need a number
+        lap = i // NAME_CYCLE
+        if lap:
+            name = f"{name} #{lap}"
 
         # Get coordinates for neighbourhood
-        area_data = [a for a in CHENNAI_AREAS if a[0] == location]
-        if area_data:
-            _, base_lat, base_lon = area_data[0]
+        if location in CHENNAI_AREA_COORDS:
+            base_lat, base_lon = CHENNAI_AREA_COORDS[location]
         else:
-            _, base_lat, base_lon = random.choice(CHENNAI_AREAS)
+            _, base_lat, base_lon = rng.choice(CHENNAI_AREAS)
 
         # Subtle variance to keep geo spread believable
-        lat = max(LAT_MIN, min(base_lat + random.uniform(-0.015, 0.015), LAT_MAX))
-        lon = max(LON_MIN, min(base_lon + random.uniform(-0.015, 0.015), LON_MAX))
+        lat = max(LAT_MIN, min(base_lat + rng.uniform(-0.015, 0.015), LAT_MAX))
+        lon = max(LON_MIN, min(base_lon + rng.uniform(-0.015, 0.015), LON_MAX))
 
-        street = random.choice(STREET_NAMES)
-        address = f"{random.randint(10, 299)} {street}, {location}, {CITY_NAME}"
+        street = rng.choice(STREET_NAMES)
+        address = f"{rng.randint(10, 299)} {street}, {location}, {CITY_NAME}"
 
         # Ensure every restaurant looks available and lively
-        total_capacity = random.randint(40, 140)
-        available_tables = max(8, min(total_capacity // random.randint(4, 6), total_capacity - 10))
+        total_capacity = rng.randint(40, 140)
+        available_tables = max(8, min(total_capacity // rng.randint(4, 6), total_capacity - 10))
 
-        rating = round(random.uniform(4.1, 4.9), 1)
-        has_parking = 1 if random.random() < theme["parking_probability"] else 0
-        has_outdoor_seating = 1 if random.random() < theme["outdoor_probability"] else 0
+        rating = round(rng.uniform(4.1, 4.9), 1)
+        has_parking = 1 if rng.random() < theme["parking_probability"] else 0
+        has_outdoor_seating = 1 if rng.random() < theme["outdoor_probability"] else 0
 
         restaurant_data = {
             "name": name,
@@ -197,46 +222,52 @@ def generate_restaurants(db_path: str, count: int = 75) -> list:
             "has_outdoor_seating": has_outdoor_seating
         }
 
-        restaurant_id = create_restaurant(db_path, restaurant_data)
-        restaurants.append(restaurant_id)
+        restaurant_rows.append(restaurant_data)
 
-        if (i + 1) % 10 == 0:
-            print(f"   Created {i + 1} destinations...")
+    # One transaction for the whole batch instead of a commit per row
+    restaurants = bulk_create_restaurants(db_path, restaurant_rows, conn=conn)
 
     print(f"✅ Created {count} destinations!\n")
     return restaurants
 
 
-def generate_customers(db_path: str, count: int = 15) -> list:
+def generate_customers(
+    db_path: str,
+    count: int = 15,
+    rng: Optional[random.Random] = None,
+    conn: Optional[sqlite3.Connection] = None
+) -> list:
     """Generate mock guests representing Chennai locals."""
+    rng = rng or get_rng("generate_customers")
 
     print(f"👤 Generating {count} guests...")
 
-    first_names = [
+    first_names = (
         "Sridhar", "Karthik", "Harini", "Aishwarya", "Pradeep", "Divya",
         "Vignesh", "Shruti", "Rahul", "Yamini", "Aravind", "Meenakshi",
         "Sanjay", "Nandhini", "Varun", "Keerthi"
-    ]
+    )
 
-    last_names = [
+    last_names = (
         "Iyer", "Narayanan", "Subramaniam", "Sundaram", "Raman", "Bala",
         "Parthiban", "Swaminathan", "Krishnan", "Lakshmanan", "Raghavan", "Balaji"
-    ]
+    )
 
-    customers = []
+    customer_rows = []
 
     for _ in range(count):
-        name = f"{random.choice(first_names)} {random.choice(last_names)}"
-        phone = f"+91-{random.randint(8200000000, 9899999999)}"
+        name = f"{rng.choice(first_names)} {rng.choice(last_names)}"
+        phone = f"+91-{rng.randint(8200000000, 9899999999)}"
 
         # 70% have email
         email = None
-        if random.random() < 0.7:
+        if rng.random() < 0.7:
             first = name.split()[0].lower()
-            email = f"{first}{random.randint(1, 99)}@goodfoods.co"
+            email = f"{first}{rng.randint(1, 99)}@goodfoods.co"
 
-        customer_id = create_customer(db_path, name, phone, email)
-        customers.append(customer_id)
+        customer_rows.append((name, phone, email))
+
+    customers = bulk_create_customers(db_path, customer_rows, conn=conn)
 
     print(f"✅ Created {count} guests!\n")
     return customers
@@ -246,22 +277,26 @@ def generate_reservations(
     db_path: str,
     customers: list,
     restaurants: list,
-    count: int = 25
+    count: int = 25,
+    rng: Optional[random.Random] = None,
+    conn: Optional[sqlite3.Connection] = None
 ) -> list:
     """Generate mock reservations spanning breakfast to late-night lounges."""
+    rng = rng or get_rng("generate_reservations")
 
     print(f"📅 Generating {count} reservations...")
 
     reservations = []
+    reservation_rows = []
     today = datetime.now()
 
-    time_slots = [
+    time_slots = (
         "07:30", "08:00", "09:30", "11:00", "12:30", "13:00",
         "17:30", "18:30", "19:30", "20:00", "21:00", "22:00",
         "23:00"
-    ]
+    )
 
-    special_requests_options = [
+    special_requests_options = (
         None, None, None,
         "Need a quiet table for a client meeting",
         "Celebrating a golden jubilee anniversary",
@@ -269,50 +304,64 @@ def generate_reservations(
         "Prefer a sea-facing table",
         "Bringing kids, need booster seat",
         "Wine pairing recommendation please"
-    ]
+    )
 
     for _ in range(count):
-        customer_id = random.choice(customers)
-        restaurant_id = random.choice(restaurants)
+        customer_id = rng.choice(customers)
+        restaurant_id = rng.choice(restaurants)
 
-        rand = random.random()
+        rand = rng.random()
         if rand < 0.55:
-            date = today + timedelta(days=random.randint(2, 12))
+            date = today + timedelta(days=rng.randint(2, 12))
         elif rand < 0.85:
-            date = today + timedelta(days=random.randint(0, 1))
+            date = today + timedelta(days=rng.randint(0, 1))
         else:
-            date = today - timedelta(days=random.randint(1, 5))
+            date = today - timedelta(days=rng.randint(1, 5))
 
         reservation_date = date.strftime("%Y-%m-%d")
-        reservation_time = random.choice(time_slots)
-        party_size = random.choice([2, 2, 3, 4, 4, 5, 6, 7])
-        special_requests = random.choice(special_requests_options)
+        reservation_time = rng.choice(time_slots)
+        party_size = rng.choice((2, 2, 3, 4, 4, 5, 6, 7))
+        special_requests = rng.choice(special_requests_options)
 
-        reservation_data = {
+        reservation_rows.append({
             "customer_id": customer_id,
             "restaurant_id": restaurant_id,
             "reservation_date": reservation_date,
             "reservation_time": reservation_time,
             "party_size": party_size,
             "special_requests": special_requests
-        }
-
-        try:
-            reservation_id = create_reservation(db_path, reservation_data)
+        })
+
+    # One transaction for the whole batch instead of a commit per booking
+    try:
+        reservation_ids = bulk_create_reservations(db_path, reservation_rows, conn=conn)
+    except Exception as e:
+        print(f"   Warning: Could not create reservations: {e}")
+        reservation_ids = []
+
+    for reservation_data, reservation_id in zip(reservation_rows, reservation_ids):
+        if reservation_id is None:
+            print(f"   Warning: Restaurant {reservation_data['restaurant_id']} is fully booked")
+        else:
             reservations.append(reservation_id)
-        except Exception as e:
-            print(f"   Warning: Could not create reservation: {e}")
 
     print(f"✅ Created {len(reservations)} reservations!\n")
     return reservations
 
 
-def generate_offers(db_path: str, restaurants: list, count: int = 20) -> list:
+def generate_offers(
+    db_path: str,
+    restaurants: list,
+    count: int = 20,
+    rng: Optional[random.Random] = None,
+    conn: Optional[sqlite3.Connection] = None
+) -> list:
     """Generate themed daily offers for different service styles."""
+    rng = rng or get_rng("generate_offers")
 
     print(f"💰 Generating {count} offers...")
 
-    offer_templates = [
+    offer_templates = (
         ("Filter Coffee Sunrise", "Unlimited degree coffee with any breakfast platter", 25),
         ("Marina Brunch Board", "Brunch board for two with fresh catch specials", 20),
         ("Pasta e Vino Night", "Handmade pasta with complimentary prosecco pairings", 22),
@@ -323,16 +372,17 @@ def generate_offers(db_path: str, restaurants: list, count: int = 20) -> list:
         ("Early Bird Breakfast", "Flat 30% off on tiffin combos before 9 AM", 30),
         ("Madras High Tea", "Assorted savouries and desserts for evening tea", 24),
         ("Dessert Degustation", "Six-course plated dessert experience", 26)
-    ]
+    )
 
-    offers = []
+    offer_rows = []
+    today = datetime.now()
 
     for _ in range(count):
-        restaurant_id = random.choice(restaurants)
-        title, description, discount = random.choice(offer_templates)
+        restaurant_id = rng.choice(restaurants)
+        title, description, discount = rng.choice(offer_templates)
 
-        start_date = datetime.now() - timedelta(days=random.randint(0, 3))
-        end_date = start_date + timedelta(days=random.randint(10, 28))
+        start_date = today - timedelta(days=rng.randint(0, 3))
+        end_date = start_date + timedelta(days=rng.randint(10, 28))
 
         offer_data = {
             "restaurant_id": restaurant_id,
@@ -343,8 +393,9 @@ def generate_offers(db_path: str, restaurants: list, count: int = 20) -> list:
             "valid_until": end_date.strftime("%Y-%m-%d")
         }
 
-        offer_id = create_daily_offer(db_path, offer_data)
-        offers.append(offer_id)
+        offer_rows.append(offer_data)
+
+    offers = bulk_create_daily_offers(db_path, offer_rows, conn=conn)
 
     print(f"✅ Created {count} offers!\n")
     return offers
@@ -364,22 +415,35 @@ def main():
     initialize_database(db_path)
     print("✅ Database initialized!\n")
 
-    restaurants = generate_restaurants(db_path, count=75)
-    customers = generate_customers(db_path, count=15)
-    reservations = generate_reservations(db_path, customers, restaurants, count=25)
-    offers = generate_offers(db_path, restaurants, count=20)
-
-    print("=" * 64)
-    print("✅ GOODFOODS CHENNAI DATA READY!")
-    print("=" * 64)
-    print(f"\n📊 Summary:")
-    print(f"   • Destinations: {len(restaurants)}")
-    print(f"   • Guests: {len(customers)}")
-    print(f"   • Reservations: {len(reservations)}")
-    print(f"   • Offers: {len(offers)}")
-    print(f"\n📍 Database location: {db_path}\n")
+    # One connection (tuned by get_connection) serves the check and all four batches
+    conn = get_connection(db_path)
+    try:
+        # A second run would duplicate every destination and then fail on the
+        # seeded guests' unique phone numbers, so leave a seeded file alone
+        existing = conn.execute("SELECT COUNT(*) FROM restaurants").fetchone()[0]
+        if existing:
+            print(f"⏭️  {existing} destinations already seeded; delete {db_path} to start fresh.\n")
+            return
+
+        restaurants = generate_restaurants(db_path, count=75, conn=conn)
+        customers = generate_customers(db_path, count=15, conn=conn)
+        reservations = generate_reservations(db_path, customers, restaurants, count=25, conn=conn)
+        offers = generate_offers(db_path, restaurants, count=20, conn=conn)
+    finally:
+        conn.close()
+
+    print("\n".join((
+        "=" * 64,
+        "✅ GOODFOODS CHENNAI DATA READY!",
+        "=" * 64,
+        "\n📊 Summary:",
+        f"   • Destinations: {len(restaurants)}",
+        f"   • Guests: {len(customers)}",
+        f"   • Reservations: {len(reservations)}",
+        f"   • Offers: {len(offers)}",
+        f"\n📍 Database location: {db_path}\n",
+    )))
 
 
 if __name__ == "__main__":
-    random.seed(42)
     main()
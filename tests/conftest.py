@@ -15,6 +15,14 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 
+@pytest.fixture(autouse=True)
+def close_pools_after_test():
+    """Close pooled connections so each test starts from fresh handles."""
+    yield
+    from database.pool import close_all_pools
+    close_all_pools()
+
+
 @pytest.fixture
 def test_db_path(tmp_path):
     """Provide a temporary database path for testing."""
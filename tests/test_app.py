@@ -0,0 +1,50 @@
+"""
+Test suite for the Streamlit chat UI helpers.
+
+Skipped when Streamlit cannot be imported in the test environment.
+"""
+
+import json
+
+import pytest
+
+pytest.importorskip("streamlit", exc_type=ImportError)
+
+import app
+
+
+class RecordingPlaceholder:
+    """Stand-in for ``st.empty()`` that records what it was asked to show."""
+
+    def __init__(self):
+        self.shown = []
+        self.cleared = False
+
+    def text(self, body):
+        self.shown.append(body)
+
+    def empty(self):
+        self.cleared = True
+
+
+class TestStreamReply:
+    """Test what the chat placeholder shows while a reply streams."""
+
+    def test_stream_reply_shows_only_summary_text(self, monkeypatch):
+        """JSON-mode deltas surface as summary text, never as raw JSON."""
+        monkeypatch.setattr(app, "STREAM_REDRAW_SECONDS", 0)
+        reply = json.dumps({
+            "summary": "Two tables free tonight.",
+            "options": [{"title": "Sangeetha"}],
+        })
+        frames = [{"delta": reply[i:i + 4]} for i in range(0, len(reply), 4)]
+        frames.append({"done": True, "text": reply})
+        placeholder = RecordingPlaceholder()
+
+        response = app.stream_reply(frames, placeholder)
+
+        assert response["text"] == reply
+        assert placeholder.shown[-1] == "Two tables free tonight.▌"
+        for shown in placeholder.shown:
+            assert "{" not in shown and '"options"' not in shown
+        assert placeholder.cleared
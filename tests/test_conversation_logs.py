@@ -10,9 +10,11 @@ import tempfile
 import os
 
 from database.db_manager import (
+    get_connection,
     initialize_database,
     create_customer,
     save_conversation_message,
+    save_conversation_messages,
     get_customer_conversations,
     get_all_conversations_summary
 )
@@ -103,10 +105,12 @@ class TestConversationLogging:
 
     def test_retrieve_customer_conversations(self, test_db, test_customer):
         """Test retrieving all messages for a customer."""
-        # Save multiple messages
-        save_conversation_message(test_db, test_customer, 'user', "Message 1")
-        save_conversation_message(test_db, test_customer, 'assistant', "Response 1")
-        save_conversation_message(test_db, test_customer, 'user', "Message 2")
+        # Save multiple messages (one transaction, so they share a timestamp)
+        save_conversation_messages(test_db, test_customer, [
+            ('user', "Message 1", None),
+            ('assistant', "Response 1", None),
+            ('user', "Message 2", None),
+        ])
 
         conversations = get_customer_conversations(test_db, test_customer)
 
@@ -158,6 +162,43 @@ class TestConversationLogging:
         assert conv1[0]['message'] == 'Customer 1 message'
         assert conv2[0]['message'] == 'Customer 2 message'
 
+    def test_save_conversation_messages_batch(self, test_db, test_customer):
+        """Test saving a whole turn in one call keeps order and tool info."""
+        saved = save_conversation_messages(test_db, test_customer, [
+            ('user', "Offers today?", None),
+            ('assistant', "Two offers nearby", 'get_daily_offers'),
+        ])
+
+        conversations = get_customer_conversations(test_db, test_customer)
+
+        assert saved == 2
+        assert [c['message'] for c in conversations] == ["Offers today?", "Two offers nearby"]
+        assert conversations[1]['tool_used'] == 'get_daily_offers'
+
+    def test_save_conversation_messages_rejects_whole_batch(self, test_db, test_customer):
+        """Test that one invalid row prevents the batch from being written."""
+        with pytest.raises(ValueError):
+            save_conversation_messages(test_db, test_customer, [
+                ('user', "Valid message", None),
+                ('assistant', "   ", None),
+            ])
+
+        assert get_customer_conversations(test_db, test_customer) == []
+
+    def test_save_conversation_messages_joins_caller_transaction(self, test_db, test_customer):
+        """Test that rows saved on a caller's open transaction stay uncommitted."""
+        conn = get_connection(test_db)
+        try:
+            conn.execute("BEGIN")
+            save_conversation_messages(test_db, test_customer, [
+                ('user', "Pending message", None),
+            ], conn=conn)
+            assert conn.in_transaction
+            conn.rollback()
+        finally:
+            conn.close()
+
+        assert get_customer_conversations(test_db, test_customer) == []
 
 class TestConversationSummary:
     """Test suite for conversation summary functions."""
@@ -221,11 +262,13 @@ class TestConversationSummary:
     def test_summary_counts_all_messages(self, test_db, test_customer):
         """Test that message count includes ALL messages, not just last one."""
         # Save multiple messages
-        save_conversation_message(test_db, test_customer, 'user', "Message 1")
-        save_conversation_message(test_db, test_customer, 'assistant', "Response 1")
-        save_conversation_message(test_db, test_customer, 'user', "Message 2")
-        save_conversation_message(test_db, test_customer, 'assistant', "Response 2")
-        save_conversation_message(test_db, test_customer, 'user', "Message 3")
+        save_conversation_messages(test_db, test_customer, [
+            ('user', "Message 1", None),
+            ('assistant', "Response 1", None),
+            ('user', "Message 2", None),
+            ('assistant', "Response 2", None),
+            ('user', "Message 3", None),
+        ])
 
         summary = get_all_conversations_summary(test_db)
 
@@ -8,21 +8,30 @@ Following TDD approach - tests written before implementation.
 import pytest
 import sqlite3
 from database.db_manager import (
+    get_connection,
     initialize_database,
     create_customer,
     get_customer_by_phone,
+    get_or_create_customer,
+    bulk_create_customers,
     create_restaurant,
+    bulk_create_restaurants,
     get_restaurant_by_id,
     get_restaurants,
     create_reservation,
+    bulk_create_reservations,
     get_reservation_by_id,
     update_reservation_status,
     get_customer_reservations,
+    _customer_reservations_sql,
+    get_reservation_for_customer,
     cancel_reservation,
     create_daily_offer,
     get_active_offers,
+    has_any_active_offers,
     create_feedback
 )
+from database.pool import ConnectionPool, get_pool, get_pooled_connection, close_all_pools
 
 
 class TestDatabaseInitialization:
@@ -65,9 +74,52 @@ class TestDatabaseInitialization:
 
         assert 'idx_customers_phone' in indexes
         assert 'idx_reservations_customer' in indexes
+        assert 'idx_reservations_cust_date' in indexes
 
         conn.close()
 
+    def test_customer_reservations_read_in_index_order(self, test_db_path):
+        """Test that a guest's bookings are ordered by the composite index, not a sort."""
+        initialize_database(test_db_path)
+
+        conn = sqlite3.connect(test_db_path)
+        for filter_status, params in ((False, (1,)), (True, (1, 'confirmed'))):
+            sql = _customer_reservations_sql(filter_status)
+            plan = " ".join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params))
+
+            assert 'idx_reservations_cust_date' in plan
+            assert 'TEMP B-TREE' not in plan
+        conn.close()
+
+    def test_initialize_database_switches_file_to_wal(self, test_db_path):
+        """Test that a freshly initialized file stays in WAL mode for every opener."""
+        initialize_database(test_db_path)
+
+        conn = sqlite3.connect(test_db_path)
+        mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        conn.close()
+
+        assert mode == 'wal'
+
+    def test_initialize_database_restores_missing_objects(self, test_db_path):
+        """Re-running on an older file (missing an index) brings it up to date."""
+        initialize_database(test_db_path)
+
+        conn = sqlite3.connect(test_db_path)
+        conn.execute("DROP INDEX idx_reservations_cust_date")
+        conn.commit()
+        conn.close()
+
+        initialize_database(test_db_path)
+
+        conn = sqlite3.connect(test_db_path)
+        row = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='index' AND name='idx_reservations_cust_date'"
+        ).fetchone()
+        conn.close()
+
+        assert row is not None
+
 
 class TestCustomerOperations:
     """Test customer CRUD operations."""
@@ -148,6 +200,66 @@ class TestCustomerOperations:
         customer = get_customer_by_phone(test_db_path, "+91-9999999999")
         assert customer['email'] is None
 
+    def test_get_or_create_customer_creates_then_renames(self, test_db_path, sample_customer):
+        """First login creates the guest; a later login under a new name renames them."""
+        initialize_database(test_db_path)
+
+        created = get_or_create_customer(
+            test_db_path,
+            sample_customer['name'],
+            sample_customer['phone'],
+            sample_customer['email']
+        )
+        renamed = get_or_create_customer(test_db_path, "Johnny Doe", sample_customer['phone'])
+
+        assert created['name'] == sample_customer['name']
+        assert renamed['id'] == created['id']
+        assert renamed['name'] == "Johnny Doe"
+        assert renamed['email'] == sample_customer['email']
+        assert get_customer_by_phone(test_db_path, sample_customer['phone'])['name'] == "Johnny Doe"
+
+    def test_bulk_create_customers(self, test_db_path, sample_customer):
+        """Test that a bulk insert returns IDs in order and is all-or-nothing."""
+        initialize_database(test_db_path)
+
+        customer_ids = bulk_create_customers(test_db_path, [
+            ("Asha", "+91-9000000001", None),
+            ("Bala", "+91-9000000002", "bala@example.com"),
+        ])
+
+        assert get_customer_by_phone(test_db_path, "+91-9000000001")['id'] == customer_ids[0]
+        assert get_customer_by_phone(test_db_path, "+91-9000000002")['id'] == customer_ids[1]
+
+        # A duplicate phone anywhere in the batch rolls back the whole batch
+        with pytest.raises(sqlite3.IntegrityError):
+            bulk_create_customers(test_db_path, [
+                (sample_customer['name'], sample_customer['phone'], None),
+                ("Bala Again", "+91-9000000002", None),
+            ])
+
+        assert get_customer_by_phone(test_db_path, sample_customer['phone']) is None
+
+    def test_bulk_create_customers_joins_caller_transaction(self, test_db_path):
+        """Test that a caller's open transaction is neither committed nor rolled back."""
+        initialize_database(test_db_path)
+        conn = sqlite3.connect(test_db_path)
+        try:
+            conn.execute("BEGIN")
+            bulk_create_customers(test_db_path, [("Asha", "+91-9000000001", None)], conn=conn)
+            assert conn.in_transaction
+
+            with pytest.raises(sqlite3.IntegrityError):
+                bulk_create_customers(test_db_path, [("Asha", "+91-9000000001", None)], conn=conn)
+            # The failed batch left the caller's earlier insert pending
+            assert conn.in_transaction
+            assert conn.execute("SELECT COUNT(*) FROM customers").fetchone()[0] == 1
+
+            conn.rollback()
+        finally:
+            conn.close()
+
+        assert get_customer_by_phone(test_db_path, "+91-9000000001") is None
+
 
 class TestRestaurantOperations:
     """Test restaurant CRUD operations."""
@@ -174,6 +286,27 @@ class TestRestaurantOperations:
         assert restaurant['cuisine'] == sample_restaurant['cuisine']
         assert restaurant['rating'] == sample_restaurant['rating']
 
+    def test_create_restaurant_repairs_mojibake_price(self, test_db_path, sample_restaurant):
+        """Test legacy mojibake price bands are stored as canonical ₹."""
+        initialize_database(test_db_path)
+        legacy = {**sample_restaurant, "price_range": "â‚¹â‚¹â‚¹"}
+
+        restaurant_id = create_restaurant(test_db_path, legacy)
+        restaurant = get_restaurant_by_id(test_db_path, restaurant_id)
+
+        assert restaurant['price_range'] == "₹₹₹"
+
+    def test_bulk_create_restaurants_returns_ids_in_order(self, test_db_path, sample_restaurant):
+        """Test that bulk inserts report each row's ID in input order."""
+        initialize_database(test_db_path)
+        create_restaurant(test_db_path, sample_restaurant)
+
+        rows = [{**sample_restaurant, "name": f"GoodFoods Bulk {i}"} for i in range(3)]
+        restaurant_ids = bulk_create_restaurants(test_db_path, rows)
+
+        names = [get_restaurant_by_id(test_db_path, r_id)['name'] for r_id in restaurant_ids]
+        assert names == ["GoodFoods Bulk 0", "GoodFoods Bulk 1", "GoodFoods Bulk 2"]
+
     def test_get_restaurants_all(self, test_db_path, sample_restaurant):
         """Test retrieving all restaurants."""
         initialize_database(test_db_path)
@@ -211,6 +344,49 @@ class TestRestaurantOperations:
         assert len(italian_restaurants) == 1
         assert italian_restaurants[0]['cuisine'] == "Italian"
 
+    def test_get_restaurants_by_name_like(self, test_db_path, sample_restaurant):
+        """Test case-insensitive name substring filtering in SQL."""
+        initialize_database(test_db_path)
+
+        create_restaurant(test_db_path, sample_restaurant)
+        create_restaurant(test_db_path, {**sample_restaurant, 'name': "GoodFoods Besant Nagar"})
+        create_restaurant(test_db_path, {**sample_restaurant, 'name': "GoodFoods 100% Besant"})
+
+        matches = get_restaurants(test_db_path, name_like="besant nagar")
+        literal = get_restaurants(test_db_path, name_like="100%")
+
+        assert [r['name'] for r in matches] == ["GoodFoods Besant Nagar"]
+        assert [r['name'] for r in literal] == ["GoodFoods 100% Besant"]
+
+    def test_name_index_follows_renames(self, test_db_path, sample_restaurant):
+        """Test the trigram name index tracks updates and short queries still match."""
+        initialize_database(test_db_path)
+
+        restaurant_id = create_restaurant(test_db_path, {**sample_restaurant, 'name': "GoodFoods Adyar"})
+        conn = sqlite3.connect(test_db_path)
+        conn.execute("UPDATE restaurants SET name = ? WHERE id = ?", ("GoodFoods Mylapore", restaurant_id))
+        conn.commit()
+        conn.close()
+
+        assert get_restaurants(test_db_path, name_like="adyar") == []
+        assert [r['id'] for r in get_restaurants(test_db_path, name_like="MYLAP")] == [restaurant_id]
+        assert [r['id'] for r in get_restaurants(test_db_path, name_like="my")] == [restaurant_id]
+
+    def test_get_restaurants_by_bbox(self, test_db_path, sample_restaurant):
+        """Test the R*Tree bounding-box prefilter (kept in sync by triggers)."""
+        initialize_database(test_db_path)
+
+        near_id = create_restaurant(test_db_path, sample_restaurant)
+        create_restaurant(test_db_path, {
+            **sample_restaurant, 'name': "GoodFoods Tambaram",
+            'latitude': 12.9229, 'longitude': 80.1279
+        })
+
+        box = (13.0, 13.1, 80.2, 80.3)
+        matches = get_restaurants(test_db_path, bbox=box)
+
+        assert [r['id'] for r in matches] == [near_id]
+
 
 class TestReservationOperations:
     """Test reservation CRUD operations."""
@@ -263,6 +439,127 @@ class TestReservationOperations:
         restaurant = get_restaurant_by_id(test_db_path, restaurant_id)
         assert restaurant['available_tables'] == initial_tables - 1
 
+    def test_create_reservation_refuses_when_fully_booked(
+        self, test_db_path, sample_customer, sample_restaurant, sample_reservation
+    ):
+        """Test that the last table cannot be booked twice."""
+        initialize_database(test_db_path)
+
+        customer_id = create_customer(
+            test_db_path,
+            sample_customer['name'],
+            sample_customer['phone'],
+            sample_customer['email']
+        )
+        sample_restaurant['available_tables'] = 1
+        restaurant_id = create_restaurant(test_db_path, sample_restaurant)
+
+        sample_reservation['customer_id'] = customer_id
+        sample_reservation['restaurant_id'] = restaurant_id
+        assert create_reservation(test_db_path, sample_reservation) is not None
+        assert create_reservation(test_db_path, sample_reservation) is None
+
+        restaurant = get_restaurant_by_id(test_db_path, restaurant_id)
+        assert restaurant['available_tables'] == 0
+        assert len(get_customer_reservations(test_db_path, customer_id)) == 1
+
+    def test_reservation_writes_leave_caller_transaction_alone(
+        self, test_db_path, sample_customer, sample_restaurant, sample_reservation
+    ):
+        """Test that booking and cancelling on a caller's transaction never end it."""
+        initialize_database(test_db_path)
+
+        customer_id = create_customer(
+            test_db_path,
+            sample_customer['name'],
+            sample_customer['phone'],
+            sample_customer['email']
+        )
+        sample_restaurant['available_tables'] = 0
+        restaurant_id = create_restaurant(test_db_path, sample_restaurant)
+        sample_reservation['customer_id'] = customer_id
+        sample_reservation['restaurant_id'] = restaurant_id
+
+        conn = get_connection(test_db_path)
+        try:
+            conn.execute("BEGIN")
+            conn.execute(
+                "INSERT INTO customers (name, phone) VALUES (?, ?)",
+                ("Pending Guest", "+91-9000000009")
+            )
+
+            # Refusals (full restaurant, unknown booking) keep the pending insert
+            assert create_reservation(test_db_path, sample_reservation, conn=conn) is None
+            assert cancel_reservation(test_db_path, 999, conn=conn) is False
+            assert conn.in_transaction
+            assert get_customer_by_phone(test_db_path, "+91-9000000009", conn=conn) is not None
+
+            # A successful booking joins the transaction without committing it
+            conn.execute("UPDATE restaurants SET available_tables = 1 WHERE id = ?", (restaurant_id,))
+            assert create_reservation(test_db_path, sample_reservation, conn=conn) is not None
+            assert conn.in_transaction
+
+            conn.rollback()
+        finally:
+            conn.close()
+
+        assert get_customer_by_phone(test_db_path, "+91-9000000009") is None
+        assert get_customer_reservations(test_db_path, customer_id) == []
+
+    def test_bulk_create_reservations_skips_full_restaurants(
+        self, test_db_path, sample_customer, sample_restaurant, sample_reservation
+    ):
+        """Test that a batch books what it can and marks the rest as None."""
+        initialize_database(test_db_path)
+
+        customer_id = create_customer(
+            test_db_path,
+            sample_customer['name'],
+            sample_customer['phone'],
+            sample_customer['email']
+        )
+        sample_restaurant['available_tables'] = 2
+        restaurant_id = create_restaurant(test_db_path, sample_restaurant)
+
+        sample_reservation['customer_id'] = customer_id
+        sample_reservation['restaurant_id'] = restaurant_id
+        reservation_ids = bulk_create_reservations(test_db_path, [sample_reservation] * 3)
+
+        assert reservation_ids[0] is not None
+        assert reservation_ids[1] == reservation_ids[0] + 1
+        assert reservation_ids[2] is None
+        assert get_restaurant_by_id(test_db_path, restaurant_id)['available_tables'] == 0
+
+    def test_bulk_create_reservations_joins_caller_transaction(
+        self, test_db_path, sample_customer, sample_restaurant, sample_reservation
+    ):
+        """Test that bookings made on a caller's transaction stay uncommitted."""
+        initialize_database(test_db_path)
+
+        customer_id = create_customer(
+            test_db_path,
+            sample_customer['name'],
+            sample_customer['phone'],
+            sample_customer['email']
+        )
+        restaurant_id = create_restaurant(test_db_path, sample_restaurant)
+        sample_reservation['customer_id'] = customer_id
+        sample_reservation['restaurant_id'] = restaurant_id
+
+        conn = sqlite3.connect(test_db_path)
+        try:
+            conn.execute("BEGIN")
+            reservation_ids = bulk_create_reservations(test_db_path, [sample_reservation], conn=conn)
+            assert reservation_ids[0] is not None
+            assert conn.in_transaction
+            conn.rollback()
+        finally:
+            conn.close()
+
+        assert get_reservation_by_id(test_db_path, reservation_ids[0]) is None
+        assert get_restaurant_by_id(test_db_path, restaurant_id)['available_tables'] == \
+            sample_restaurant['available_tables']
+
     def test_get_reservation_by_id(self, test_db_path, sample_customer,
                                    sample_restaurant, sample_reservation):
         """Test retrieving reservation by ID."""
@@ -352,6 +649,32 @@ class TestReservationOperations:
         reservation = get_reservation_by_id(test_db_path, reservation_id)
         assert reservation['status'] == 'cancelled'
 
+    def test_repeat_cancel_releases_table_once(
+        self, test_db_path, sample_customer, sample_restaurant, sample_reservation
+    ):
+        """Test that a second cancel is refused and leaves no lock behind."""
+        initialize_database(test_db_path)
+
+        customer_id = create_customer(
+            test_db_path,
+            sample_customer['name'],
+            sample_customer['phone'],
+            sample_customer['email']
+        )
+        restaurant_id = create_restaurant(test_db_path, sample_restaurant)
+
+        sample_reservation['customer_id'] = customer_id
+        sample_reservation['restaurant_id'] = restaurant_id
+        reservation_id = create_reservation(test_db_path, sample_reservation)
+
+        with get_pooled_connection(test_db_path) as conn:
+            assert cancel_reservation(test_db_path, reservation_id, conn=conn) is True
+            assert cancel_reservation(test_db_path, reservation_id, conn=conn) is False
+            assert not conn.in_transaction
+
+        restaurant = get_restaurant_by_id(test_db_path, restaurant_id)
+        assert restaurant['available_tables'] == sample_restaurant['available_tables']
+
     def test_get_customer_reservations(self, test_db_path, sample_customer,
                                       sample_restaurant, sample_reservation):
         """Test retrieving all reservations for a customer."""
@@ -378,6 +701,29 @@ class TestReservationOperations:
 
         assert len(reservations) >= 2
 
+    def test_get_reservation_for_customer(self, test_db_path, sample_customer,
+                                          sample_restaurant, sample_reservation):
+        """Test the single-reservation lookup checks ownership."""
+        initialize_database(test_db_path)
+
+        customer_id = create_customer(
+            test_db_path,
+            sample_customer['name'],
+            sample_customer['phone']
+        )
+        other_id = create_customer(test_db_path, "Jane Doe", "+91-9999999999")
+        restaurant_id = create_restaurant(test_db_path, sample_restaurant)
+
+        sample_reservation['customer_id'] = customer_id
+        sample_reservation['restaurant_id'] = restaurant_id
+        reservation_id = create_reservation(test_db_path, sample_reservation)
+
+        reservation = get_reservation_for_customer(test_db_path, customer_id, reservation_id)
+
+        assert reservation['id'] == reservation_id
+        assert reservation['restaurant_name'] == sample_restaurant['name']
+        assert get_reservation_for_customer(test_db_path, other_id, reservation_id) is None
+
 
 class TestDailyOffers:
     """Test daily offers operations."""
@@ -424,6 +770,36 @@ class TestDailyOffers:
         assert len(offers) > 0
         assert offers[0]['offer_title'] == "20% Off Pasta"
 
+    def test_get_restaurants_joins_offers(self, test_db_path, sample_restaurant):
+        """Test the offers LEFT JOIN previews the first active offer."""
+        initialize_database(test_db_path)
+
+        with_offer = create_restaurant(test_db_path, sample_restaurant)
+        create_restaurant(test_db_path, {**sample_restaurant, 'name': "GoodFoods Adyar"})
+
+        base_offer = {
+            "restaurant_id": with_offer,
+            "offer_description": "Seasonal offer",
+            "discount_percentage": 10,
+            "valid_from": "2025-10-01",
+            "valid_until": "2025-10-31"
+        }
+        create_daily_offer(test_db_path, {**base_offer, "offer_title": "Zesty Lunch"})
+        create_daily_offer(test_db_path, {**base_offer, "offer_title": "Aperitivo Hour"})
+        create_daily_offer(test_db_path, {
+            **base_offer, "offer_title": "Expired", "valid_until": "2025-10-10"
+        })
+
+        restaurants = {r['id']: r for r in get_restaurants(test_db_path, offers_date="2025-10-15")}
+
+        assert restaurants[with_offer]['has_active_offers'] is True
+        assert restaurants[with_offer]['offer_preview'] == "Zesty Lunch"
+        others = [r for r_id, r in restaurants.items() if r_id != with_offer]
+        assert others[0]['has_active_offers'] is False
+        assert others[0]['offer_preview'] is None
+        assert has_any_active_offers(test_db_path, "2025-10-15")
+        assert not has_any_active_offers(test_db_path, "2025-11-15")
+
 
 class TestFeedback:
     """Test feedback operations."""
@@ -451,3 +827,73 @@ class TestFeedback:
 
         assert feedback_id is not None
         assert feedback_id > 0
+
+
+class TestConnectionPool:
+    """Test the pooled connections used by the agent tools."""
+
+    def test_pooled_connection_is_reused_with_wal(self, test_db_path):
+        """Test that a released connection is handed out again in WAL mode."""
+        initialize_database(test_db_path)
+
+        with get_pooled_connection(test_db_path) as first:
+            mode = first.execute("PRAGMA journal_mode").fetchone()[0]
+        with get_pooled_connection(test_db_path) as second:
+            pass
+        close_all_pools()
+
+        assert mode == 'wal'
+        assert first is second
+
+    def test_pooled_connection_is_memory_mapped(self, test_db_path):
+        """Test that pooled connections read through mmap."""
+        initialize_database(test_db_path)
+        pool = ConnectionPool(test_db_path, pool_size=1)
+
+        with pool.connection() as conn:
+            mmap_size = conn.execute("PRAGMA mmap_size").fetchone()[0]
+        pool.close()
+
+        assert mmap_size > 0
+
+    def test_release_rolls_back_open_transaction(self, test_db_path, sample_customer):
+        """Test that uncommitted work does not leak to the next borrower."""
+        initialize_database(test_db_path)
+        pool = ConnectionPool(test_db_path, pool_size=1)
+
+        with pool.connection() as conn:
+            conn.execute(
+                "INSERT INTO customers (name, phone) VALUES (?, ?)",
+                (sample_customer['name'], sample_customer['phone'])
+            )
+        pool.close()
+
+        assert get_customer_by_phone(test_db_path, sample_customer['phone']) is None
+
+    def test_helpers_accept_shared_connection(self, test_db_path, sample_customer):
+        """Test that CRUD helpers run on a caller-supplied connection."""
+        initialize_database(test_db_path)
+
+        with get_pooled_connection(test_db_path) as conn:
+            customer_id = create_customer(
+                test_db_path,
+                sample_customer['name'],
+                sample_customer['phone'],
+                conn=conn
+            )
+            customer = get_customer_by_phone(test_db_path, sample_customer['phone'], conn=conn)
+            # Helpers must not close a connection they did not open
+            conn.execute("SELECT 1")
+        close_all_pools()
+
+        assert customer['id'] == customer_id
+
+    def test_helpers_borrow_pooled_connections(self, test_db_path, sample_customer):
+        """Test that helpers without a connection reuse the shared pool."""
+        initialize_database(test_db_path)
+
+        create_customer(test_db_path, sample_customer['name'], sample_customer['phone'])
+        get_customer_by_phone(test_db_path, sample_customer['phone'])
+        get_customer_reservations(test_db_path, 1)
+
+        assert get_pool(test_db_path)._opened == 1
@@ -6,8 +6,12 @@ Tests haversine distance calculations and filtering.
 
 import pytest
 from utils.geo_utils import (
+    bounding_box,
     calculate_distance,
+    haversine_np,
+    nearest_indices,
     filter_by_distance,
+    filter_by_distance_view,
     get_nearest_restaurants
 )
 
@@ -149,3 +153,83 @@ class TestGetNearestRestaurants:
         # First should be nearest (id=2)
         assert nearest[0]["id"] == 2
         assert nearest[0]["distance_km"] == 0.0
+
+
+class TestBoundingBox:
+    """Test the radius bounding box used to prefilter proximity searches."""
+
+    def test_bounding_box_contains_radius(self):
+        """Points just inside the radius in each direction fall in the box."""
+        lat, lon = 13.0418, 80.2337
+        min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, 5.0)
+
+        for corner_lat, corner_lon in [(min_lat, lon), (max_lat, lon), (lat, min_lon), (lat, max_lon)]:
+            assert calculate_distance(lat, lon, corner_lat, corner_lon) >= 5.0
+
+    def test_bounding_box_is_tight(self):
+        """The box does not balloon far beyond the radius."""
+        min_lat, max_lat, min_lon, max_lon = bounding_box(13.0418, 80.2337, 5.0)
+
+        assert max_lat - min_lat < 0.1
+        assert max_lon - min_lon < 0.1
+
+
+class TestHaversineNp:
+    """Test the vectorized haversine used for batch distance filtering."""
+
+    def test_haversine_np_matches_scalar(self):
+        """Vectorized distances agree with calculate_distance."""
+        origin = (13.0418, 80.2337)
+        points = [(13.0008, 80.2668), (13.0827, 80.2707), (12.9716, 80.2210)]
+
+        distances = haversine_np(
+            origin[0], origin[1],
+            [lat for lat, _ in points],
+            [lon for _, lon in points]
+        )
+
+        for (lat, lon), distance in zip(points, distances):
+            assert round(float(distance), 2) == calculate_distance(origin[0], origin[1], lat, lon)
+
+    def test_filter_by_distance_keeps_input_order_on_ties(self):
+        """Equidistant restaurants keep their original order."""
+        restaurants = [
+            {"id": 1, "latitude": 13.05, "longitude": 80.2337},
+            {"id": 2, "latitude": 13.05, "longitude": 80.2337},
+        ]
+
+        filtered = filter_by_distance(restaurants, 13.0418, 80.2337, max_distance_km=5.0)
+
+        assert [r["id"] for r in filtered] == [1, 2]
+
+    def test_filter_by_distance_view_returns_originals(self):
+        """The view pairs distances with the caller's dicts instead of copies."""
+        restaurants = [
+            {"id": 1, "latitude": 13.0800, "longitude": 80.2337},
+            {"id": 2, "latitude": 13.0418, "longitude": 80.2337},
+            {"id": 3, "latitude": 13.2618, "longitude": 80.4537},  # out of range
+        ]
+
+        view = filter_by_distance_view(restaurants, 13.0418, 80.2337, max_distance_km=5.0)
+
+        assert len(view) == 2
+        assert view[0][1] is restaurants[1]  # nearest first
+        assert view[1][1] is restaurants[0]
+        copies = filter_by_distance(restaurants, 13.0418, 80.2337, max_distance_km=5.0)
+        assert [d for d, _ in view] == [r["distance_km"] for r in copies]
+        assert "distance_km" not in restaurants[0]
+
+
+class TestNearestIndices:
+    """Test partial top-k selection of nearest distances."""
+
+    def test_matches_stable_sort(self):
+        """Top-k agrees with a stable full sort, ties included."""
+        import numpy as np
+
+        rng = np.random.default_rng(7)
+        for _ in range(50):
+            distances = np.round(rng.random(40) * 5, 1)  # many ties
+            for k in (0, 1, 2, 3, 39, 40, 45):
+                expected = np.argsort(distances, kind="stable")[:k]
+                assert nearest_indices(distances, k).tolist() == expected.tolist()
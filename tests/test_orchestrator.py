@@ -0,0 +1,391 @@
+"""
+Test suite for the orchestrator agent.
+
+The OpenAI client is replaced with a scripted fake so tests run offline.
+"""
+
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from database.db_manager import (
+    initialize_database,
+    create_customer,
+    get_customer_conversations,
+)
+from database.pool import close_all_pools
+import agents.orchestrator as orchestrator_module
+from agents.orchestrator import OrchestratorAgent, partial_summary
+
+
+def _tool_call(call_id, name, arguments):
+    """Build an object shaped like an OpenAI tool call."""
+    return SimpleNamespace(
+        id=call_id,
+        type="function",
+        function=SimpleNamespace(name=name, arguments=json.dumps(arguments)),
+    )
+
+
+def _completion(content=None, tool_calls=None):
+    """Build an object shaped like an OpenAI chat completion."""
+    message = SimpleNamespace(content=content, tool_calls=tool_calls)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def _stream(*deltas):
+    """Build chunks shaped like a streamed OpenAI chat completion."""
+    return [
+        SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=delta))])
+        for delta in deltas
+    ]
+
+
+class FakeCompletions:
+    """Return scripted completions in order and record each request."""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def create(self, **kwargs):
+        self.requests.append(kwargs)
+        return self.responses.pop(0)
+
+
+@pytest.fixture
+def agent_factory(test_db_path, monkeypatch):
+    """Build an OrchestratorAgent wired to a fake OpenAI client."""
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    initialize_database(test_db_path)
+    customer_id = create_customer(test_db_path, "Priya Narayanan", "+91-9840012345")
+
+    def factory(responses):
+        completions = FakeCompletions(responses)
+        fake_client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+        monkeypatch.setattr(orchestrator_module, "_get_openai_client", lambda _: fake_client)
+        agent = OrchestratorAgent(
+            test_db_path,
+            customer_id,
+            "Priya Narayanan",
+            "+91-9840012345",
+            13.0418,
+            80.2337,
+        )
+        return agent, completions
+
+    yield factory
+    close_all_pools()
+
+
+class TestToolExecution:
+    """Test how tool calls from one assistant turn are executed."""
+
+    def test_tool_calls_run_concurrently_in_order(self, agent_factory, monkeypatch):
+        """Independent tool calls overlap but results keep call order."""
+        delays = {"slow": 0.3, "fast": 0.0}
+        threads = set()
+
+        def fake_execute_tool(name, arguments, *args, **kwargs):
+            threads.add(threading.get_ident())
+            time.sleep(delays[arguments["speed"]])
+            return {"status": "success", "speed": arguments["speed"]}
+
+        monkeypatch.setattr(orchestrator_module, "execute_tool", fake_execute_tool)
+
+        agent, _ = agent_factory([
+            _completion(tool_calls=[
+                _tool_call("call_1", "get_daily_offers", {"speed": "slow"}),
+                _tool_call("call_2", "get_daily_offers", {"speed": "slow"}),
+                _tool_call("call_3", "get_daily_offers", {"speed": "fast"}),
+            ]),
+            _completion(content="Here are today's offers."),
+        ])
+
+        started = time.perf_counter()
+        response = agent.process_message("Any offers today?")
+        elapsed = time.perf_counter() - started
+
+        assert elapsed < 0.55
+        assert len(threads) > 1
+        assert [tr["result"]["speed"] for tr in response["tool_results"]] == [
+            "slow", "slow", "fast"
+        ]
+        tool_messages = [m for m in agent.messages if m["role"] == "tool"]
+        assert [m["tool_call_id"] for m in tool_messages] == ["call_1", "call_2", "call_3"]
+
+    def test_duplicate_tool_calls_run_once(self, agent_factory, monkeypatch):
+        """Repeated identical calls in a turn share one execution."""
+        executed = []
+
+        def fake_execute_tool(name, arguments, *args, **kwargs):
+            executed.append((name, arguments))
+            return {"status": "success", "area": arguments["area_name"]}
+
+        monkeypatch.setattr(orchestrator_module, "execute_tool", fake_execute_tool)
+
+        agent, _ = agent_factory([
+            _completion(tool_calls=[
+                _tool_call("call_1", "find_restaurants_by_area",
+                           {"area_name": "Adyar", "min_rating": 4}),
+                _tool_call("call_2", "find_restaurants_by_area",
+                           {"min_rating": 4, "area_name": "Adyar"}),
+                _tool_call("call_3", "find_restaurants_by_area", {"area_name": "OMR"}),
+            ]),
+            _completion(content="Here you go."),
+        ])
+
+        response = agent.process_message("Adyar or OMR?")
+
+        assert sorted(args["area_name"] for _, args in executed) == ["Adyar", "OMR"]
+        assert [tr["result"]["area"] for tr in response["tool_results"]] == [
+            "Adyar", "Adyar", "OMR"
+        ]
+        tool_messages = [m for m in agent.messages if m["role"] == "tool"]
+        assert [m["tool_call_id"] for m in tool_messages] == ["call_1", "call_2", "call_3"]
+
+    def test_offer_lookups_are_batched(self, agent_factory, monkeypatch):
+        """get_daily_offers calls for several restaurants run as one batch."""
+        batches = []
+
+        def fake_execute_tools(calls, *args, **kwargs):
+            batches.append([arguments["restaurant_id"] for _, arguments in calls])
+            return [{"status": "success", "id": arguments["restaurant_id"]} for _, arguments in calls]
+
+        monkeypatch.setattr(orchestrator_module, "execute_tools", fake_execute_tools)
+        monkeypatch.setattr(
+            orchestrator_module, "execute_tool", lambda *a, **k: {"status": "success"}
+        )
+
+        agent, _ = agent_factory([
+            _completion(tool_calls=[
+                _tool_call("call_1", "get_daily_offers", {"restaurant_id": 3}),
+                _tool_call("call_2", "get_my_bookings", {}),
+                _tool_call("call_3", "get_daily_offers", {"restaurant_id": 7}),
+            ]),
+            _completion(content="Both have offers."),
+        ])
+
+        response = agent.process_message("Offers at 3 and 7?")
+
+        assert batches == [[3, 7]]
+        assert [tr["result"].get("id") for tr in response["tool_results"]] == [3, None, 7]
+
+    def test_invalid_reservation_args_skip_second_call(self, agent_factory):
+        """Bad booking arguments are answered locally without a model round-trip."""
+        agent, completions = agent_factory([
+            _completion(tool_calls=[_tool_call("call_1", "make_reservation", {
+                "restaurant_id": 1,
+                "reservation_date": "2020-01-01",
+                "reservation_time": "19:15",
+                "party_size": 2,
+            })]),
+        ])
+
+        response = agent.process_message("Book for two on 1 Jan 2020 at 7:15")
+
+        assert len(completions.requests) == 1
+        result = response["tool_results"][0]["result"]
+        assert result["code"] == "invalid_args"
+        assert result["fields"] == ["reservation_date", "reservation_time"]
+        assert response["json"]["options"] == []
+        assert "30-minute intervals" in response["json"]["next_steps"]
+
+
+class TestResponseFormat:
+    """Test JSON mode on completion requests."""
+
+    def test_json_mode_only_on_final_tool_turn_call(self, agent_factory, monkeypatch):
+        """The tool-selection call is unconstrained; the summary is JSON mode."""
+        monkeypatch.setattr(
+            orchestrator_module, "execute_tool", lambda *a, **k: {"status": "success"}
+        )
+        agent, completions = agent_factory([
+            _completion(tool_calls=[_tool_call("call_1", "get_my_bookings", {})]),
+            _completion(content='{"summary": "No bookings yet."}'),
+        ])
+
+        response = agent.process_message("My bookings?")
+
+        first, final = completions.requests
+        assert "response_format" not in first
+        assert final["response_format"] == {"type": "json_object"}
+        # Both calls share the cacheable prefix: same tools, same cache key
+        assert final["tools"] is first["tools"]
+        assert final["extra_body"] == first["extra_body"]
+        assert final["tool_choice"] == "none"
+        assert response["json"] == {"summary": "No bookings yet."}
+
+
+class TestStreaming:
+    """Test incremental delivery of the final reply."""
+
+    def test_stream_message_yields_deltas_then_done(self, agent_factory, monkeypatch):
+        """Deltas arrive before the final frame and the full reply is logged."""
+        monkeypatch.setattr(
+            orchestrator_module, "execute_tool", lambda *a, **k: {"status": "success"}
+        )
+        agent, completions = agent_factory([
+            _completion(tool_calls=[_tool_call("call_1", "get_my_bookings", {})]),
+            _stream('{"summary": ', '"All set."}', None),
+        ])
+
+        frames = list(agent.stream_message("My bookings?"))
+
+        assert completions.requests[1]["stream"] is True
+        assert [f["delta"] for f in frames[:-1]] == ['{"summary": ', '"All set."}']
+        assert frames[-1]["done"] is True
+        assert frames[-1]["json"] == {"summary": "All set."}
+        assert agent.messages[-1] == {"role": "assistant", "content": '{"summary": "All set."}'}
+        logs = get_customer_conversations(agent.db_path, agent.customer_id)
+        assert [log["message"] for log in logs][-1] == '{"summary": "All set."}'
+
+    def test_partial_summary_never_exposes_json(self):
+        """Every prefix of a JSON reply decodes to summary text or nothing."""
+        reply = json.dumps({
+            "summary": 'Vanakkam! "Two" tables free 😀',
+            "options": [{"title": "Sangeetha"}],
+        })
+
+        prefixes = [partial_summary(reply[:end]) for end in range(len(reply) + 1)]
+
+        assert prefixes[-1] == 'Vanakkam! "Two" tables free 😀'
+        for text in prefixes:
+            assert text is None or ("{" not in text and "options" not in text)
+        assert partial_summary('{"options": [], "summary": "Later"}') is None
+        assert partial_summary("Plain prose reply") is None
+
+
+class TestConversationLogging:
+    """Test that each turn is persisted to the conversation log."""
+
+    def test_turn_is_logged_once_at_end(self, agent_factory):
+        """User and assistant rows are written together after the turn."""
+        agent, _ = agent_factory([_completion(content="Vanakkam!")])
+
+        agent.process_message("Hello")
+
+        logs = get_customer_conversations(agent.db_path, agent.customer_id)
+        assert [(log["role"], log["message"]) for log in logs] == [
+            ("user", "Hello"),
+            ("assistant", "Vanakkam!"),
+        ]
+        assert agent._pending_log == []
+
+
+class TestHistoryTrimming:
+    """Test token-budget trimming of the conversation window."""
+
+    def _seed_history(self, agent, turns):
+        """Replace the agent history with the given (user, [replies]) turns."""
+        agent.messages = agent.messages[:1]
+        agent._first_user_message = None
+        for user_text, replies in turns:
+            message = {"role": "user", "content": user_text}
+            if agent._first_user_message is None:
+                agent._first_user_message = message
+            agent.messages.append(message)
+            agent.messages.extend(replies)
+
+    def test_large_tool_output_is_trimmed(self, agent_factory):
+        """A bulky tool turn is dropped whole while the first message stays pinned."""
+        agent, _ = agent_factory([])
+        agent.max_history_turns = 10
+        agent.max_history_tokens = 2000
+
+        self._seed_history(agent, [
+            ("Find Italian in Alwarpet", [{"role": "assistant", "content": "Sure!"}]),
+            ("Anything near me?", [
+                {
+                    "role": "assistant",
+                    "content": None,
+                    "tool_calls": [{
+                        "id": "call_1",
+                        "type": "function",
+                        "function": {"name": "find_restaurants", "arguments": "{}"},
+                    }],
+                },
+                {"role": "tool", "tool_call_id": "call_1", "name": "find_restaurants",
+                 "content": "x" * 20000},
+                {"role": "assistant", "content": "Here are five options."},
+            ]),
+            ("Book the first one", []),
+        ])
+
+        agent._trim_history()
+
+        assert [m["content"] for m in agent.messages[1:]] == [
+            "Find Italian in Alwarpet",
+            "Book the first one",
+        ]
+
+    def test_oversized_pinned_message_is_dropped(self, agent_factory):
+        """A first message too large for the budget is not pinned ahead of a window that fits."""
+        agent, _ = agent_factory([])
+        agent.max_history_turns = 10
+        agent.max_history_tokens = 120
+
+        self._seed_history(agent, [
+            (" ".join(["biryani"] * 500), [{"role": "assistant", "content": "Noted!"}]),
+            ("Offers?", [{"role": "assistant", "content": "Two offers."}]),
+            ("Thanks", []),
+        ])
+
+        agent._trim_history()
+
+        assert [m["content"] for m in agent.messages[1:]] == ["Offers?", "Two offers.", "Thanks"]
+
+    def test_window_starts_on_user_and_respects_turn_cap(self, agent_factory):
+        """Only the latest turns are kept and tool messages remain paired."""
+        agent, _ = agent_factory([])
+        agent.max_history_turns = 2
+        agent.max_history_tokens = 8000
+
+        tool_turn = [
+            {
+                "role": "assistant",
+                "content": None,
+                "tool_calls": [{
+                    "id": "call_2",
+                    "type": "function",
+                    "function": {"name": "get_my_bookings", "arguments": "{}"},
+                }],
+            },
+            {"role": "tool", "tool_call_id": "call_2", "name": "get_my_bookings",
+             "content": "{}"},
+            {"role": "assistant", "content": "No bookings yet."},
+        ]
+        self._seed_history(agent, [
+            ("Hello", [{"role": "assistant", "content": "Vanakkam!"}]),
+            ("Offers?", [{"role": "assistant", "content": "Two offers."}]),
+            ("My bookings?", tool_turn),
+            ("Thanks", []),
+        ])
+
+        agent._trim_history()
+
+        roles = [m["role"] for m in agent.messages]
+        assert roles == ["system", "user", "user", "assistant", "tool", "assistant", "user"]
+        assert agent.messages[1]["content"] == "Hello"
+        assert agent.messages[2]["content"] == "My bookings?"
+
+    def test_history_is_bounded_after_each_turn(self, agent_factory, monkeypatch):
+        """Trimming once per turn still caps the window the next call sees."""
+        agent, _ = agent_factory([_completion(content=f"Reply {i}") for i in range(5)])
+        agent.max_history_turns = 2
+        trim_calls = []
+        trim = agent._trim_history
+        monkeypatch.setattr(agent, "_trim_history", lambda: (trim_calls.append(1), trim()))
+
+        for i in range(5):
+            agent.process_message(f"Message {i}")
+            user_turns = [m for m in agent.messages if m["role"] == "user"]
+            assert len(user_turns) <= agent.max_history_turns + 1  # + pinned first
+
+        assert len(trim_calls) == 5
+        assert [m["content"] for m in agent.messages[1:]] == [
+            "Message 0", "Message 3", "Reply 3", "Message 4", "Reply 4"
+        ]
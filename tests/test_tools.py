@@ -0,0 +1,319 @@
+"""
+Test suite for agent tool helpers.
+
+Tests revenue-ops annotations attached to search results.
+"""
+
+import json
+from datetime import datetime
+
+import pytest
+
+from database.db_manager import (
+    initialize_database,
+    create_customer,
+    create_daily_offer,
+    create_restaurant,
+    get_restaurant_by_id,
+    update_restaurant_tables,
+)
+from agents.tools import (
+    TOOL_SCHEMAS,
+    _DISPATCH,
+    annotate_revenue_ops,
+    annotate_revenue_ops_batch,
+    clear_search_cache,
+    estimate_spend_per_person,
+    execute_tool,
+    execute_tools,
+    find_restaurants,
+    get_daily_offers_func,
+    make_reservation,
+)
+
+ANCHOR = (13.0418, 80.2337)
+
+
+@pytest.fixture
+def seeded_db(test_db_path, sample_restaurant):
+    """Database with one restaurant and one customer; search cache reset."""
+    initialize_database(test_db_path)
+    restaurant_id = create_restaurant(test_db_path, sample_restaurant)
+    customer_id = create_customer(test_db_path, "Priya Narayanan", "+91-9840012345")
+    clear_search_cache()
+    yield test_db_path, restaurant_id, customer_id
+    clear_search_cache()
+
+
+class TestSpendEstimates:
+    """Test per-guest spend estimates by price band."""
+
+    def test_estimate_by_price_band(self):
+        """Each extra ₹ glyph moves up one band."""
+        assert [estimate_spend_per_person(band) for band in ["₹", "₹₹", "₹₹₹", "₹₹₹₹"]] == [
+            600, 1200, 1800, 2500
+        ]
+
+    def test_estimate_defaults_for_unknown_band(self):
+        """Missing or unrecognised bands fall back to the mid estimate."""
+        assert estimate_spend_per_person(None) == 1200
+        assert estimate_spend_per_person("$$") == 1200
+
+
+class TestRevenueOpsBatch:
+    """Test the batch annotator against the per-row version."""
+
+    def test_batch_matches_single(self, sample_restaurant):
+        """Batch annotation yields the same fields as annotating row by row."""
+        restaurants = [
+            sample_restaurant,
+            {**sample_restaurant, "available_tables": 1, "rating": 4.8},
+            {**sample_restaurant, "available_tables": 50, "rating": 4.9},
+            {**sample_restaurant, "total_capacity": 120, "available_tables": 30, "rating": 3.9},
+            {"name": "Sparse listing"},
+        ]
+
+        batch = annotate_revenue_ops_batch(restaurants)
+
+        assert batch == [annotate_revenue_ops(r) for r in restaurants]
+        assert [r["yield_signal"] for r in batch] == [
+            "steady", "surge", "discount", "steady", "surge"
+        ]
+        # Results go straight into tool messages, so must stay JSON-serialisable
+        json.dumps(batch)
+
+    def test_batch_empty(self):
+        """An empty result set stays empty."""
+        assert annotate_revenue_ops_batch([]) == []
+
+
+class TestSearchCache:
+    """Test the short-lived cache in front of restaurant search."""
+
+    def test_repeat_search_is_served_from_cache(self, seeded_db):
+        """A repeat query within the TTL skips the database."""
+        db_path, restaurant_id, _ = seeded_db
+        first = find_restaurants(db_path, *ANCHOR, location_name="Italian Piazza")
+
+        update_restaurant_tables(db_path, restaurant_id, -5)
+        second = find_restaurants(db_path, *ANCHOR, location_name="italian piazza")
+
+        assert second == first
+        assert second is not first
+        second["results"][0]["available_tables"] = 0
+        third = find_restaurants(db_path, *ANCHOR, location_name="Italian Piazza")
+        assert third["results"][0]["available_tables"] == 12
+
+    def test_nearby_coordinates_share_cache_entry(self, seeded_db):
+        """Positions that agree to ~1 m reuse the cached result."""
+        db_path, restaurant_id, _ = seeded_db
+        first = find_restaurants(db_path, *ANCHOR)
+
+        update_restaurant_tables(db_path, restaurant_id, -5)
+        jittered = find_restaurants(db_path, ANCHOR[0] + 1e-7, ANCHOR[1] - 1e-7)
+        moved = find_restaurants(db_path, ANCHOR[0] + 1e-3, ANCHOR[1])
+
+        assert jittered == first
+        assert moved["results"][0]["available_tables"] == 7
+
+    def test_reservation_invalidates_cache(self, seeded_db):
+        """Booking a table drops cached availability."""
+        db_path, restaurant_id, customer_id = seeded_db
+        before = find_restaurants(db_path, *ANCHOR, location_name="Italian Piazza")
+
+        booking = make_reservation(
+            db_path, customer_id, restaurant_id, "2099-01-01", "19:00", 2
+        )
+        after = find_restaurants(db_path, *ANCHOR, location_name="Italian Piazza")
+
+        assert booking["status"] == "success"
+        assert after["results"][0]["available_tables"] == (
+            before["results"][0]["available_tables"] - 1
+        )
+
+
+class TestSearchFilters:
+    """Test search filters applied in SQL."""
+
+    def test_area_top_up_respects_parking(self, seeded_db, sample_restaurant):
+        """Nearby alternatives for a thin area match also have parking."""
+        db_path, restaurant_id, _ = seeded_db
+        no_parking = create_restaurant(db_path, {
+            **sample_restaurant, "name": "GoodFoods Mylapore", "has_parking": 0,
+            "latitude": 13.0420, "longitude": 80.2340
+        })
+        farther = create_restaurant(db_path, {
+            **sample_restaurant, "name": "GoodFoods Adyar", "latitude": 13.0067, "longitude": 80.2570
+        })
+
+        result = find_restaurants(db_path, *ANCHOR, location_name="Italian Piazza", has_parking=True)
+
+        ids = [r["id"] for r in result["results"]]
+        assert ids == [restaurant_id, farther]
+        assert no_parking not in ids
+        assert result["results"][1]["fallback_reason"].startswith("Nearby alternative")
+
+    def test_proximity_offers_without_any_offers(self, seeded_db):
+        """With no offers running anywhere, a wider radius is not suggested."""
+        db_path, _, _ = seeded_db
+
+        result = find_restaurants(db_path, *ANCHOR, has_offers=True)
+
+        assert result["results"] == []
+        assert "active offers" in result["message"]
+        assert "suggestion" not in result
+
+    def test_unfiltered_search_previews_offers(self, seeded_db):
+        """Searches not filtering on offers still preview them on results."""
+        db_path, restaurant_id, _ = seeded_db
+        today = datetime.now().strftime('%Y-%m-%d')
+        create_daily_offer(db_path, {
+            "restaurant_id": restaurant_id,
+            "offer_title": "Truffle Week",
+            "offer_description": "Shaved truffle on any pasta",
+            "discount_percentage": 10,
+            "valid_from": today,
+            "valid_until": today
+        })
+
+        plain = find_restaurants(db_path, *ANCHOR)["results"][0]
+        filtered = find_restaurants(db_path, *ANCHOR, has_offers=True)["results"][0]
+
+        for result in (plain, filtered):
+            assert result["has_active_offers"] is True
+            assert result["offer_preview"] == "Truffle Week"
+
+
+class TestMakeReservation:
+    """Test the reservation tool's response payload."""
+
+    def test_reports_updated_availability(self, seeded_db):
+        """The confirmation carries the table count after booking."""
+        db_path, restaurant_id, customer_id = seeded_db
+
+        booking = make_reservation(
+            db_path, customer_id, restaurant_id, "2099-01-01", "19:00", 2
+        )
+
+        assert booking["restaurant"]["available_tables"] == 11
+        assert booking["restaurant"] == get_restaurant_by_id(db_path, restaurant_id)
+
+    def test_reports_tables_left_after_concurrent_booking(self, seeded_db, monkeypatch):
+        """The confirmation shows the count from the booking, not the earlier read."""
+        import agents.tools as tools_module
+
+        db_path, restaurant_id, customer_id = seeded_db
+        read_restaurant = tools_module.get_restaurant_by_id
+
+        def read_then_book_elsewhere(*args, **kwargs):
+            restaurant = read_restaurant(*args, **kwargs)
+            # Another guest takes a table between the check and the booking
+            update_restaurant_tables(db_path, restaurant_id, -1)
+            return restaurant
+
+        monkeypatch.setattr(tools_module, "get_restaurant_by_id", read_then_book_elsewhere)
+
+        booking = make_reservation(
+            db_path, customer_id, restaurant_id, "2099-01-01", "19:00", 2
+        )
+
+        assert booking["restaurant"]["available_tables"] == 10
+        assert read_restaurant(db_path, restaurant_id)["available_tables"] == 10
+
+    def test_integer_like_string_arguments_are_coerced(self, seeded_db):
+        """String ids and party sizes from the model still book the table."""
+        db_path, restaurant_id, customer_id = seeded_db
+
+        result = execute_tool("make_reservation", {
+            "restaurant_id": str(restaurant_id),
+            "reservation_date": "2099-01-01",
+            "reservation_time": "19:00",
+            "party_size": "4",
+        }, db_path, customer_id, *ANCHOR)
+
+        assert result["status"] == "success"
+        assert result["reservation"]["restaurant_id"] == restaurant_id
+        assert result["reservation"]["party_size"] == 4
+
+    def test_boolean_arguments_are_rejected(self, seeded_db):
+        """True/False are not accepted as an id or a party size."""
+        db_path, _, customer_id = seeded_db
+
+        result = execute_tool("make_reservation", {
+            "restaurant_id": True,
+            "reservation_date": "2099-01-01",
+            "reservation_time": "19:00",
+            "party_size": True,
+        }, db_path, customer_id, *ANCHOR)
+
+        assert result["code"] == "invalid_args"
+        assert result["fields"] == ["restaurant_id", "party_size"]
+
+
+class TestDailyOffersCache:
+    """Test the per-day cache in front of offer lookups."""
+
+    def test_repeat_lookup_is_cached_until_write(self, seeded_db):
+        """Offers are reused until the database changes."""
+        db_path, restaurant_id, _ = seeded_db
+        today = datetime.now().strftime('%Y-%m-%d')
+
+        first = get_daily_offers_func(db_path, restaurant_id)
+        first["offers"].append({"offer_title": "mutated"})
+        second = get_daily_offers_func(db_path, restaurant_id)
+
+        create_daily_offer(db_path, {
+            "restaurant_id": restaurant_id,
+            "offer_title": "Chef's Tasting",
+            "offer_description": "Seven courses",
+            "discount_percentage": 15,
+            "valid_from": today,
+            "valid_until": today
+        })
+        third = get_daily_offers_func(db_path, restaurant_id)
+
+        assert second["offers"] == []
+        assert [o["offer_title"] for o in third["offers"]] == ["Chef's Tasting"]
+
+    def test_execute_tools_batches_offer_lookups(self, seeded_db, sample_restaurant):
+        """Several get_daily_offers calls match their one-by-one results."""
+        db_path, restaurant_id, customer_id = seeded_db
+        other_id = create_restaurant(db_path, {**sample_restaurant, "name": "GoodFoods Adyar"})
+        today = datetime.now().strftime('%Y-%m-%d')
+        create_daily_offer(db_path, {
+            "restaurant_id": other_id,
+            "offer_title": "Filter Coffee Hour",
+            "offer_description": "Free coffee with dessert",
+            "discount_percentage": 10,
+            "valid_from": today,
+            "valid_until": today
+        })
+        calls = [
+            ("get_daily_offers", {"restaurant_id": other_id}),
+            ("get_my_bookings", {}),
+            ("get_daily_offers", {"restaurant_id": restaurant_id}),
+        ]
+
+        results = execute_tools(calls, db_path, customer_id, *ANCHOR)
+
+        assert results[0] == get_daily_offers_func(db_path, other_id)
+        assert results[0]["count"] == 1
+        assert results[1]["status"] == "success"
+        assert results[2] == get_daily_offers_func(db_path, restaurant_id)
+        assert results[2]["offers"] == []
+
+
+class TestExecuteTool:
+    """Test routing tool calls by name."""
+
+    def test_every_schema_has_a_handler(self):
+        """Each advertised tool name is routed."""
+        assert {schema["function"]["name"] for schema in TOOL_SCHEMAS} == set(_DISPATCH)
+
+    def test_unknown_tool(self, seeded_db):
+        """Unrecognised names return an error result."""
+        db_path, _, customer_id = seeded_db
+
+        result = execute_tool("launch_rocket", {}, db_path, customer_id, *ANCHOR)
+
+        assert result == {"status": "error", "message": "Unknown tool: launch_rocket"}
@@ -9,7 +9,8 @@ from utils.validators import (
     validate_date,
     validate_time_slot,
     validate_party_size,
-    validate_rating
+    validate_rating,
+    validate_email
 )
 
 
@@ -103,6 +104,13 @@ class TestTimeSlotValidation:
         for time in invalid_times:
             assert validate_time_slot(time) is False
 
+    def test_validate_time_slot_lenient_forms(self):
+        """Test single-digit hours are accepted and padded input is not."""
+        assert validate_time_slot("9:30") is True
+        assert validate_time_slot("19:0") is True
+        assert validate_time_slot(" 19:00") is False
+        assert validate_time_slot("19:00\n") is False
+
 
 class TestPartySizeValidation:
     """Test party size validation."""
@@ -138,3 +146,26 @@ class TestRatingValidation:
 
         for rating in invalid_ratings:
             assert validate_rating(rating) is False
+
+
+class TestEmailValidation:
+    """Test email validation."""
+
+    def test_validate_email_valid(self):
+        """Test valid email addresses."""
+        valid_emails = ["priya@goodfoods.co", "a.b+tag@mail.example.in"]
+
+        for email in valid_emails:
+            assert validate_email(email) is True
+
+    def test_validate_email_invalid(self):
+        """Test invalid email addresses."""
+        invalid_emails = ["", "priya", "priya@goodfoods", "priya@goodfoods.co\n"]
+
+        for email in invalid_emails:
+            assert validate_email(email) is False
+
+    def test_validate_email_rejects_overlong(self):
+        """Test addresses past the RFC 5321 length limit are rejected."""
+        assert validate_email("a" * 250 + "@x.in") is False
+        assert validate_email("a" * 10000 + "@" + "a" * 10000) is False
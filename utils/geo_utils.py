@@ -4,8 +4,16 @@ Geospatial utility functions for restaurant booking system.
 Provides distance calculations and filtering based on location.
 """
 
+import math
 from typing import List, Dict, Any, Tuple
-from geopy.distance import geodesic
+
+# Mean Earth radius used by the haversine formula
+EARTH_RADIUS_KM = 6371.0088
+
+# Lower bounds on km per degree (WGS84 meridian at the equator for latitude,
+# the haversine sphere for longitude), so bounding boxes never undershoot
+KM_PER_DEGREE_LAT = 110.574
+KM_PER_DEGREE_LON_AT_EQUATOR = 111.195
 
 
 def calculate_distance(
@@ -26,14 +34,147 @@ def calculate_distance(
     Returns:
         Distance in kilometers
     """
-    point1 = (lat1, lon1)
-    point2 = (lat2, lon2)
-
-    distance = geodesic(point1, point2).kilometers
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    a = (
+        math.sin((phi2 - phi1) / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2
+    )
+    distance = 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
 
     return round(distance, 2)
 
 
+def haversine_np(lat0: float, lon0: float, lats, lons):
+    """
+    Vectorized haversine distance from one point to many.
+
+    Args:
+        lat0: Latitude of the origin
+        lon0: Longitude of the origin
+        lats: Array of latitudes
+        lons: Array of longitudes
+
+    Returns:
+        NumPy array of distances in kilometers (unrounded)
+    """
+    import numpy as np
+
+    phi0 = np.radians(lat0)
+    phis = np.radians(np.asarray(lats, dtype=np.float64))
+    dlon = np.radians(np.asarray(lons, dtype=np.float64) - lon0)
+    a = np.sin((phis - phi0) / 2) ** 2 + np.cos(phi0) * np.cos(phis) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(1.0, np.sqrt(a)))
+
+
+def restaurant_distances(
+    restaurants: List[Dict[str, Any]],
+    user_lat: float,
+    user_lon: float
+):
+    """
+    Distances (km, rounded like calculate_distance) from the user to each
+    restaurant, computed in one vectorized pass.
+
+    Returns:
+        NumPy array aligned with ``restaurants``
+    """
+    import numpy as np
+
+    count = len(restaurants)
+    lats = np.fromiter((r['latitude'] for r in restaurants), dtype=np.float64, count=count)
+    lons = np.fromiter((r['longitude'] for r in restaurants), dtype=np.float64, count=count)
+    return np.round(haversine_np(user_lat, user_lon, lats, lons), 2)
+
+
+def bounding_box(
+    lat: float,
+    lon: float,
+    radius_km: float
+) -> Tuple[float, float, float, float]:
+    """
+    Compute a lat/lon box that contains every point within a radius.
+
+    Args:
+        lat: Centre latitude
+        lon: Centre longitude
+        radius_km: Radius in kilometers
+
+    Returns:
+        (min_lat, max_lat, min_lon, max_lon)
+    """
+    delta_lat = radius_km / KM_PER_DEGREE_LAT
+    cos_lat = math.cos(math.radians(lat))
+    if cos_lat < 1e-6:
+        delta_lon = 180.0  # At the poles every longitude is in range
+    else:
+        delta_lon = min(radius_km / (KM_PER_DEGREE_LON_AT_EQUATOR * cos_lat), 180.0)
+    return (lat - delta_lat, lat + delta_lat, lon - delta_lon, lon + delta_lon)
+
+
+def nearest_indices(distances, k: int):
+    """
+    Indices of the k smallest distances, nearest first.
+
+    Uses a partial selection (O(n)) and only sorts the selected few; equal
+    distances keep their input order, as with a stable full sort.
+
+    Args:
+        distances: 1-D NumPy array of distances
+        k: Number of indices wanted
+
+    Returns:
+        NumPy array of at most k indices
+    """
+    import numpy as np
+
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k < len(distances):
+        # Everything tied with the k-th smallest is kept so ties resolve by index
+        kth = distances[np.argpartition(distances, k - 1)[k - 1]]
+        candidates = np.flatnonzero(distances <= kth)
+    else:
+        candidates = np.arange(len(distances))
+    order = np.lexsort((candidates, distances[candidates]))
+    return candidates[order][:k]
+
+
+def filter_by_distance_view(
+    restaurants: List[Dict[str, Any]],
+    user_lat: float,
+    user_lon: float,
+    max_distance_km: float = 5.0
+) -> List[Tuple[float, Dict[str, Any]]]:
+    """
+    Like filter_by_distance, but without copying the restaurant dicts.
+
+    Args:
+        restaurants: List of restaurant dicts with latitude/longitude
+        user_lat: User's latitude
+        user_lon: User's longitude
+        max_distance_km: Maximum distance in kilometers
+
+    Returns:
+        (distance_km, restaurant) pairs within range, sorted by distance;
+        each restaurant is the caller's original dict
+    """
+    if not restaurants:
+        return []
+
+    import numpy as np
+
+    distances = restaurant_distances(restaurants, user_lat, user_lon)
+    within = np.flatnonzero(distances <= max_distance_km)
+    # Stable sort keeps input order for equal distances
+    order = within[np.argsort(distances[within], kind='stable')]
+
+    return [
+        (distance, restaurants[i])
+        for i, distance in zip(order.tolist(), distances[order].tolist())
+    ]
+
+
 def filter_by_distance(
     restaurants: List[Dict[str, Any]],
     user_lat: float,
@@ -52,26 +193,12 @@ def filter_by_distance(
     Returns:
         List of restaurants within range, sorted by distance
     """
-    results = []
-
-    for restaurant in restaurants:
-        distance = calculate_distance(
-            user_lat,
-            user_lon,
-            restaurant['latitude'],
-            restaurant['longitude']
+    return [
+        {**restaurant, 'distance_km': distance}
+        for distance, restaurant in filter_by_distance_view(
+            restaurants, user_lat, user_lon, max_distance_km
         )
-
-        if distance <= max_distance_km:
-            # Add distance to restaurant dict
-            restaurant_with_distance = restaurant.copy()
-            restaurant_with_distance['distance_km'] = distance
-            results.append(restaurant_with_distance)
-
-    # Sort by distance
-    results.sort(key=lambda x: x['distance_km'])
-
-    return results
+    ]
 
 
 def get_nearest_restaurants(
@@ -92,26 +219,16 @@ def get_nearest_restaurants(
     Returns:
         List of nearest restaurants with distance, sorted
     """
-    # Calculate distance for all
-    restaurants_with_distance = []
-
-    for restaurant in restaurants:
-        distance = calculate_distance(
-            user_lat,
-            user_lon,
-            restaurant['latitude'],
-            restaurant['longitude']
-        )
-
-        restaurant_with_distance = restaurant.copy()
-        restaurant_with_distance['distance_km'] = distance
-        restaurants_with_distance.append(restaurant_with_distance)
+    if not restaurants:
+        return []
 
-    # Sort by distance
-    restaurants_with_distance.sort(key=lambda x: x['distance_km'])
+    distances = restaurant_distances(restaurants, user_lat, user_lon)
+    order = nearest_indices(distances, limit)
 
-    # Return top N
-    return restaurants_with_distance[:limit]
+    return [
+        {**restaurants[i], 'distance_km': distance}
+        for i, distance in zip(order.tolist(), distances[order].tolist())
+    ]
 
 
 def format_distance(distance_km: float) -> str:
@@ -5,9 +5,20 @@ Validates user inputs for safety and correctness.
 """
 
 import re
-from datetime import datetime
+from datetime import date, datetime
+from functools import lru_cache
 from typing import Optional
 
+# HH:00 or HH:30 in 24-hour time; matches exactly what strptime("%H:%M")
+# accepts for those minutes (single-digit hours/minutes included)
+_TIME_SLOT_RE = re.compile(r'(?:[01]?\d|2[0-3]):(?:0?0|30)')
+
+# Simple email shape check: local@domain.tld
+_EMAIL_RE = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', re.ASCII)
+
+# RFC 5321 path limit; longer input is rejected before the regex runs
+_EMAIL_MAX_LENGTH = 254
+
 
 def validate_phone_number(phone: str) -> bool:
     """
@@ -61,17 +72,19 @@ def validate_date(date_str: str) -> bool:
     if not date_str:
         return False
 
-    try:
-        # Parse date
-        date = datetime.strptime(date_str, "%Y-%m-%d").date()
+    parsed = _parse_date(date_str)
 
-        # Check if today or future
-        today = datetime.now().date()
+    # Check if today or future
+    return parsed is not None and parsed >= datetime.now().date()
 
-        return date >= today
 
+@lru_cache(maxsize=256)
+def _parse_date(date_str: str) -> Optional[date]:
+    """Parse a YYYY-MM-DD string once per distinct value (None if invalid)."""
+    try:
+        return datetime.strptime(date_str, "%Y-%m-%d").date()
     except ValueError:
-        return False
+        return None
 
 
 def validate_time_slot(time_str: str) -> bool:
@@ -89,18 +102,7 @@ def validate_time_slot(time_str: str) -> bool:
     if not time_str:
         return False
 
-    try:
-        # Parse time
-        time_obj = datetime.strptime(time_str, "%H:%M").time()
-
-        # Check if minutes are 00 or 30
-        if time_obj.minute not in [0, 30]:
-            return False
-
-        return True
-
-    except ValueError:
-        return False
+    return _TIME_SLOT_RE.fullmatch(time_str) is not None
 
 
 def validate_party_size(size: int) -> bool:
@@ -139,13 +141,10 @@ def validate_email(email: str) -> bool:
     Returns:
         True if valid format, False otherwise
     """
-    if not email:
+    if not email or len(email) > _EMAIL_MAX_LENGTH:
         return False
 
-    # Simple email regex
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-
-    return bool(re.match(pattern, email))
+    return _EMAIL_RE.fullmatch(email) is not None
 
 
 def sanitize_string(text: str, max_length: int = 500) -> str: